@@ -10,6 +10,7 @@ from flask_bcrypt import Bcrypt
 from app.models import models
 from .jwt_config import jwt
 from .extensions import db, mail
+from app.services import perf_metrics_service
 
 migrate = Migrate()
 # jwt = JWTManager()
@@ -23,6 +24,7 @@ def create_app(config_name='default'):
 
     db.init_app(app)
     mail.init_app(app)
+    perf_metrics_service.init_app(app)
 
     migrate.init_app(app, db)
     CORS(app, supports_credentials=True, origins="*")  # Enable CORS with credentials support
@@ -2,6 +2,7 @@ from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import create_access_token, set_access_cookies
 from app.models.models import User, Department, Lecturer
 from app.services.umis_auth_service import auth_user
+from app.services import lecturer_directory_service
 from app import db
 
 umis_auth_bp = Blueprint('umis-auth', __name__)
@@ -22,11 +23,10 @@ def login():
     if not data or not data.get('umisid') or not data.get('password'):
         return jsonify({"msg": "UMIS ID and password are required"}), 400
 
-    # Authenticate with UMIS
-    if len(auth_user(data)) != 4:
-        instructor_data, error = auth_user(data)
-    else:
-        instructor_data, error, umis_token, umisid = auth_user(data)
+    # Authenticate with UMIS; failures come back as (None, error)
+    result = auth_user(data)
+    instructor_data, error = result[:2]
+    umis_token, umisid = result[2:] if len(result) == 4 else (None, data.get('umisid'))
 
     if error:
         return jsonify({"msg": f"UMIS authentication failed: {error}"}), 400
@@ -88,6 +88,8 @@ def login():
         )
         db.session.add(new_user)
         user = new_user
+        # The login added a lecturer to allocate to
+        lecturer_directory_service.bump()
     else:
         # Update existing user's role if they are now a HOD
         if is_hod and user.role != 'hod':
@@ -2,10 +2,58 @@ import os
 from dotenv import load_dotenv
 load_dotenv()
 from datetime import timedelta
+from sqlalchemy.engine import make_url
+from app.db_pool import TimedQueuePool
+
+
+def _env_flag(name, default):
+    return os.getenv(name, default).lower() in ['true', 'on', '1']
+
+
+def database_engine_options(url, **overrides):
+    """
+    Returns SQLALCHEMY_ENGINE_OPTIONS for a database URL, read from DB_* environment
+    variables: pool size and overflow, checkout timeout, connection recycling and
+    pre-ping, isolation level and, on MySQL, connect and statement timeouts.
+    `overrides` replace individual options (e.g. pool_size in load tests).
+    """
+    if not url:
+        return {}
+
+    url = make_url(url)
+    if url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:'):
+        # In-memory SQLite runs on a single static connection
+        return {}
+
+    options = {
+        "poolclass": TimedQueuePool,
+        "pool_size": int(os.getenv('DB_POOL_SIZE', 10)),
+        "max_overflow": int(os.getenv('DB_MAX_OVERFLOW', 10)),
+        "pool_timeout": float(os.getenv('DB_POOL_TIMEOUT', 10)),
+        # Below MySQL's default wait_timeout and most proxies' idle limits
+        "pool_recycle": int(os.getenv('DB_POOL_RECYCLE', 280)),
+        "pool_pre_ping": _env_flag('DB_POOL_PRE_PING', 'true'),
+    }
+
+    if os.getenv('DB_ISOLATION_LEVEL'):
+        options["isolation_level"] = os.getenv('DB_ISOLATION_LEVEL')
+
+    if url.get_backend_name() == 'mysql':
+        connect_args = {"connect_timeout": int(os.getenv('DB_CONNECT_TIMEOUT', 10))}
+        statement_timeout_ms = int(os.getenv('DB_STATEMENT_TIMEOUT_MS', 0))
+        if statement_timeout_ms:
+            # Applies to SELECT statements; writes are bounded by innodb_lock_wait_timeout
+            connect_args["init_command"] = f"SET SESSION max_execution_time={statement_timeout_ms}"
+        options["connect_args"] = connect_args
+
+    options.update(overrides)
+    return options
+
 
 class Config:
     SQLALCHEMY_DATABASE_URI = os.getenv("DATABASE_URL")
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    SQLALCHEMY_ENGINE_OPTIONS = database_engine_options(SQLALCHEMY_DATABASE_URI)
     JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY")
     LOG_FILE = "app.log"
     SECRET_KEY = os.getenv("SECRET_KEY")
@@ -16,10 +64,17 @@ class Config:
     # Email configuration
     MAIL_SERVER = os.getenv('MAIL_SERVER', 'smtp.googlemail.com')
     MAIL_PORT = int(os.getenv('MAIL_PORT', 587))
-    MAIL_USE_TLS = os.getenv('MAIL_USE_TLS', 'true').lower() in ['true', 'on', '1']
+    MAIL_USE_TLS = _env_flag('MAIL_USE_TLS', 'true')
     MAIL_USERNAME = os.getenv('MAIL_USERNAME')
     MAIL_PASSWORD = os.getenv('MAIL_PASSWORD')
     MAIL_DEFAULT_SENDER = os.getenv('MAIL_DEFAULT_SENDER')
+    # Mail outbox worker: messages claimed per batch, sends per second (0 for no limit),
+    # attempts before a message is marked failed and the first retry delay (doubled each time)
+    MAIL_OUTBOX_BATCH_SIZE = int(os.getenv('MAIL_OUTBOX_BATCH_SIZE', 50))
+    MAIL_OUTBOX_RATE_PER_SECOND = float(os.getenv('MAIL_OUTBOX_RATE_PER_SECOND', 5))
+    MAIL_OUTBOX_MAX_ATTEMPTS = int(os.getenv('MAIL_OUTBOX_MAX_ATTEMPTS', 5))
+    MAIL_OUTBOX_RETRY_DELAY = int(os.getenv('MAIL_OUTBOX_RETRY_DELAY', 60))
+    MAIL_OUTBOX_STALE_SECONDS = int(os.getenv('MAIL_OUTBOX_STALE_SECONDS', 900))
     JWT_TOKEN_LOCATION = ["cookies"]
     # Use secure cookies (set to True in production)
     JWT_COOKIE_SECURE = False  # True if using HTTPS
@@ -30,6 +85,46 @@ class Config:
     JWT_COOKIE_CSRF_PROTECT = False  # You can turn it on if needed
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=3)
 
+    # UMIS push configuration
+    UMIS_PUSH_MAX_WORKERS = int(os.getenv('UMIS_PUSH_MAX_WORKERS', 8))
+    UMIS_PUSH_TIMEOUT = float(os.getenv('UMIS_PUSH_TIMEOUT', 30))
+    UMIS_JOB_CHUNK_SIZE = int(os.getenv('UMIS_JOB_CHUNK_SIZE', 50))
+    # Seconds without a heartbeat after which a running push job is considered abandoned
+    UMIS_JOB_STALE_SECONDS = int(os.getenv('UMIS_JOB_STALE_SECONDS', 3600))
+    # Lifetime assumed for UMIS tokens when UMIS does not send expires_in
+    UMIS_TOKEN_TTL = int(os.getenv('UMIS_TOKEN_TTL', 3600))
+    UMIS_TOKEN_REFRESH_MARGIN = int(os.getenv('UMIS_TOKEN_REFRESH_MARGIN', 60))
+    # Timeouts (seconds), retries and connection pool for the UMIS login and lookup client
+    UMIS_CONNECT_TIMEOUT = float(os.getenv('UMIS_CONNECT_TIMEOUT', 3))
+    UMIS_READ_TIMEOUT = float(os.getenv('UMIS_READ_TIMEOUT', 10))
+    UMIS_RETRIES = int(os.getenv('UMIS_RETRIES', 2))
+    UMIS_RETRY_BACKOFF = float(os.getenv('UMIS_RETRY_BACKOFF', 0.3))
+    UMIS_HTTP_POOL_SIZE = int(os.getenv('UMIS_HTTP_POOL_SIZE', 20))
+    # Consecutive UMIS failures that open the circuit breaker, and seconds it stays open
+    UMIS_BREAKER_FAILURE_THRESHOLD = int(os.getenv('UMIS_BREAKER_FAILURE_THRESHOLD', 5))
+    UMIS_BREAKER_RESET_TIMEOUT = float(os.getenv('UMIS_BREAKER_RESET_TIMEOUT', 30))
+    # Seconds the stored UMIS instructor directory is used before it is downloaded again
+    UMIS_DIRECTORY_TTL = int(os.getenv('UMIS_DIRECTORY_TTL', 3600))
+    # Minimum snapshot age before a login with an unknown instructor id triggers a refresh
+    UMIS_DIRECTORY_MISS_REFRESH_INTERVAL = int(os.getenv('UMIS_DIRECTORY_MISS_REFRESH_INTERVAL', 60))
+
+    # Number of department print reports kept in memory
+    REPORT_CACHE_SIZE = int(os.getenv('REPORT_CACHE_SIZE', 256))
+    # Longest time a worker serves the lecturer directory without checking its version
+    LECTURER_DIRECTORY_CHECK_INTERVAL = float(os.getenv('LECTURER_DIRECTORY_CHECK_INTERVAL', 1.0))
+    # Longest time a worker serves sessions, semesters, levels and bulletins without checking their version
+    REFERENCE_DATA_CHECK_INTERVAL = float(os.getenv('REFERENCE_DATA_CHECK_INTERVAL', 1.0))
+    # Longest time a worker serves the public setting flags without checking their version
+    SETTINGS_CHECK_INTERVAL = float(os.getenv('SETTINGS_CHECK_INTERVAL', 1.0))
+    # Number of serialized catalog list responses (courses, departments, schools...) kept in memory
+    RESPONSE_CACHE_SIZE = int(os.getenv('RESPONSE_CACHE_SIZE', 512))
+
+    # Per-endpoint statement count and latency figures, served on /api/v1/admin/metrics/perf
+    PERF_METRICS_ENABLED = _env_flag('PERF_METRICS_ENABLED', 'true')
+    # Requests slower than this, or running more statements, are logged as slow
+    SLOW_REQUEST_MS = float(os.getenv('SLOW_REQUEST_MS', 1000))
+    SLOW_REQUEST_STATEMENTS = int(os.getenv('SLOW_REQUEST_STATEMENTS', 100))
+
 class ProductionConfig(Config):
     JWT_COOKIE_SECURE = True
     JWT_COOKIE_CSRF_PROTECT = True
@@ -37,13 +132,25 @@ class ProductionConfig(Config):
 class TestingConfig(Config):
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    SQLALCHEMY_ENGINE_OPTIONS = {}
     JWT_SECRET_KEY = 'super-secret-testing-key'
     JWT_COOKIE_CSRF_PROTECT = False
     JWT_TOKEN_LOCATION = ["headers"]
+    # Tests share one application context, so re-check only when a test bumps the data
+    REFERENCE_DATA_CHECK_INTERVAL = 3600.0
+    LECTURER_DIRECTORY_CHECK_INTERVAL = 3600.0
+
+class BenchmarkConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = os.getenv('BENCHMARK_DATABASE_URL', 'sqlite:///benchmark.db')
+    SQLALCHEMY_ENGINE_OPTIONS = database_engine_options(SQLALCHEMY_DATABASE_URI)
+    JWT_SECRET_KEY = 'benchmark-secret-key'
+    JWT_TOKEN_LOCATION = ["headers"]
 
 config = {
     'development': Config,
     'production': ProductionConfig,
     'testing': TestingConfig,
+    'benchmark': BenchmarkConfig,
     'default': Config
 }
\ No newline at end of file
@@ -12,5 +12,10 @@ from .models import (
     CourseAllocation,
     Bulletin,
     Specialization,
-    DepartmentAllocationState
+    DepartmentAllocationState,
+    DepartmentAllocationSummary,
+    UmisPushJob,
+    CacheVersion,
+    UmisInstructor,
+    MailOutboxMessage
 )
\ No newline at end of file
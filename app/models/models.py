@@ -154,6 +154,12 @@ class Level(db.Model):
 
 class ProgramCourse(db.Model):
     __tablename__ = 'program_course'
+    __table_args__ = (
+        # Curriculum tree lookups by program and level (and semester/bulletin)
+        db.Index('ix_program_course_program_level_semester_bulletin', 'program_id', 'level_id', 'semester_id', 'bulletin_id'),
+        # Department course counts filter by program, semester and bulletin without a level
+        db.Index('ix_program_course_program_semester_bulletin', 'program_id', 'semester_id', 'bulletin_id'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
 
@@ -197,7 +203,10 @@ class AcademicSession(db.Model):
 
 class CourseAllocation(db.Model):
     __table_args__ = (
+        # Also serves lookups by (program_course_id, session_id, semester_id) through its left prefix
         db.UniqueConstraint('program_course_id', 'session_id', 'semester_id', 'group_name', name='uq_allocation_group'),
+        # Department/semester reports: filter by session and semester, then join on program_course_id
+        db.Index('ix_course_allocation_session_semester_pc', 'session_id', 'semester_id', 'program_course_id'),
     )
 
     id = db.Column(db.Integer, primary_key=True)
@@ -268,6 +277,33 @@ class DepartmentAllocationState(db.Model):
         db.UniqueConstraint('department_id', 'session_id', 'semester_id', name='_department_session_semester_uc'),
     )
 
+class DepartmentAllocationSummary(db.Model):
+    """
+    Per department, session and semester allocation counters, kept up to date by
+    every allocation write so that overview and metrics reads are plain lookups.
+    Rows marked stale (after curriculum changes) are recomputed on the next read.
+    """
+    __tablename__ = 'department_allocation_summary'
+
+    # Session and semester lead the key so that overview and metrics reads are key prefix scans
+    session_id = db.Column(db.Integer, db.ForeignKey('academic_session.id'), primary_key=True)
+    semester_id = db.Column(db.Integer, db.ForeignKey('semester.id'), primary_key=True)
+    department_id = db.Column(db.Integer, db.ForeignKey('department.id'), primary_key=True)
+
+    total_courses = db.Column(db.Integer, default=0, nullable=False)
+    allocated_courses = db.Column(db.Integer, default=0, nullable=False)
+    allocation_groups = db.Column(db.Integer, default=0, nullable=False)
+    pushed_count = db.Column(db.Integer, default=0, nullable=False)
+    last_allocation_at = db.Column(db.DateTime, nullable=True)
+    last_activity_at = db.Column(db.DateTime, nullable=True)
+    is_stale = db.Column(db.Boolean, default=False, nullable=False)
+    # Incremented on every write of the row; the print report cache is keyed on it
+    version = db.Column(db.Integer, default=0, nullable=False)
+    updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
+
+    def __repr__(self):
+        return f'<DepartmentAllocationSummary {self.department_id}/{self.session_id}/{self.semester_id}>'
+
 class AppSetting(db.Model):
     __tablename__ = 'app_setting'
 
@@ -279,4 +315,131 @@ class AppSetting(db.Model):
     updated_at = db.Column(db.DateTime, default=datetime.now(timezone.utc), onupdate=datetime.now(timezone.utc))
 
     def __repr__(self):
-        return f'<AppSetting {self.setting_name}={self.is_enabled}>'
\ No newline at end of file
+        return f'<AppSetting {self.setting_name}={self.is_enabled}>'
+
+class CacheVersion(db.Model):
+    """
+    A counter per cached dataset (e.g. 'reference_data'). Writers bump it in the
+    transaction that changes the data; every worker compares it with the version
+    of its in-memory copy and reloads when they differ.
+    """
+    __tablename__ = 'cache_version'
+
+    name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, default=0, nullable=False)
+    updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
+
+    def __repr__(self):
+        return f'<CacheVersion {self.name}={self.version}>'
+
+class UmisPushJob(db.Model):
+    __tablename__ = 'umis_push_job'
+
+    id = db.Column(db.Integer, primary_key=True)
+    # 'bulk' pushes a department's semester, 'course' pushes a single program course
+    job_type = db.Column(db.String(20), nullable=False)
+    status = db.Column(
+        db.Enum("pending", "running", "completed", "failed", name="umis_push_job_status"),
+        default="pending", nullable=False
+    )
+
+    department_id = db.Column(db.Integer, db.ForeignKey('department.id'), nullable=True)
+    semester_id = db.Column(db.Integer, db.ForeignKey('semester.id'), nullable=True)
+    session_id = db.Column(db.Integer, db.ForeignKey('academic_session.id'), nullable=True)
+    program_course_id = db.Column(db.Integer, db.ForeignKey('program_course.id'), nullable=True)
+    requested_by_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+
+    # Progress counters, updated by the worker as it goes
+    total_count = db.Column(db.Integer, default=0, nullable=False)
+    pushed_count = db.Column(db.Integer, default=0, nullable=False)
+    failed_count = db.Column(db.Integer, default=0, nullable=False)
+    errors = db.Column(db.Text, nullable=True)  # JSON list of failure messages
+    keyfields = db.Column(db.Text, nullable=True)  # JSON list of UMIS keyfields
+
+    worker_id = db.Column(db.String(100), nullable=True)
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    started_at = db.Column(db.DateTime, nullable=True)
+    # Bumped by the worker after each committed chunk; a running job without a recent one is requeued
+    heartbeat_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    requested_by = db.relationship('User', foreign_keys=[requested_by_id])
+
+    __table_args__ = (
+        db.Index('ix_umis_push_job_status_created', 'status', 'created_at'),
+    )
+
+    @property
+    def pending_count(self):
+        return max(self.total_count - self.pushed_count - self.failed_count, 0)
+
+class UmisInstructor(db.Model):
+    """
+    Snapshot of the UMIS instructor directory, replaced as a whole on every refresh
+    so that logins and faculty lists look instructors up locally instead of
+    downloading the full list from UMIS.
+    """
+    __tablename__ = 'umis_instructor'
+
+    instructor_id = db.Column(db.String(50), primary_key=True)
+    name = db.Column(db.String(150), nullable=True)
+    email = db.Column(db.String(120), nullable=True)
+    umis_department_id = db.Column(db.String(50), nullable=True)
+    department_name = db.Column(db.String(150), nullable=True)
+    umis_school_id = db.Column(db.String(50), nullable=True)
+    school_name = db.Column(db.String(150), nullable=True)
+    is_hod = db.Column(db.Boolean, default=False, nullable=False)
+    refreshed_at = db.Column(db.DateTime, nullable=False)
+
+    __table_args__ = (
+        db.Index('ix_umis_instructor_department_name', 'department_name'),
+        db.Index('ix_umis_instructor_department_id', 'umis_department_id'),
+    )
+
+    def to_umis(self):
+        """Returns the instructor in the shape of a UMIS instructor list entry."""
+        return {
+            'instructorid': self.instructor_id,
+            'instructorname': self.name,
+            'email': self.email,
+            'departmentid': self.umis_department_id,
+            'departmentname': self.department_name,
+            'schoolid': self.umis_school_id,
+            'schoolname': self.school_name,
+            'headofdepartment': 'Yes' if self.is_hod else 'No',
+        }
+
+    def __repr__(self):
+        return f'<UmisInstructor {self.instructor_id}>'
+
+class MailOutboxMessage(db.Model):
+    """
+    An email waiting to be sent, or already sent, by the mail outbox worker.
+    Messages are queued in the transaction that creates what they announce.
+    """
+    __tablename__ = 'mail_outbox'
+
+    id = db.Column(db.Integer, primary_key=True)
+    recipient = db.Column(db.String(254), nullable=False)
+    subject = db.Column(db.String(255), nullable=False)
+    body = db.Column(db.Text, nullable=False)
+    status = db.Column(
+        db.Enum("pending", "sending", "sent", "failed", name="mail_outbox_status"),
+        default="pending", nullable=False
+    )
+    attempts = db.Column(db.Integer, default=0, nullable=False)
+    last_error = db.Column(db.Text, nullable=True)
+
+    worker_id = db.Column(db.String(100), nullable=True)
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    # Pending messages are not sent before this time, so that retries back off
+    next_attempt_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
+    claimed_at = db.Column(db.DateTime, nullable=True)
+    sent_at = db.Column(db.DateTime, nullable=True)
+
+    __table_args__ = (
+        db.Index('ix_mail_outbox_status_next_attempt', 'status', 'next_attempt_at'),
+    )
+
+    def __repr__(self):
+        return f'<MailOutboxMessage {self.id} {self.status}>'
@@ -1,11 +1,14 @@
 import os
 
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, current_app, request, jsonify
 from flask_jwt_extended import jwt_required, current_user
 from app.services.admin_user_service import get_all_admin_users, create_admin_user, create_admin_users_batch
 from app.models.models import AppSetting, Semester
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
 from app.extensions import db
-from app.services.umis_auth_service import auth_dev_user
+from app.db_pool import pool_status
+from app.services import faculty_sync_service, mail_outbox_service, perf_metrics_service, reference_data_service, settings_service, umis_directory_service
 
 admin_user_bp = Blueprint('admin_users', __name__, url_prefix='/api/v1/admin')
 
@@ -64,6 +67,33 @@ def handle_create_admin_users_batch():
         "count": count
     }), 201
 
+@admin_user_bp.route('/mail-outbox', methods=['GET'])
+@jwt_required()
+def get_mail_outbox():
+    """
+    Returns how many emails are pending, sending, sent and failed, with the latest failures.
+    Accessible by superadmins only.
+    """
+    if not current_user or not current_user.is_superadmin:
+        return jsonify({"msg": "Unauthorized"}), 403
+
+    return jsonify(mail_outbox_service.get_outbox_summary()), 200
+
+@admin_user_bp.route('/mail-outbox/<int:message_id>', methods=['GET'])
+@jwt_required()
+def get_mail_outbox_message(message_id):
+    """
+    Returns the delivery status of one queued email. Accessible by superadmins only.
+    """
+    if not current_user or not current_user.is_superadmin:
+        return jsonify({"msg": "Unauthorized"}), 403
+
+    status, error = mail_outbox_service.get_message_status(message_id)
+    if error:
+        return jsonify({"error": error}), 404
+
+    return jsonify(status), 200
+
 @admin_user_bp.route('/maintenance-mode', methods=['POST'])
 @jwt_required()
 def set_maintenance_mode():
@@ -80,13 +110,8 @@ def set_maintenance_mode():
     if enable is None or not isinstance(enable, bool):
         return jsonify({"error": "Missing or invalid 'enable' field. Must be true or false."}), 400
 
-    # Find the setting, or create it if it doesn't exist
-    setting = AppSetting.query.filter_by(setting_name='maintenance_mode').first()
-    if not setting:
-        setting = AppSetting(setting_name='maintenance_mode')
-        db.session.add(setting)
-
-    setting.is_enabled = enable
+    # The setting is created if it doesn't exist
+    settings_service.set_setting('maintenance_mode', enable)
     db.session.commit()
 
     return jsonify({"message": f"Maintenance mode has been {'enabled' if enable else 'disabled'}."}), 200
@@ -96,10 +121,8 @@ def get_maintenance_status():
     """
     Returns the current maintenance status of the application. Publicly accessible.
     """
-    setting = AppSetting.query.filter_by(setting_name='maintenance_mode').first()
-    
-    # If the setting doesn't exist in the DB, default to false (not in maintenance)
-    is_maintenance = setting.is_enabled if setting else False
+    # Served from memory; a missing setting means not in maintenance
+    is_maintenance = settings_service.get_flag("isMaintenanceMode")
     
     return jsonify({"isMaintenanceMode": is_maintenance})
 
@@ -119,13 +142,8 @@ def set_close_allocation():
     if enable is None or not isinstance(enable, bool):
         return jsonify({"error": "Missing or invalid 'enable' field. Must be true or false."}), 400
 
-    # Find the setting, or create it if it doesn't exist
-    setting = AppSetting.query.filter_by(setting_name='close_allocation').first()
-    if not setting:
-        setting = AppSetting(setting_name='close_allocation')
-        db.session.add(setting)
-
-    setting.is_enabled = enable
+    # The setting is created if it doesn't exist
+    settings_service.set_setting('close_allocation', enable)
     db.session.commit()
 
     return jsonify({"message": f"Allocation close state has been {'enabled' if enable else 'disabled'}."}), 200
@@ -135,21 +153,72 @@ def get_close_allocation_status():
     """
     Returns the current state of allocation season of the application.
     """
-    setting = AppSetting.query.filter_by(setting_name='close_allocation').first()
-    
-    # If the setting doesn't exist in the DB, default to false (not in maintenance)
-    is_closed = setting.is_enabled if setting else False
+    # Served from memory; a missing setting means allocation is open
+    is_closed = settings_service.get_flag("isAllocationClosed")
     
     return jsonify({"isAllocationClosed": is_closed})
 
+@admin_user_bp.route('/settings', methods=['GET'])
+def get_settings():
+    """
+    Returns the maintenance, allocation and semester flags in one response.
+    Publicly accessible. Clients poll it with If-None-Match and get a 304 while
+    nothing has changed.
+    """
+    flags = settings_service.get_flags()
+
+    response = jsonify(flags)
+    response.set_etag(settings_service.flags_etag(flags))
+    response.headers['Cache-Control'] = 'no-cache'
+    return response.make_conditional(request)
+
+@admin_user_bp.route('/health', methods=['GET'])
+def get_health():
+    """
+    Checks the database with a trivial query and reports the connection pool of
+    this worker: connections checked out, overflow in use and checkout wait times.
+    Publicly accessible for load balancers; answers 503 when the database is down.
+    """
+    pool = pool_status(db.engine)
+    try:
+        db.session.execute(text("SELECT 1"))
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        current_app.logger.error(f"Health check failed: {str(e)}")
+        return jsonify({"status": "error", "database": "unavailable", "pool": pool}), 503
+
+    return jsonify({"status": "ok", "database": "ok", "pool": pool}), 200
+
+@admin_user_bp.route('/metrics/perf', methods=['GET'])
+@jwt_required()
+def get_perf_metrics():
+    """
+    Returns the statement count, database, serialization and total time of every
+    endpoint served by this worker, slowest overall first.
+    """
+    if not current_user or not current_user.is_superadmin:
+        return jsonify({"msg": "Unauthorized"}), 403
+
+    return jsonify({"endpoints": perf_metrics_service.get_report()}), 200
+
+@admin_user_bp.route('/metrics/perf', methods=['DELETE'])
+@jwt_required()
+def reset_perf_metrics():
+    """
+    Clears the figures of this worker, e.g. before measuring a release.
+    """
+    if not current_user or not current_user.is_superadmin:
+        return jsonify({"msg": "Unauthorized"}), 403
+
+    perf_metrics_service.reset()
+    return '', 204
+
 @admin_user_bp.route('/first-semester-status', methods=['GET'])
 def get_first_semester_status():
     """
     Returns the current state of first semester.
     """
-    first_sem = Semester.query.filter_by(name='First Semester').first()
-    
-    is_active = first_sem.is_active if first_sem else False
+    is_active = settings_service.get_flag("isFirstSemesterActive")
     
     return jsonify({"isFirstSemesterActive": is_active})
 
@@ -176,6 +245,8 @@ def set_first_semester_status():
         db.session.add(setting)
 
     setting.is_active = enable
+    reference_data_service.bump()
+    settings_service.bump()
     db.session.commit()
 
     return jsonify({"message": f"First semester active state has been {'enabled' if enable else 'disabled'}."}), 200
@@ -185,9 +256,7 @@ def get_second_semester_status():
     """
     Returns the current state of second semester.
     """
-    second_sem = Semester.query.filter_by(name='Second Semester').first()
-    
-    is_active = second_sem.is_active if second_sem else False
+    is_active = settings_service.get_flag("isSecondSemesterActive")
     
     return jsonify({"isSecondSemesterActive": is_active})
 
@@ -214,6 +283,8 @@ def set_second_semester_status():
         db.session.add(setting)
 
     setting.is_active = enable
+    reference_data_service.bump()
+    settings_service.bump()
     db.session.commit()
 
     return jsonify({"message": f"Second semester active state has been {'enabled' if enable else 'disabled'}."}), 200
@@ -223,9 +294,7 @@ def get_summer_semester_status():
     """
     Returns the current state of summer semester.
     """
-    summer_sem = Semester.query.filter_by(name='Summer Semester').first()
-    
-    is_active = summer_sem.is_active if summer_sem else False
+    is_active = settings_service.get_flag("isSummerSemesterActive")
     
     return jsonify({"isSummerSemesterActive": is_active})
 
@@ -252,6 +321,8 @@ def set_summer_semester_status():
         db.session.add(setting)
 
     setting.is_active = enable
+    reference_data_service.bump()
+    settings_service.bump()
     db.session.commit()
 
     return jsonify({"message": f"Summer semester active state has been {'enabled' if enable else 'disabled'}."}), 200
@@ -260,23 +331,52 @@ def set_summer_semester_status():
 @jwt_required()
 def get_umis_faculty_list():
     """
-    Fetches the list of faculties from UMIS. Accessible by superadmins and vetters.
+    Returns the faculty list from the local UMIS instructor directory. Accessible by superadmins and vetters.
     """
     if not current_user or not (current_user.is_vetter or current_user.is_superadmin):
         return jsonify({"msg": "Unauthorized"}), 403
-    
-    
-    umisid = os.getenv('API_DEV_ID')
-    umis_token, auth_error = auth_dev_user()
-    
-    if auth_error:
-        return jsonify({"error": f"Failed to authenticate with UMIS: {auth_error}"}), 500
-    
-    # This function should call the UMIS service to fetch the faculty list
+
     from app.services.admin_user_service import fetch_umis_faculties
-    faculties, error = fetch_umis_faculties(umis_token, umisid)
+    faculties, error = fetch_umis_faculties()
     
     if error:
         return jsonify({"error": error}), 500
     
-    return jsonify({"faculties": faculties}), 200
\ No newline at end of file
+    return jsonify({"faculties": faculties}), 200
+
+@admin_user_bp.route('/umis-faculty-list/refresh', methods=['POST'])
+@jwt_required()
+def refresh_umis_faculty_list():
+    """
+    Downloads the instructor directory from UMIS now instead of waiting for it to expire.
+    Accessible by superadmins only.
+    """
+    if not current_user or not current_user.is_superadmin:
+        return jsonify({"msg": "Unauthorized"}), 403
+
+    count, error = umis_directory_service.refresh_directory()
+    if error:
+        return jsonify({"error": error}), 502
+
+    return jsonify({"message": f"UMIS directory refreshed with {count} instructor(s)", "count": count}), 200
+
+@admin_user_bp.route('/umis-faculty-sync', methods=['POST'])
+@jwt_required()
+def sync_umis_faculty():
+    """
+    Creates and updates lecturers, their user accounts and HOD roles from the UMIS
+    instructor directory. Send {"dry_run": true} to only see what would change, and
+    {"refresh": false} to use the stored directory without downloading it.
+    Accessible by superadmins only.
+    """
+    if not current_user or not current_user.is_superadmin:
+        return jsonify({"msg": "Unauthorized"}), 403
+
+    data = request.get_json(silent=True) or {}
+    report, error = faculty_sync_service.sync_faculty(
+        refresh=bool(data.get('refresh', True)), dry_run=bool(data.get('dry_run', False))
+    )
+    if error:
+        return jsonify({"error": error}), 502
+
+    return jsonify(report), 200
@@ -1,6 +1,6 @@
 from flask_jwt_extended import jwt_required, current_user
-from flask import Blueprint, request, jsonify, current_app
-from sqlalchemy import or_
+from flask import Blueprint, request, jsonify, current_app, Response
+from sqlalchemy import or_, insert
 from app import db
 from app.models import (
     Program, ProgramCourse, 
@@ -8,8 +8,12 @@ from app.models import (
     Lecturer, AcademicSession, User, Specialization, Bulletin,
     DepartmentAllocationState, Department
 )
-from app.services.umis_auth_service import auth_dev_user
 import app.services.allocation_service as allocation_service
+import app.services.umis_job_service as umis_job_service
+import app.services.allocation_summary_service as allocation_summary_service
+import app.services.allocation_report_service as allocation_report_service
+import app.services.lecturer_directory_service as lecturer_directory_service
+import app.services.reference_data_service as reference_data_service
 from app.services.allocation_service import get_allocation_status_overview
 from collections import defaultdict
 from flask import session
@@ -45,7 +49,7 @@ def get_allocation_submission_summer_status(semester_name):
     if not current_user.is_hod:
         return jsonify({"error": "Unauthorized: Only HODs can check submission status."}), 403
     
-    semester = Semester.query.filter_by(name=semester_name).first()
+    semester = reference_data_service.semester_by_name(semester_name)
     
     department_id = current_user.department_id
     is_submitted, error = allocation_service.get_allocation_status(department_id, semester.id)
@@ -203,7 +207,7 @@ def get_hod_course_allocations():
     department = current_user.lecturer.department
     
     programs = Program.query.filter_by(department_id=department.id).all()
-    semesters = Semester.query.all()  # Or filtered by active session
+    semesters = reference_data_service.semesters()  # Or filtered by active session
 
     output = []
     for semester in semesters:
@@ -225,7 +229,7 @@ def get_hod_course_allocations():
             for level_row in level_ids:
                 # level = level_row.level
                 level_id = level_row.level_id
-                level = db.session.get(Level, level_id)
+                level = reference_data_service.level(level_id)
 
                 level_data = {"id": str(level.id), "name": f"{level.name} Level", "courses": []}
                 
@@ -280,19 +284,18 @@ def get_allocations_by_department_route():
 @allocation_bp.route('/detailed-list', methods=['GET'])
 @jwt_required()
 def get_detailed_course_list_for_allocation():
+    """
+    Lists the department's courses per active semester, program and level with
+    their allocation status. Program courses, allocations and their related rows
+    are each loaded once and grouped in Python, so the number of queries does not
+    depend on the size of the department.
+    """
     department = current_user.lecturer.department
     programs = Program.query.filter_by(department_id=department.id).all()
-    semesters = Semester.query.filter_by(is_active=True).all() # Or filtered by active session (semesters = Semester.query.all())
-    session = AcademicSession.query.filter_by(is_active=True).first()
-    active_bulletin = Bulletin.query.filter_by(is_active=True).first()
-
-    # Debugging
-    # current_app.logger.info("=== /detailed-list DIAGNOSTICS ===")
-    # current_app.logger.info(f"  Department     : id={department.id}, name={department.name}")
-    # current_app.logger.info(f"  Programs       : {[(p.id, p.name) for p in programs]}")
-    # current_app.logger.info(f"  Active Semesters: {[(s.id, s.name) for s in semesters]}")
-    # current_app.logger.info(f"  Active Session : id={session.id if session else None}, name={session.name if session else None}")
-    # current_app.logger.info(f"  Active Bulletin: id={active_bulletin.id if active_bulletin else None}, name={active_bulletin.name if active_bulletin else None}")
+    all_semesters = reference_data_service.semesters()
+    semesters = [s for s in all_semesters if s.is_active] # Or filtered by active session (semesters = all_semesters)
+    session = reference_data_service.active_session()
+    active_bulletin = reference_data_service.active_bulletin()
 
     if not session:
         return jsonify({"error": "No active session found"}), 404
@@ -305,11 +308,13 @@ def get_detailed_course_list_for_allocation():
         ProgramCourse.program_id.in_(program_ids)
     )
 
-    # Fetch ALL allocations for this department in the current session.
+    # Fetch ALL allocations for this department in the current session, with their lecturers' names.
     # This will now include allocations from previous bulletins.
     all_allocations_for_session = CourseAllocation.query.filter(
         CourseAllocation.session_id == session.id,
         CourseAllocation.program_course_id.in_(all_department_pc_ids_query)
+    ).options(
+        db.selectinload(CourseAllocation.lecturer_profile).selectinload(Lecturer.user_account)
     ).all()
 
     # Create a set of ProgramCourse IDs that have been allocated in this session.
@@ -320,62 +325,57 @@ def get_detailed_course_list_for_allocation():
     for alloc in all_allocations_for_session:
         key = (alloc.program_course_id, alloc.semester_id)
         allocations_map[key].append(alloc)
-    
-    # Pre-fetch semester objects for logic handling
-    first_semester = Semester.query.filter_by(name='First Semester').first()
-    second_semester = Semester.query.filter_by(name='Second Semester').first()
-    third_semester = Semester.query.filter_by(name='Summer Semester').first()
+
+    # Every course that is in the active bulletin OR has an allocation this session, loaded once
+    program_courses = ProgramCourse.query.filter(
+        ProgramCourse.program_id.in_(program_ids),
+        or_(
+            ProgramCourse.bulletin_id == active_bulletin.id,
+            ProgramCourse.id.in_(allocated_pc_ids)
+        )
+    ).options(
+        db.selectinload(ProgramCourse.course),
+        db.selectinload(ProgramCourse.specializations),
+        db.selectinload(ProgramCourse.level)
+    ).order_by(ProgramCourse.id).all()
+
+    # Group them by program, level and semester
+    courses_by_program_level = defaultdict(lambda: defaultdict(lambda: defaultdict(list)))
+    for pc in program_courses:
+        courses_by_program_level[pc.program_id][pc.level_id][pc.semester_id].append(pc)
+
+    # Semester objects for logic handling
+    semesters_by_name = {s.name: s for s in all_semesters}
+    first_semester = semesters_by_name.get('First Semester')
+    second_semester = semesters_by_name.get('Second Semester')
+    third_semester = semesters_by_name.get('Summer Semester')
     first_and_second_sem_ids = [s.id for s in [first_semester, second_semester] if s]
 
     output = []
     for semester in semesters:
         semester_data = {"sessionId": session.id, "sessionName": session.name, "id": semester.id, "name": semester.name, "programs": []}
-        
+
+        # The summer semester offers the courses of both first and second semesters
+        if third_semester and semester.id == third_semester.id:
+            course_semester_ids = first_and_second_sem_ids
+        else:
+            course_semester_ids = [semester.id]
+
         for program in programs:
             program_data = {"id": program.id, "name": program.name, "levels": []}
-            
-            # Get levels that EITHER have courses in the active bulletin OR have courses allocated in this session.
-            level_ids_query = db.session.query(ProgramCourse.level_id).filter(
-                ProgramCourse.program_id == program.id,
-                or_(
-                    ProgramCourse.bulletin_id == active_bulletin.id,
-                    ProgramCourse.id.in_(allocated_pc_ids)
+
+            for level_courses in courses_by_program_level[program.id].values():
+                level_program_courses = sorted(
+                    (pc for sem_id in course_semester_ids for pc in level_courses.get(sem_id, [])),
+                    key=lambda pc: pc.id
                 )
-            ).distinct()
-            level_ids = level_ids_query.all()
-            
-            for level_row in level_ids:
-                level_id = level_row.level_id
-                level = db.session.get(Level, level_id)
+                if not level_program_courses:
+                    continue
+
+                level = level_program_courses[0].level
                 level_data = {"id": str(level.id), "name": f"{level.name} Level", "courses": []}
-                
-        
-                # Base query that will be modified
-                base_query = ProgramCourse.query.filter(
-                    ProgramCourse.program_id == program.id,
-                    ProgramCourse.level_id == level.id,
-                    # A course must be in the active bulletin OR have an allocation this session
-                    or_(
-                        ProgramCourse.bulletin_id == active_bulletin.id,
-                        ProgramCourse.id.in_(allocated_pc_ids)
-                    )
-                )
-                
-                # Conditional logic for fetching courses by semester
-                if third_semester and semester.id == third_semester.id:
-                    if not first_and_second_sem_ids:
-                        continue
-                    program_courses_query = base_query.filter(
-                        ProgramCourse.semester_id.in_(first_and_second_sem_ids)
-                    )
-                else:
-                    program_courses_query = base_query.filter(
-                        ProgramCourse.semester_id == semester.id
-                    )
-
-                program_courses = program_courses_query.distinct()
 
-                for pc in program_courses:
+                for pc in level_program_courses:
                     course = pc.course
                     specializations = [spec.name for spec in pc.specializations]
                     allocations = allocations_map.get((pc.id, semester.id))
@@ -404,10 +404,9 @@ def get_detailed_course_list_for_allocation():
                             "isAllocated": bool(allocations),
                             "allocatedTo": ", ".join(allocated_to_names) if allocated_to_names else None
                         })
-                
-                if level_data["courses"]:
-                    level_data["courses"].sort(key=lambda c: (c['specialization'], c['code']))
-                    program_data["levels"].append(level_data)
+
+                level_data["courses"].sort(key=lambda c: (c['specialization'], c['code']))
+                program_data["levels"].append(level_data)
 
             if program_data["levels"]:
                 program_data["levels"].sort(key=lambda level: int(level['name'].split()[0]))
@@ -526,119 +525,64 @@ def get_detailed_course_list_for_allocation():
         
 #     return jsonify(output)
 
-@allocation_bp.route('/print', methods=['POST'])
-@jwt_required()
-def get_allocation_report(): # Renamed for clarity
-
+def _allocation_report_for_request():
+    """
+    Resolves the department in the request body and returns (report, error response).
+    """
     data = request.get_json()
     department_id = data.get('department_id')
 
-    # Get Department object for easier access to programs
-    department = db.session.get(Department, department_id)
-    if not department:
-        return jsonify({"error": "Department not found"}), 404
-        
-    programs = department.programs
-    semesters = Semester.query.all()
-    session = AcademicSession.query.filter_by(is_active=True).first()
-
+    session = reference_data_service.active_session()
     if not session:
-        return jsonify({"error": "No active session found"}), 404
-
-    # Pre-fetch ONLY allocated ProgramCourse IDs ---
-    # Get all ProgramCourse IDs relevant to the programs in this department.
-    program_ids = [p.id for p in programs]
-    relevant_pc_ids_query = db.session.query(ProgramCourse.id).filter(ProgramCourse.program_id.in_(program_ids))
+        return None, (jsonify({"error": "No active session found"}), 404)
 
-    # Fetch all allocations for these courses in the current session in ONE query.
-    all_allocations_for_session = CourseAllocation.query.filter(
-        CourseAllocation.session_id == session.id,
-        CourseAllocation.program_course_id.in_(relevant_pc_ids_query)
-    ).all()
-
-    # Create a set of ONLY the ProgramCourse IDs that are allocated.
-    # This is the key to our filtering.
-    allocated_pc_ids = {alloc.program_course_id for alloc in all_allocations_for_session}
-
-    # Create a fast lookup dictionary (map).
-    allocations_map = defaultdict(list)
-    for alloc in all_allocations_for_session:
-        key = (alloc.program_course_id, alloc.semester_id)
-        allocations_map[key].append(alloc)
-    
-    first_semester = Semester.query.filter_by(name='First Semester').first()
-    second_semester = Semester.query.filter_by(name='Second Semester').first()
-    third_semester = Semester.query.filter_by(name='Summer Semester').first()
-    first_and_second_sem_ids = [s.id for s in [first_semester, second_semester] if s]
+    report, error = allocation_report_service.get_allocation_report(department_id, session)
+    if error:
+        return None, (jsonify({"error": error}), 404)
 
-    output = []
-    for semester in semesters:
-        semester_data = {"sessionId": session.id, "sessionName": session.name, "id": semester.id, "name": semester.name, "programs": []}
-        
-        for program in programs:
-            program_data = {"id": program.id, "name": program.name, "levels": []}
-            
-            # Query levels based on ONLY allocated courses
-            level_ids = db.session.query(ProgramCourse.level_id).filter(
-                ProgramCourse.program_id == program.id,
-                ProgramCourse.id.in_(allocated_pc_ids) # Filter by allocated IDs
-            ).distinct().all()
-            
-            for level_row in level_ids:
-                level_id = level_row.level_id
-                level = db.session.get(Level, level_id)
-                level_data = {"id": str(level.id), "name": f"{level.name} Level", "courses": []}
-                
-                # Base query for program and level
-                base_query = ProgramCourse.query.filter(
-                    ProgramCourse.program_id == program.id, 
-                    ProgramCourse.level_id == level.id,
-                    ProgramCourse.id.in_(allocated_pc_ids) # CRITICAL: Only get allocated courses
-                )
+    return report, None
 
-                # Conditional logic for semester
-                if third_semester and semester.id == third_semester.id:
-                    if not first_and_second_sem_ids: continue
-                    program_courses_query = base_query.filter(ProgramCourse.semester_id.in_(first_and_second_sem_ids))
-                else:
-                    program_courses_query = base_query.filter(ProgramCourse.semester_id == semester.id)
+@allocation_bp.route('/print', methods=['POST'])
+@jwt_required()
+def get_allocation_report(): # Renamed for clarity
+    report, error_response = _allocation_report_for_request()
+    if error_response:
+        return error_response
 
-                # Now `program_courses` contains ONLY allocated courses
-                program_courses = program_courses_query.distinct()
+    return jsonify(report)
 
-                for pc in program_courses:
-                    course = pc.course
-                    allocations = allocations_map.get((pc.id, semester.id), [])
+@allocation_bp.route('/print/stream', methods=['POST'])
+@jwt_required()
+def stream_allocation_report():
+    """
+    Returns the print report as NDJSON, one line per semester, program and level.
+    The report is built (or read from the cache) before the response starts; the
+    route keeps its /stream path for existing clients.
+    """
+    report, error_response = _allocation_report_for_request()
+    if error_response:
+        return error_response
 
-                    # No 'if' check needed here, because we know allocations exist
-                    allocated_to_names = [
-                        alloc.lecturer_profile.user_account[0].name
-                        for alloc in allocations 
-                        if alloc.lecturer_profile and alloc.lecturer_profile.user_account
-                    ]
+    return Response(allocation_report_service.iter_report_ndjson(report), mimetype='application/x-ndjson')
 
-                    level_data["courses"].append({
-                        "id": str(course.id),
-                        "programCourseId": pc.id,
-                        "code": course.code,
-                        "title": course.title,
-                        "unit": course.units,
-                        "isAllocated": True,
-                        "allocatedTo": ", ".join(allocated_to_names) if allocated_to_names else None
-                    })
+@allocation_bp.route('/print/csv', methods=['POST'])
+@jwt_required()
+def export_allocation_report_csv():
+    """
+    Exports the print report as a CSV file with one row per allocated course.
+    """
+    report, error_response = _allocation_report_for_request()
+    if error_response:
+        return error_response
 
-                if level_data["courses"]:
-                    program_data["levels"].append(level_data)
+    department = db.session.get(Department, request.get_json().get('department_id'))
+    filename = f"allocation_report_{department.acronym or department.id}.csv"
 
-            if program_data["levels"]:
-                program_data["levels"].sort(key=lambda level: int(level['name'].split()[0]))    
-                semester_data["programs"].append(program_data)
-        
-        # Only add the semester if it has programs with allocated courses
-        if semester_data["programs"]:
-            output.append(semester_data)
-        
-    return jsonify(output)
+    return Response(
+        allocation_report_service.iter_report_csv(report),
+        mimetype='text/csv',
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
 
 
 @allocation_bp.route('/allocate/lecturers', methods=['GET'])
@@ -702,6 +646,125 @@ def is_number(value):
     except ValueError:
         return False
 
+class LecturerNotFound(Exception):
+    pass
+
+def _resolve_allocation_batch(data_list, session):
+    """
+    Validates a list of group allocations and returns (rows to insert, department/semester
+    pairs whose summaries change). Every distinct semester, program, program course and
+    existing group in the payload is resolved with one query per kind; lecturers are
+    looked up by lecturerId, staffId or name in the lecturer directory.
+
+    Groups are checked in payload order and the first invalid one raises ValueError
+    (or LecturerNotFound), so nothing is written unless the whole list is valid.
+    """
+    semesters = reference_data_service.semesters()
+    semesters_by_id = {s.id: s for s in semesters}
+    semesters_by_name = {}
+    for semester in semesters:
+        semesters_by_name.setdefault(semester.name, semester)
+
+    program_names = {data.get("programId") for data in data_list if is_number(data.get("programId")) is False}
+    programs_by_name = {}
+    if program_names:
+        for program in Program.query.filter(Program.name.in_(program_names)).order_by(Program.id).all():
+            programs_by_name.setdefault(program.name, program)
+
+    # Resolve the ids of every group first; lookups that fail are reported in order below
+    parsed = []
+    for data in data_list:
+        semesterid = data.get("semesterId")
+        semester = semesters_by_name.get(semesterid) if is_number(semesterid) is False else None
+        semester_id = semester.id if semester else (int(semesterid) if is_number(semesterid) else None)
+
+        programid = data.get("programId")
+        program = programs_by_name.get(programid) if is_number(programid) is False else None
+        program_id = program.id if program else (int(programid) if is_number(programid) else None)
+
+        parsed.append((data, semester_id, program_id))
+
+    program_ids = {program_id for _, _, program_id in parsed if program_id is not None}
+    course_ids = {int(data.get("courseId")) for data, _, _ in parsed if is_number(data.get("courseId"))}
+    level_ids = {int(data.get("levelId")) for data, _, _ in parsed if is_number(data.get("levelId"))}
+
+    # Program courses by (program, course, level, semester), plus any semester for summer allocations
+    program_courses = {}
+    program_courses_any_semester = {}
+    if program_ids and course_ids and level_ids:
+        candidates = ProgramCourse.query.filter(
+            ProgramCourse.program_id.in_(program_ids),
+            ProgramCourse.course_id.in_(course_ids),
+            ProgramCourse.level_id.in_(level_ids)
+        ).options(db.joinedload(ProgramCourse.program)).order_by(ProgramCourse.id).all()
+        for pc in candidates:
+            program_courses.setdefault((pc.program_id, pc.course_id, pc.level_id, pc.semester_id), pc)
+            program_courses_any_semester.setdefault((pc.program_id, pc.course_id, pc.level_id), pc)
+
+    existing_groups = set()
+    pc_ids = {pc.id for pc in program_courses.values()}
+    if pc_ids:
+        existing_groups = {
+            (row.program_course_id, row.semester_id, row.group_name)
+            for row in db.session.query(
+                CourseAllocation.program_course_id, CourseAllocation.semester_id, CourseAllocation.group_name
+            ).filter(
+                CourseAllocation.session_id == session.id,
+                CourseAllocation.program_course_id.in_(pc_ids)
+            ).all()
+        }
+
+    allocations_to_create = []
+    summaries_to_refresh = set()
+
+    for data, semester_id, program_id in parsed:
+        group_name = data.get("groupName")
+
+        # check if semesterId is a number - it could semester name if coming from specialization allocation
+        if semester_id is None:
+            raise ValueError(f"Error for '{group_name}': Semester '{data.get('semesterId')}' not found.")
+        if program_id is None:
+            raise ValueError(f"Error for '{group_name}': Program '{data.get('programId')}' not found.")
+
+        level_id = int(data.get("levelId"))
+        course_id = int(data.get("courseId"))
+
+        # Check if semester is summer semester and adjust logic accordingly
+        semest = semesters_by_id.get(semester_id)
+        if semest and semest.name == "Summer Semester":
+            pc = program_courses_any_semester.get((program_id, course_id, level_id))
+        else:
+            pc = program_courses.get((program_id, course_id, level_id, semester_id))
+
+        if not pc:
+            raise ValueError(f"Error for '{group_name}': Course not found in the specified program/level.")
+
+        # Lecturers come from the in-memory directory, searching the course's department first
+        lecturer_id = lecturer_directory_service.resolve_lecturer(data, pc.program.department_id)
+        if not lecturer_id:
+            raise LecturerNotFound(f"Lecturer '{lecturer_directory_service.lecturer_reference(data)}' not found.")
+
+        # Check for existing allocation, including groups repeated in the payload
+        if (pc.id, semester_id, group_name) in existing_groups:
+            raise ValueError(f"Error for '{group_name}': An allocation already exists for this group.")
+        existing_groups.add((pc.id, semester_id, group_name))
+
+        allocations_to_create.append({
+            "program_course_id": pc.id,
+            "session_id": session.id,
+            "semester_id": semester_id,
+            "lecturer_id": lecturer_id,
+            "source_bulletin_id": pc.bulletin_id,
+            "group_name": group_name,
+            "is_lead": (group_name.lower() == "group a"),
+            "is_allocated": data.get("isAllocated", False),
+            "class_size": int(data.get("classSize", 0)),
+            "class_option": data.get('class_option')
+        })
+        summaries_to_refresh.add((pc.program.department_id, semester_id))
+
+    return allocations_to_create, summaries_to_refresh
+
 @allocation_bp.route("/allocate", methods=["POST"])
 @jwt_required()
 def allocate_course():
@@ -714,111 +777,30 @@ def allocate_course():
         return jsonify({"error": "Request body must be a non-empty list of allocations."}), 400
     
     # Find active session
-    session = AcademicSession.query.filter_by(is_active=True).first()
+    session = reference_data_service.active_session()
     if not session:
         return jsonify({"error": "No active academic session found."}), 400
 
-    # print("Received allocation data:", data_list)  # Debugging log
     try:
-        allocations_to_create = []
-
         # VALIDATE ALL INCOMING DATA FIRST
-        for index, data in enumerate(data_list):
-            
-            # check if semesterId is a number - it could semester name if coming from specialization allocation
-            semesterid = data.get("semesterId")
-            if is_number(semesterid) is False:
-                semester = Semester.query.filter_by(name=semesterid).first()
-                if not semester:
-                    raise ValueError(f"Error for '{data.get('groupName')}': Semester '{semesterid}' not found.")
-                semester_id = semester.id
-            else:
-                semester_id = int(semesterid)
-
-            programid = data.get("programId")
-            if is_number(programid) is False:
-                program = Program.query.filter_by(name=programid).first()
-                if not program:
-                    raise ValueError(f"Error for '{data.get('groupName')}': Program '{programid}' not found.")
-                program_id = program.id
-            else:
-                program_id = int(programid)
-            
-            # program_id = int(data.get("programId"))
-            level_id = int(data.get("levelId"))
-            course_id = int(data.get("courseId"))
-            semeid = semester_id
-            lecturer_name = data.get("allocatedTo") # Assuming frontend now sends ID
-            group_name = data.get("groupName")
-
-            
-            # Check if semester is summer semester and adjust logic accordingly
-            semest = Semester.query.filter_by(id=semeid).first()
-
-            if semest and semest.name == "Summer Semester":
-                pc = ProgramCourse.query.filter_by(
-                    program_id=program_id,
-                    course_id=course_id,
-                    level_id=level_id
-                ).first()
-                
-            else:
-                # Find program_course
-                pc = ProgramCourse.query.filter_by(
-                    program_id=program_id,
-                    course_id=course_id,
-                    level_id=level_id,
-                    semester_id=semester_id
-                ).first()
-
-            if not pc:
-                # Use raise to fail the entire transaction immediately
-                raise ValueError(f"Error for '{group_name}': Course not found in the specified program/level.")
-
-            # Resolve lecturer by ID
-            lecturer = (
-                Lecturer.query.join(User)
-                .filter(User.name == lecturer_name)
-                .first()
-            )
-            if not lecturer:
-                return jsonify({
-                    "status": "error",
-                    "message": f"Lecturer '{lecturer_name}' not found."
-                }), 404
-
-            # Check for existing allocation
-            existing = CourseAllocation.query.filter_by(
-                program_course_id=pc.id,
-                session_id=session.id,
-                semester_id=semester_id,
-                group_name=group_name
-            ).first()
-            if existing:
-                raise ValueError(f"Error for '{group_name}': An allocation already exists for this group.")
-
-            # If all checks pass, prepare the allocation object
-            allocation_data = {
-                "program_course_id": pc.id,
-                "session_id": session.id,
-                "semester_id": semester_id,
-                "lecturer_id": lecturer.id,
-                "source_bulletin_id": pc.bulletin_id,
-                "group_name": group_name,
-                "is_lead": (group_name.lower() == "group a"),
-                "is_allocated": data.get("isAllocated", False),
-                "class_size": int(data.get("classSize", 0)),
-                "class_option":data.get('class_option')
-            }
-            allocations_to_create.append(allocation_data)
+        try:
+            allocations_to_create, summaries_to_refresh = _resolve_allocation_batch(data_list, session)
+        except LecturerNotFound as e:
+            return jsonify({
+                "status": "error",
+                "message": str(e)
+            }), 404
 
         # CREATE ALL RECORDS IF VALIDATION PASSED
         if not allocations_to_create:
              raise ValueError("No valid allocations to create.")
 
-        for data in allocations_to_create:
-            new_allocation = CourseAllocation(**data)
-            db.session.add(new_allocation)
+        # Insert every group in one statement
+        db.session.execute(insert(CourseAllocation), allocations_to_create)
+
+        # Update the department summaries in the same transaction
+        for department_id, semester_id in summaries_to_refresh:
+            allocation_summary_service.refresh_department_summary(department_id, session.id, semester_id)
 
         # Commit the transaction once, after all records are added
         db.session.commit()
@@ -851,7 +833,7 @@ def get_hod_allocations_by_specialization():
 
     department = current_user.lecturer.department
     programs = Program.query.filter_by(department_id=department.id).all()
-    semesters = Semester.query.all()
+    semesters = reference_data_service.semesters()
 
     output = []
     for semester in semesters:
@@ -866,7 +848,7 @@ def get_hod_allocations_by_specialization():
 
             for level_id_tuple in level_ids:
                 level_id = level_id_tuple[0]
-                level = db.session.get(Level, level_id)
+                level = reference_data_service.level(level_id)
                 level_data = {"id": str(level.id), "name": f"{level.name} Level", "specializations": []}
 
                 # Get all program courses for this level
@@ -948,9 +930,9 @@ def get_courses_for_allocation_by_bulletin():
     semester_name = data.get('semester')
     
     # Fetch bulletin from DB
-    bulletin = Bulletin.query.filter_by(name=bulletin_name).first()
+    bulletin = reference_data_service.bulletin_by_name(bulletin_name)
     program = Program.query.filter_by(name=program_name).first()
-    semester = Semester.query.filter_by(name=semester_name).first()
+    semester = reference_data_service.semester_by_name(semester_name)
 
     if not bulletin or not program or not semester:
         return jsonify({"error": "Invalid bulletin, program, or semester name."}), 404
@@ -965,8 +947,8 @@ def get_courses_for_allocation_by_bulletin():
     )
 
     # Pre-fetch semester objects for logic handling
-    first_semester = Semester.query.filter_by(name='First Semester').first()
-    second_semester = Semester.query.filter_by(name='Second Semester').first()
+    first_semester = reference_data_service.semester_by_name('First Semester')
+    second_semester = reference_data_service.semester_by_name('Second Semester')
     first_and_second_sem_ids = [s.id for s in [first_semester, second_semester] if s]
 
 
@@ -1063,7 +1045,7 @@ def get_allocation_overview():
     try:
         # semesters = Semester.query.order_by(Semester.id).all()
         # departments = Department.query.order_by(Department.name).all()
-        active_session = AcademicSession.query.filter_by(is_active=True).first()
+        active_session = reference_data_service.active_session()
 
         if not active_session:
             return jsonify({"error": "No active academic session found."}), 404
@@ -1083,7 +1065,7 @@ def get_allocation_details():
     program_course_id = request.args.get('program_course_id', type=int)
     semester_id = request.args.get('semester_id', type=int)
     
-    session = AcademicSession.query.filter_by(is_active=True).first()
+    session = reference_data_service.active_session()
     if not session:
         return jsonify({"status": "error", "message": "No active session"}), 404
 
@@ -1132,7 +1114,8 @@ def get_allocation_class_options():
 @jwt_required()
 def push_allocation_to_umis():
     """
-    Pushes ALL allocated groups for a given program_course_id to UMIS.
+    Queues a push of ALL allocated groups for a given program_course_id to UMIS.
+    Returns the job id right away; progress is available from /push-jobs/<job_id>.
     """
     if not current_user.is_vetter and not current_user.is_superadmin:
         return jsonify({"error": "Unauthorized: You are not authorized to perform this transaction."}), 403
@@ -1144,138 +1127,30 @@ def push_allocation_to_umis():
     if not program_course_id:
         return jsonify({"error": "Missing required field: program_course_id"}), 400
 
-    # Find all allocations for the given program_course_id
-    allocations = CourseAllocation.query.filter_by(program_course_id=program_course_id).all()
-
     # Handle the case where no allocations are found
-    if not allocations:
+    if not CourseAllocation.query.filter_by(program_course_id=program_course_id).first():
         return jsonify({"message": "No allocations found for this course to push to UMIS."}), 200
 
     try:
-        # Authenticate ONCE before the loop
-        umis_token, auth_error = auth_dev_user()
-        if auth_error:
-            # If authentication fails, stop immediately.
-            return jsonify({"error": f"Failed to authenticate with UMIS: {auth_error}"}), 500
-
-        successful_pushes = 0
-        failed_pushes = []
-        success_keyfields = []
-
-        pc_id = ""
-
-        # Loop and push EACH allocation
-        for allocation in allocations:
-            # Check if necessary data exists before creating the payload
-            if not allocation.lecturer_profile or not allocation.lecturer_profile.staff_id:
-                failed_pushes.append(f"Allocation for course {allocation.program_course.course.code} has a missing lecturer staff ID.")
-                continue # Skip this allocation and move to the next one
-
-            if allocation.is_pushed_to_umis:
-                # Skip already pushed allocations
-                continue
-
-            # session = allocation.session.name
-            semester = allocation.semester.name
-
-            course_code = allocation.program_course.course.code
-
-            is_level_100, error = allocation_service.identify_100_level_code(course_code)
-            
+        job = umis_job_service.enqueue_course_push(program_course_id, current_user.id)
 
-            if semester.lower() == 'first semester':
-                # if is_level_100:
-                #     quarterid = f"{allocation.session.name}.1C"
-                # else:
-                quarterid = f"{allocation.session.name}.1"
-            elif semester.lower() == 'second semester':
-                
-                # if is_level_100:
-                #     quarterid = f"{allocation.session.name}.2C"
-                # else:
-                quarterid = f"{allocation.session.name}.2"
-            else:
-                quarterid = f"{allocation.session.name}.3"
-
-            payload = {
-                "quarterid": quarterid,
-                "instructorid": allocation.lecturer_profile.staff_id,
-                "courseid": allocation.program_course.course.code, 
-                "org_id": "0",
-                "coursetitle": allocation.program_course.course.title, 
-                "classoption": allocation.class_option,
-                "maxclass": str(allocation.class_size),
-            }
-
-            # Log payload using Flask logger
-            # current_app.logger.info(f"Pushing payload to UMIS:\n{json.dumps(payload, indent=2)}")
-
-            # print(f"Pushing payload for {payload['courseid']} ({payload['classoption']}) to UMIS:", payload)
-            
-            # Push to UMIS
-            is_success, response_data = allocation_service.push_allocation_to_umis(payload, umis_token)
-
-            # allocation.is_pushed_to_umis = True
-            # allocation.pushed_to_umis_by_id = current_user.id # Record the user's ID
-            # allocation.pushed_to_umis_at = datetime.now(timezone.utc) # Record the timestamp
-            # db.session.commit()
-            # Handle the response from the push
-            if is_success:
-
-                # Get response data
-                data_dict = response_data.get('data', {})
-                keyfield = data_dict.get('keyfield')
-                if keyfield:
-                    success_keyfields.append(str(keyfield))
-                
-                #  UPDATE THE ALLOCATION RECORD ON SUCCESS
-                allocation.is_pushed_to_umis = True
-                allocation.pushed_to_umis_by_id = current_user.id # Record the user's ID
-                allocation.pushed_to_umis_at = datetime.now(timezone.utc) # Record the timestamp
-
-                successful_pushes += 1
-            else:
-                pc_id = allocation.program_course_id
-                failed_pushes.append(
-                    f"Course: {payload['courseid']} {payload['classoption']}: {response_data}."
-                )
-        
-        # Commit all changes after processing
-        db.session.commit()
-
-        # Provide a summary response
-        if not failed_pushes:
-            return jsonify({
-                "status": "success",
-                "message": f"Successfully pushed {successful_pushes} allocation(s) to UMIS.\nKeyfields: {', '.join(success_keyfields)}"
-            }), 200
-        else:
-            # check if allocation already pushed
-            if "already exists" in ' '.join(failed_pushes).lower():
-                # update all allocations for this program_course_id as pushed
-                allocations_to_update = CourseAllocation.query.filter_by(program_course_id=pc_id).all()
-                for alloc in allocations_to_update:
-                    alloc.is_pushed_to_umis = True
-                    alloc.pushed_to_umis_by_id = current_user.id
-                    alloc.pushed_to_umis_at = datetime.now(timezone.utc)
-                    
-                db.session.commit()
-            return jsonify({
-                "status": "partial_failure",
-                "message": f"Completed with {len(failed_pushes)} error(s). Successfully pushed {successful_pushes} allocation(s).\n {', '.join(failed_pushes)}",
-                "error": failed_pushes
-            }), 207 # 207 Multi-Status is appropriate for partial successes
+        return jsonify({
+            "status": "queued",
+            "message": f"Push of {job.total_count} allocation(s) to UMIS has been queued.",
+            "job_id": job.id
+        }), 202
 
     except Exception as e:
-        # Catch any unexpected errors (e.g., database connection issues)
-        current_app.logger.error(f"Error pushing allocation: {str(e)}")
+        db.session.rollback()
+        current_app.logger.error(f"Error queueing allocation push: {str(e)}")
         return jsonify({"error": f"An unexpected server error occurred: {str(e)}"}), 500
     
 @allocation_bp.route('/push_bulk_allocation_to_umis', methods=['POST'])
 @jwt_required()
 def push_bulk_allocation_to_umis():
     """
-    Pushes ALL allocations for an entire department and semester to UMIS.
+    Queues a push of ALL allocations for an entire department and semester to UMIS.
+    Returns the job id right away; progress is available from /push-jobs/<job_id>.
     """
     if not current_user.is_vetter and not current_user.is_superadmin:
         return jsonify({"error": "Unauthorized"}), 403
@@ -1287,113 +1162,52 @@ def push_bulk_allocation_to_umis():
     if not department_id or not semester_id:
         return jsonify({"error": "Missing required fields: department_id and semester_id"}), 400
     
-    session = AcademicSession.query.filter_by(is_active=True).first()
+    session = reference_data_service.active_session()
     if not session:
         return jsonify({"error": "No active academic session found"}), 404
     
     try:
-        # Fetch ALL allocations for the department/semester/session in ONE query
-        all_allocations = db.session.query(CourseAllocation)\
+        has_allocations = db.session.query(CourseAllocation.id)\
             .join(ProgramCourse, CourseAllocation.program_course_id == ProgramCourse.id)\
             .join(Program, ProgramCourse.program_id == Program.id)\
             .filter(
                 Program.department_id == department_id,
                 CourseAllocation.semester_id == semester_id,
                 CourseAllocation.session_id == session.id
-            ).all()
+            ).first() is not None
 
-        if not all_allocations:
+        if not has_allocations:
             return jsonify({"message": "No allocations found for this department and semester to push to UMIS."}), 200
 
-        # Authenticate on UMIS
-        umis_token, auth_error = auth_dev_user()
-        if auth_error:
-            return jsonify({"error": f"Failed to authenticate with UMIS: {auth_error}"}), 500
-
-        successful_pushes = 0
-        failed_pushes = []
-        success_keyfields = []
+        job = umis_job_service.enqueue_bulk_push(department_id, semester_id, session.id, current_user.id)
 
-        
-        for allocation in all_allocations:
-            # Ensure all related objects exist
-            if not allocation.program_course or not allocation.program_course.course:
-                failed_pushes.append(f"Skipping allocation ID {allocation.id}: Missing related course data.")
-                continue
-
-            # Check for missing data
-            if not allocation.lecturer_profile or not allocation.lecturer_profile.staff_id:
-                failed_pushes.append(f"Course {allocation.program_course.course.code}: Missing lecturer staff ID.")
-                continue
-
-            # Ensure semester relationship is valid
-            if not allocation.semester:
-                failed_pushes.append(f"Course {allocation.program_course.course.code}: Missing semester information.")
-                continue
-
-            # Skip already pushed allocations
-            if allocation.is_pushed_to_umis: 
-                continue
-
-            # Determine quarterid
-            semester_name = allocation.semester.name.lower()
-            if semester_name == 'first semester':
-                quarterid = f"{session.name}.1"
-            elif semester_name == 'second semester':
-                quarterid = f"{session.name}.2"
-            else:
-                quarterid = f"{session.name}.3"
-
-            payload = {
-                "quarterid": quarterid,
-                "instructorid": allocation.lecturer_profile.staff_id,
-                "courseid": allocation.program_course.course.code, 
-                "org_id": "0",
-                "coursetitle": allocation.program_course.course.title, 
-                "classoption": allocation.class_option,
-                "maxclass": str(allocation.class_size),
-            }
-            
-            # Push to UMIS
-            is_success, response_data = allocation_service.push_allocation_to_umis(payload, umis_token)
-
-            if is_success:
-                data_dict = response_data.get('data', {})
-                keyfield = data_dict.get('keyfield')
-                if keyfield:
-                    success_keyfields.append(str(keyfield))
-                
-                # Update the allocation record
-                allocation.is_pushed_to_umis = True
-                allocation.pushed_to_umis_by_id = current_user.id
-                allocation.pushed_to_umis_at = datetime.now(timezone.utc)
-                successful_pushes += 1
-            else:
-                failed_pushes.append(
-                    f"Course {payload['courseid']} ({payload['classoption']}): {response_data}"
-                )
-        
-        # Commit all changes after processing
-        db.session.commit()
-
-        # Single summary response
-        if not failed_pushes:
-            return jsonify({
-                "status": "success",
-                "message": f"Successfully pushed {successful_pushes} allocation(s) to UMIS.\nKeyfields: {', '.join(success_keyfields)}",
-            }), 200
-        else:
-            return jsonify({
-                "status": "partial_failure",
-                "message": f"Completed with {len(failed_pushes)} error(s). Successfully pushed {successful_pushes} allocation(s).\nKeyfields: {', '.join(success_keyfields)}",
-                "error": ', '.join(failed_pushes),
-            }), 207
+        return jsonify({
+            "status": "queued",
+            "message": f"Push of {job.total_count} allocation(s) to UMIS has been queued.",
+            "job_id": job.id
+        }), 202
 
     except Exception as e:
         db.session.rollback()
-        current_app.logger.error(f"Error pushing allocation: {str(e)}")
+        current_app.logger.error(f"Error queueing bulk allocation push: {str(e)}")
         return jsonify({"error": f"An unexpected server error occurred: {str(e)}"}), 500
 
+@allocation_bp.route('/push-jobs/<int:job_id>', methods=['GET'])
+@jwt_required()
+def get_push_job_status(job_id):
+    """
+    Reports the progress of a queued UMIS push: counts pushed, failed and pending.
+    """
+    if not current_user.is_vetter and not current_user.is_superadmin:
+        return jsonify({"error": "Unauthorized"}), 403
+
+    job_status, error = umis_job_service.get_job_status(job_id)
+
+    if error:
+        return jsonify({"error": error}), 404
+
+    return jsonify(job_status), 200
+
 @allocation_bp.route('/metrics', methods=['GET'])
 @jwt_required()
 def get_allocation_metrics():
@@ -2,6 +2,7 @@ from flask_jwt_extended import jwt_required, current_user
 from flask import Blueprint, request, jsonify
 from app import db
 from app.models.models import Bulletin, CourseAllocation, User
+from app.services import allocation_summary_service, reference_data_service, response_cache_service
 
 
 bulletin_bp = Blueprint('bulletins', __name__)
@@ -34,6 +35,10 @@ def create_bulletin():
     db.session.add(new_bulletin)
     db.session.flush()
 
+    # Course totals follow the active bulletin
+    allocation_summary_service.invalidate_summaries()
+    reference_data_service.bump()
+
     db.session.commit()
     # return jsonify({'message': f"Session '{name}' initialized by superadmin."}), 201
     return jsonify({
@@ -54,9 +59,7 @@ def get_bulletin():
     if not current_user or not (current_user.is_superadmin or current_user.is_vetter):
         return jsonify({"msg": "Unauthorized – Only superadmin can fetch bulletins"}), 403
 
-    bulletins = Bulletin.query.order_by(Bulletin.id.desc()).all()
-    
-    return jsonify({
+    return response_cache_service.cached_response(('bulletin',), lambda: {
         "bulletins": [
             {
                 "id": bulletin.id,
@@ -64,9 +67,9 @@ def get_bulletin():
                 "start_year": bulletin.start_year,
                 "end_year": bulletin.end_year,
                 "is_active": bulletin.is_active
-            } for bulletin in bulletins
+            } for bulletin in reversed(reference_data_service.bulletins())
         ]
-    }), 200
+    })
 
 @bulletin_bp.route('/list/name', methods=['GET'])
 @jwt_required()
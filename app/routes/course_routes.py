@@ -1,61 +1,88 @@
 from flask import Blueprint, current_app, request, jsonify
 from flask_jwt_extended import jwt_required, current_user
-from app.services import course_service
-from app.services.course_service import create_program_course_link, delete_program_course, get_all_courses, create_course, batch_create_courses, get_courses, update_course, delete_course, update_course_main
+from app.services import course_service, response_cache_service
+from app.services.course_service import COURSE_CATALOG_FILTERS, create_program_course_link, delete_program_course, get_course_catalog, create_course, batch_create_courses, get_courses, update_course, delete_course, update_course_main
 from .user_routes import _simplify_db_error
 
 course_bp = Blueprint('courses', __name__)
 
+# Tables the full course catalog (GET /courses) is built from
+COURSE_CATALOG_TABLES = (
+    'program_course', 'course', 'course_type', 'program', 'department', 'school',
+    'bulletin', 'level', 'semester'
+)
+MAX_COURSE_PAGE_SIZE = 500
+
 @course_bp.route('', methods=['GET'])
 @jwt_required()
 def handle_get_all_courses():
+    """
+    Returns the course catalog, newest first. It can be filtered by department_id,
+    program_id, bulletin_id, level_id, semester_id and code (a code prefix).
+    With `limit` only one page is returned, along with a `next_cursor` to pass as
+    `after` for the following page; without it every matching course is returned.
+    """
     if not current_user:
         return jsonify({"msg": "Unauthorized"}), 403
 
-    courses = get_all_courses()
-    response_data = [
-        {
-            "program_course_id": pc.id,
-            "id": pc.course.id,
-            "code": pc.course.code,
-            "title": pc.course.title,
-            "unit": pc.course.units,
-            "course_type": {
-                "id": pc.course.course_type.id if pc.course.course_type else None,
-                "name": pc.course.course_type.name if pc.course.course_type else None
-            },
-            "program": {
-                "id": pc.program.id,
-                "name": pc.program.name,
-                "department": {
-                    "id": pc.program.department.id,
-                    "name": pc.program.department.name,
-                    "school": {
-                        "id": pc.program.department.school.id,
-                        "name": pc.program.department.school.name
-                    }
+    filters = {name: request.args.get(name, type=int) for name in COURSE_CATALOG_FILTERS}
+    code_prefix = request.args.get('code', '').strip()
+    after = request.args.get('after', type=int)
+    limit = request.args.get('limit', type=int)
+
+    if limit is not None and not 1 <= limit <= MAX_COURSE_PAGE_SIZE:
+        return jsonify({'error': f'limit must be between 1 and {MAX_COURSE_PAGE_SIZE}'}), 400
+
+    def build():
+        # One extra row tells whether there is a next page
+        rows = get_course_catalog(filters, code_prefix, after, limit + 1 if limit else None)
+        data = {"courses": [_serialize_catalog_row(row) for row in rows[:limit]]}
+        if limit:
+            data["next_cursor"] = rows[limit - 1].program_course_id if len(rows) > limit else None
+        return data
+
+    return response_cache_service.cached_response(COURSE_CATALOG_TABLES, build)
+
+def _serialize_catalog_row(row):
+    return {
+        "program_course_id": row.program_course_id,
+        "id": row.course_id,
+        "code": row.code,
+        "title": row.title,
+        "unit": row.units,
+        "course_type": {
+            "id": row.course_type_id,
+            "name": row.course_type_name
+        },
+        "program": {
+            "id": row.program_id,
+            "name": row.program_name,
+            "department": {
+                "id": row.department_id,
+                "name": row.department_name,
+                "school": {
+                    "id": row.school_id,
+                    "name": row.school_name
                 }
-            },
-            "specialization": {
-                "id": pc.specializations[0].id if pc.specializations else None,
-                "name": pc.specializations[0].name if pc.specializations else 'General'
-            },
-            "bulletin": {
-                "id": pc.bulletin.id,
-                "name": pc.bulletin.name
-            },
-            "level": {
-                "id": pc.level.id,
-                "name": pc.level.name
-            },
-            "semester": {
-                "id": pc.semester.id,
-                "name": pc.semester.name
             }
-        } for pc in courses
-    ]
-
-    return jsonify({"courses": response_data}), 200
+        },
+        "specialization": {
+            "id": row.specialization_id,
+            "name": row.specialization_name or 'General'
+        },
+        "bulletin": {
+            "id": row.bulletin_id,
+            "name": row.bulletin_name
+        },
+        "level": {
+            "id": row.level_id,
+            "name": row.level_name
+        },
+        "semester": {
+            "id": row.semester_id,
+            "name": row.semester_name
+        }
+    }
 
 @course_bp.route('/main', methods=['GET'])
 @jwt_required()
@@ -63,22 +90,20 @@ def handle_get_courses():
     if not current_user:
         return jsonify({"msg": "Unauthorized"}), 403
 
-    courses = get_courses()
-    
-    response_data = [
-        {
-            "id": course.id,
-            "code": course.code,
-            "title": course.title,
-            "unit": course.units,
-            "course_type": {
-                "id": course.course_type.id if course.course_type else None,
-                "name": course.course_type.name if course.course_type else None
-            }
-        } for course in courses
-    ]
-
-    return jsonify({"courses": response_data}), 200
+    return response_cache_service.cached_response(('course', 'course_type'), lambda: {
+        "courses": [
+            {
+                "id": course.id,
+                "code": course.code,
+                "title": course.title,
+                "unit": course.units,
+                "course_type": {
+                    "id": course.course_type.id if course.course_type else None,
+                    "name": course.course_type.name if course.course_type else None
+                }
+            } for course in get_courses()
+        ]
+    })
 
 @course_bp.route('/main/<int:id>', methods=['DELETE'])
 @jwt_required()
@@ -108,16 +133,14 @@ def get_courses_list():
     if not current_user:
         return jsonify({"msg": "Unauthorized"}), 403
 
-    courses = get_courses()
-    
-    response_data = [
-        {
-            "id": course.id,
-            "name": f"{str(course.code)} - {course.title}",
-        } for course in courses
-    ]
-
-    return jsonify({"courses": response_data}), 200
+    return response_cache_service.cached_response(('course',), lambda: {
+        "courses": [
+            {
+                "id": course.id,
+                "name": f"{str(course.code)} - {course.title}",
+            } for course in get_courses()
+        ]
+    })
 
 @course_bp.route('', methods=['POST'])
 @jwt_required()
@@ -2,6 +2,7 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, current_user
 from app import db
 from app.models.models import CourseType
+from app.services import response_cache_service
 
 course_type_bp = Blueprint('course_types', __name__)
 
@@ -22,6 +23,7 @@ def create_course_type():
 
     new_course_type = CourseType(name=name)
     db.session.add(new_course_type)
+    response_cache_service.bump('course_type')
     db.session.commit()
 
     return jsonify({
@@ -38,13 +40,9 @@ def get_course_types():
     if not current_user or not (current_user.is_superadmin or current_user.is_vetter or current_user.is_hod):
         return jsonify({"msg": "Unauthorized"}), 403
         
-    course_types = CourseType.query.order_by(CourseType.name).all()
-    
-    return jsonify(
-        [
-            {
-                "id": course_type.id,
-                "name": course_type.name,
-            } for course_type in course_types
-        ]
-    ), 200
+    return response_cache_service.cached_response(('course_type',), lambda: [
+        {
+            "id": course_type.id,
+            "name": course_type.name,
+        } for course_type in CourseType.query.order_by(CourseType.name).all()
+    ])
@@ -2,6 +2,7 @@ from flask_jwt_extended import jwt_required, current_user
 from flask import Blueprint, request, jsonify
 from app import db
 from app.models.models import Department, Semester, AcademicSession, DepartmentAllocationState, CourseAllocation, ProgramCourse, Program
+from app.services import allocation_summary_service, reference_data_service, response_cache_service
 
 
 department_bp = Blueprint('departments', __name__)
@@ -31,6 +32,7 @@ def create_department():
     db.session.add(new_department)
     db.session.flush()
 
+    response_cache_service.bump('department')
     db.session.commit()
     
     return jsonify({
@@ -51,18 +53,23 @@ def get_departments():
     if not current_user or not (current_user.is_superadmin or current_user.is_vetter):
         return jsonify({"msg": "Unauthorized – Only superadmin can fetch departments"}), 403
 
-    departments = Department.query.order_by(Department.id).filter(Department.name.notin_(['Registry', 'Academic Planning'])).all()
-    
-    return jsonify({
-        "departments": [
-            {
-                "id": department.id,
-                "name": department.name,
-                "school": department.school.name,
-                "acronym": department.acronym
-            } for department in departments
-        ]
-    }), 200
+    def build():
+        departments = Department.query.order_by(Department.id).filter(
+            Department.name.notin_(['Registry', 'Academic Planning'])
+        ).options(db.joinedload(Department.school)).all()
+
+        return {
+            "departments": [
+                {
+                    "id": department.id,
+                    "name": department.name,
+                    "school": department.school.name,
+                    "acronym": department.acronym
+                } for department in departments
+            ]
+        }
+
+    return response_cache_service.cached_response(('department', 'school'), build)
 
 @department_bp.route('/list/admin', methods=['GET'])
 @jwt_required()
@@ -145,6 +152,7 @@ def batch_upload():
             db.session.add(department)
             created.append(name)
 
+    response_cache_service.bump('department')
     db.session.commit()
 
     return jsonify({
@@ -174,6 +182,7 @@ def update_department(id):
     department.school_id = school_id
     department.acronym = acronym
 
+    response_cache_service.bump('department')
     db.session.commit()
 
     return jsonify({'message': 'Department updated successfully'}), 200
@@ -188,7 +197,9 @@ def delete_department(id):
     if not department:
         return jsonify({'error': 'Department not found'}), 404
 
+    allocation_summary_service.delete_department_summaries(department.id)
     db.session.delete(department)
+    response_cache_service.bump('department', 'program', 'program_course')
     db.session.commit()
 
     return jsonify({'message': 'Department deleted successfully'}), 200
@@ -203,9 +214,9 @@ def get_departments_by_semester():
         return jsonify({"error": "Unauthorized: Only superadmins and vetters can view this."}), 403
 
     try:
-        semesters = Semester.query.filter_by(is_active=True).all() # Get only active semesters (semesters = Semester.query.order_by(Semester.id).all())
+        semesters = reference_data_service.active_semesters() # Get only active semesters (semesters = Semester.query.order_by(Semester.id).all())
         departments = Department.query.order_by(Department.name).all()
-        active_session = AcademicSession.query.filter_by(is_active=True).first()
+        active_session = reference_data_service.active_session()
 
         if not active_session:
             return jsonify({"error": "No active academic session found."}), 404
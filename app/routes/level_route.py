@@ -2,6 +2,7 @@ from flask import Blueprint, jsonify, request
 from app.models.models import Level
 from flask_jwt_extended import jwt_required, current_user
 from app import db
+from app.services import reference_data_service, response_cache_service
 
 level_bp = Blueprint("level", __name__)
 
@@ -12,14 +13,12 @@ def get_all_levels():
     if not current_user or not (current_user.is_superadmin or current_user.is_vetter):
         return jsonify({"msg": "Unauthorized – Only admin roles can views levels"}), 403
     
-    levels = Level.query.order_by(Level.id).all()
-    data = [
+    return response_cache_service.cached_response(('level',), lambda: [
         {
             "id": level.id,
             "name": level.name
-        } for level in levels
-    ]
-    return jsonify(data), 200
+        } for level in reference_data_service.levels()
+    ])
 
 @level_bp.route('/create', methods=['POST'])
 @jwt_required()
@@ -38,6 +37,7 @@ def create_level():
 
     new_level = Level(name=name)
     db.session.add(new_level)
+    reference_data_service.bump()
     db.session.commit()
 
     return jsonify({
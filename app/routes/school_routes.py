@@ -2,6 +2,7 @@ from flask_jwt_extended import jwt_required, current_user
 from flask import Blueprint, request, jsonify
 from app import db
 from app.models.models import School, CourseAllocation, User
+from app.services import response_cache_service
 
 
 school_bp = Blueprint('schools', __name__)
@@ -30,6 +31,7 @@ def create_school():
     db.session.add(new_school)
     db.session.flush()
 
+    response_cache_service.bump('school')
     db.session.commit()
     # return jsonify({'message': f"Session '{name}' initialized by superadmin."}), 201
     return jsonify({
@@ -49,17 +51,15 @@ def get_schools():
     if not current_user or not (current_user.is_superadmin or current_user.is_vetter):
         return jsonify({"msg": "Unauthorized – Only superadmin can fetch schools"}), 403
 
-    schools = School.query.order_by(School.id).filter(School.acronym.notin_(['SVAD'])).all()
-    
-    return jsonify({
+    return response_cache_service.cached_response(('school',), lambda: {
         "schools": [
             {
                 "id": school.id,
                 "name": school.name,
                 "acronym": school.acronym
-            } for school in schools
+            } for school in School.query.order_by(School.id).filter(School.acronym.notin_(['SVAD'])).all()
         ]
-    }), 200
+    })
 
 @school_bp.route('/lists', methods=['GET'])
 @jwt_required()
@@ -118,6 +118,7 @@ def batch_upload():
             db.session.add(school)
             created.append(name)
 
+    response_cache_service.bump('school')
     db.session.commit()
 
     return jsonify({
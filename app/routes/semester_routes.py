@@ -2,6 +2,7 @@ from flask import Blueprint, jsonify, request
 from app.models import Semester
 from flask_jwt_extended import jwt_required, current_user
 from app import db
+from app.services import reference_data_service, response_cache_service
 
 semester_bp = Blueprint("semester", __name__)
 
@@ -12,15 +13,13 @@ def get_all_semesters():
     if not current_user or not (current_user.is_superadmin or current_user.is_vetter):
         return jsonify({"msg": "Unauthorized – Only admin roles can views semesters"}), 403
     
-    semesters = Semester.query.order_by(Semester.id).all()
-    data = [
+    return response_cache_service.cached_response(('semester',), lambda: [
         {
             "id": semester.id,
             "name": semester.name,
             "is_active": semester.is_active
-        } for semester in semesters if semester.name != "Summer Semester"  # Exclude Summer Semester
-    ]
-    return jsonify(data), 200
+        } for semester in reference_data_service.semesters() if semester.name != "Summer Semester"  # Exclude Summer Semester
+    ])
 
 @semester_bp.route('/create', methods=['POST'])
 @jwt_required()
@@ -45,6 +44,7 @@ def create_semester():
     db.session.add(new_semester)
     db.session.flush()
 
+    reference_data_service.bump()
     db.session.commit()
     # return jsonify({'message': f"Session '{session_name}' initialized by superadmin."}), 201
     return jsonify({
@@ -2,6 +2,7 @@ from flask_jwt_extended import jwt_required, current_user
 from flask import Blueprint, request, jsonify
 from app import db
 from app.models.models import AcademicSession, ProgramCourse, CourseAllocation, User
+from app.services import reference_data_service
 
 
 session_bp = Blueprint('sessions', __name__)
@@ -51,6 +52,7 @@ def initialize_session():
 
     #     db.session.add(new_alloc)
 
+    reference_data_service.bump()
     db.session.commit()
     # return jsonify({'message': f"Session '{session_name}' initialized by superadmin."}), 201
     return jsonify({
@@ -100,6 +102,7 @@ def update_session():
 
     session_to_activate.is_active = True
 
+    reference_data_service.bump()
     db.session.commit()
 
     return jsonify({'message': 'Session updated successfully'}), 200
@@ -1,38 +1,28 @@
 import random
 import string
-from threading import Thread
-from flask import current_app
-import requests
 from app.models.models import User, AdminUser, Department
-from app.extensions import db, mail
+from app.extensions import db
 from sqlalchemy.exc import IntegrityError
-from flask_mail import Message
+from app.services import mail_outbox_service, umis_directory_service
 import os
 
-def send_async_email(app, msg):
-    with app.app_context():
-        mail.send(msg)
-
 def generate_random_password(length=12):
     characters = string.ascii_letters + string.digits + string.punctuation
     return ''.join(random.choice(characters) for i in range(length))
 
-def send_credentials_email(email, password, role):
-    msg = Message(
-        'Your Admin Account for Course Allocation System',
-        recipients=[email]
-    )
-    msg.body = f"""
+def queue_credentials_email(email, password, role):
+    """
+    Queues the credentials email of a new admin user in the mail outbox, in the
+    transaction that creates the user.
+    """
+    body = f"""
     You have been added as an admin user for the Course Allocation System with the role of {role}.
     Your username is: {email}
     Your password is: {password}
     
     Please change your password after your first login.
     """
-    app = current_app._get_current_object()
-    thr = Thread(target=send_async_email, args=[app, msg])
-    thr.start()
-    return thr
+    return mail_outbox_service.enqueue(email, 'Your Admin Account for Course Allocation System', body)
 
 def get_all_admin_users():
     try:
@@ -88,11 +78,10 @@ def create_admin_user(data):
         
         db.session.add(new_user)
         db.session.add(admin_profile)
+        queue_credentials_email(new_user.email, password, new_user.role)
         
         db.session.commit()
 
-        send_credentials_email(new_user.email, password, new_user.role)
-
         department = Department.query.get(admin_profile.department_id)
 
         user_data = {
@@ -112,55 +101,100 @@ def create_admin_user(data):
         db.session.rollback()
         return None, None, str(e)
 
+ADMIN_BATCH_CHUNK_SIZE = 200
+ADMIN_ROLES = ('admin', 'vetter', 'superadmin')
+
 def create_admin_users_batch(users_data):
+    """
+    Creates admin users and their profiles from a list of user data.
+
+    Rows are validated in memory, emails already taken are found with one IN query,
+    and valid rows are saved with one commit per chunk of ADMIN_BATCH_CHUNK_SIZE.
+    The credentials emails are queued in the mail outbox with the users they announce.
+    """
     created_count = 0
     errors = []
-    for index, user_data in enumerate(users_data):
-        user, error = create_admin_user(user_data)
-        if error:
-            errors.append({'line': index + 1, 'error': error})
+
+    rows = []
+    for index, data in enumerate(users_data):
+        line = index + 1
+        missing = [key for key in ('name', 'email', 'role', 'department_id') if not data.get(key)]
+        if missing:
+            errors.append({'line': line, 'error': f"Missing required fields: {', '.join(missing)}"})
+        elif data['role'] not in ADMIN_ROLES:
+            errors.append({'line': line, 'error': f"Invalid role '{data['role']}'"})
+        elif not str(data['department_id']).isdigit():
+            errors.append({'line': line, 'error': f"Invalid department ID '{data['department_id']}'"})
         else:
-            created_count += 1
-    
+            rows.append((line, dict(data, department_id=int(data['department_id']))))
+
+    emails = list({data['email'] for _, data in rows})
+    taken = set()
+    for start in range(0, len(emails), ADMIN_BATCH_CHUNK_SIZE):
+        chunk = emails[start:start + ADMIN_BATCH_CHUNK_SIZE]
+        taken.update(email for (email,) in db.session.query(User.email).filter(User.email.in_(chunk)).all())
+    department_ids = {department_id for (department_id,) in db.session.query(Department.id).filter(
+        Department.id.in_({data['department_id'] for _, data in rows})
+    ).all()} if rows else set()
+
+    valid_rows = []
+    for line, data in rows:
+        if data['email'] in taken:
+            errors.append({'line': line, 'error': "Email already exists"})
+        elif data['department_id'] not in department_ids:
+            errors.append({'line': line, 'error': f"Department with ID '{data['department_id']}' not found"})
+        else:
+            taken.add(data['email'])
+            valid_rows.append((line, data))
+
+    for start in range(0, len(valid_rows), ADMIN_BATCH_CHUNK_SIZE):
+        chunk = valid_rows[start:start + ADMIN_BATCH_CHUNK_SIZE]
+        try:
+            for _, data in chunk:
+                password = generate_random_password()
+                new_user = User(
+                    name=data['name'],
+                    email=data['email'],
+                    role=data['role'],
+                    department_id=data['department_id']
+                )
+                new_user.set_password(password)
+                new_user.admin_user = AdminUser(
+                    gender=data.get('gender'),
+                    phone=data.get('phone'),
+                    department_id=data['department_id']
+                )
+                db.session.add(new_user)
+                queue_credentials_email(new_user.email, password, new_user.role)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            error = "Database integrity error." if isinstance(e, IntegrityError) else str(e)
+            errors.extend({'line': line, 'error': error} for line, _ in chunk)
+            continue
+
+        created_count += len(chunk)
+
+    errors.sort(key=lambda error: error['line'])
     return created_count, errors
 
-def fetch_umis_faculties(umis_token, umisid):
+def fetch_umis_faculties():
     """
-    Fetches faculties from UMIS
+    Returns (faculties, error) from the local UMIS instructor directory, which is
+    downloaded from UMIS only when it is empty or out of date.
     """
-    print(f"Fetching faculty data from UMIS for ID: {umisid} with token: {umis_token}")
-    # FETCH CLASS OPTION DATA
-    faculty_api = f"{os.getenv('UMIS_INSTRUCTOR_URL')}{umisid}"
-    header = {
-        'action': 'read',
-        'authorization': umis_token
-    }
-    resp = requests.get(faculty_api, headers=header)
-
-    if resp.status_code != 200:
-        return None, f"Failed to fetch faculty data ({resp.status_code})"
-    
-    faculty_list = resp.json()
-    
-    if 'data' not in faculty_list or not isinstance(faculty_list['data'], list):
-        return None, "Invalid faculty data format from UMIS"
-
-    if 'data' in faculty_list:
-        sorted_faculty_list = sorted(
-            [{
-                'id': faculty.get('instructorid'),
-                'instructorname': faculty.get('instructorname'),
-                'email': faculty.get('email'),
-                'departmentid': faculty.get('departmentid'),
-                'departmentname': faculty.get('departmentname'),
-                'schoolid': faculty.get('schoolid'),
-                'schoolname': faculty.get('schoolname'),
-            } for faculty in faculty_list.get('data')],
-            key=lambda faculty: faculty.get('name', '')
-        )
-
-        return sorted_faculty_list, None
-                        
-    return None, "Faculty not found in UMIS data"
+    instructors, error = umis_directory_service.list_instructors()
+    if error:
+        return None, error
+
+    return [{
+        'id': faculty.get('instructorid'),
+        'instructorname': faculty.get('instructorname'),
+        'email': faculty.get('email'),
+        'departmentid': faculty.get('departmentid'),
+        'departmentname': faculty.get('departmentname'),
+        'schoolid': faculty.get('schoolid'),
+        'schoolname': faculty.get('schoolname'),
+    } for faculty in instructors], None
     
 
@@ -0,0 +1,238 @@
+import csv
+import io
+import json
+import threading
+from collections import OrderedDict, defaultdict
+
+from flask import current_app
+from sqlalchemy import func
+
+from app import db
+from app.models import (
+    CourseAllocation, Department, DepartmentAllocationSummary,
+    Lecturer, ProgramCourse, Semester
+)
+from app.services import cache_version_service, lecturer_directory_service, reference_data_service
+
+CSV_HEADER = ["Session", "Semester", "Program", "Level", "Course Code", "Course Title", "Unit", "Allocated To"]
+
+_cache_lock = threading.Lock()
+
+
+def _cache():
+    # Kept per application so that separate apps (and test runs) never share reports
+    return current_app.extensions.setdefault('allocation_report_cache', OrderedDict())
+
+
+def _state_version(department_id, session_id):
+    """
+    Returns a value that changes whenever the department's allocations, states or
+    curriculum change in the session, or a lecturer is renamed: the sum of its
+    summary row versions, which only ever grows, with the lecturer directory
+    version. None when the department has no summary rows.
+    """
+    summary_version = db.session.query(func.sum(DepartmentAllocationSummary.version)).filter(
+        DepartmentAllocationSummary.department_id == department_id,
+        DepartmentAllocationSummary.session_id == session_id
+    ).scalar()
+    if summary_version is None:
+        return None
+    return summary_version, cache_version_service.get_version(lecturer_directory_service.VERSION_NAME)
+
+
+def build_allocation_report(department, session):
+    """
+    Builds the print report of a department for a session: every semester with its
+    programs and levels, listing only allocated courses and their lecturers.
+    Program courses and allocations are loaded once and grouped in Python.
+    """
+    programs = department.programs
+    semesters = reference_data_service.semesters()
+    program_ids = [p.id for p in programs]
+
+    # Fetch all allocations for these courses in the current session in ONE query.
+    all_allocations_for_session = CourseAllocation.query.filter(
+        CourseAllocation.session_id == session.id,
+        CourseAllocation.program_course_id.in_(
+            db.session.query(ProgramCourse.id).filter(ProgramCourse.program_id.in_(program_ids))
+        )
+    ).options(
+        db.selectinload(CourseAllocation.lecturer_profile).selectinload(Lecturer.user_account)
+    ).all()
+
+    allocated_pc_ids = {alloc.program_course_id for alloc in all_allocations_for_session}
+
+    allocations_map = defaultdict(list)
+    for alloc in all_allocations_for_session:
+        allocations_map[(alloc.program_course_id, alloc.semester_id)].append(alloc)
+
+    # Only allocated courses appear in the report
+    program_courses = ProgramCourse.query.filter(
+        ProgramCourse.id.in_(allocated_pc_ids)
+    ).options(
+        db.selectinload(ProgramCourse.course),
+        db.selectinload(ProgramCourse.level)
+    ).order_by(ProgramCourse.id).all()
+
+    courses_by_program_level = defaultdict(lambda: defaultdict(lambda: defaultdict(list)))
+    for pc in program_courses:
+        courses_by_program_level[pc.program_id][pc.level_id][pc.semester_id].append(pc)
+
+    semesters_by_name = {s.name: s for s in semesters}
+    third_semester = semesters_by_name.get('Summer Semester')
+    first_and_second_sem_ids = [
+        s.id for s in [semesters_by_name.get('First Semester'), semesters_by_name.get('Second Semester')] if s
+    ]
+
+    output = []
+    for semester in semesters:
+        semester_data = {"sessionId": session.id, "sessionName": session.name, "id": semester.id, "name": semester.name, "programs": []}
+
+        if third_semester and semester.id == third_semester.id:
+            course_semester_ids = first_and_second_sem_ids
+        else:
+            course_semester_ids = [semester.id]
+
+        for program in programs:
+            program_data = {"id": program.id, "name": program.name, "levels": []}
+
+            for level_courses in courses_by_program_level[program.id].values():
+                level_program_courses = sorted(
+                    (pc for sem_id in course_semester_ids for pc in level_courses.get(sem_id, [])),
+                    key=lambda pc: pc.id
+                )
+                if not level_program_courses:
+                    continue
+
+                level = level_program_courses[0].level
+                level_data = {"id": str(level.id), "name": f"{level.name} Level", "courses": []}
+
+                for pc in level_program_courses:
+                    course = pc.course
+                    allocations = allocations_map.get((pc.id, semester.id), [])
+
+                    allocated_to_names = [
+                        alloc.lecturer_profile.user_account[0].name
+                        for alloc in allocations
+                        if alloc.lecturer_profile and alloc.lecturer_profile.user_account
+                    ]
+
+                    level_data["courses"].append({
+                        "id": str(course.id),
+                        "programCourseId": pc.id,
+                        "code": course.code,
+                        "title": course.title,
+                        "unit": course.units,
+                        "isAllocated": True,
+                        "allocatedTo": ", ".join(allocated_to_names) if allocated_to_names else None
+                    })
+
+                program_data["levels"].append(level_data)
+
+            if program_data["levels"]:
+                program_data["levels"].sort(key=lambda level: int(level['name'].split()[0]))
+                semester_data["programs"].append(program_data)
+
+        # Only add the semester if it has programs with allocated courses
+        if semester_data["programs"]:
+            output.append(semester_data)
+
+    return output
+
+
+def get_allocation_report(department_id, session):
+    """
+    Returns (report, error) for a department in a session. Reports are cached per
+    (department, session, state version), so printing an unchanged department again
+    does not touch the allocation tables.
+    """
+    department = db.session.get(Department, department_id)
+    if not department:
+        return None, "Department not found"
+
+    version = _state_version(department.id, session.id)
+    if version is None:
+        # Without summary rows there is nothing to tell a changed report from an unchanged one
+        return build_allocation_report(department, session), None
+
+    key = (department.id, session.id, version)
+    cache = _cache()
+    with _cache_lock:
+        report = cache.get(key)
+        if report is not None:
+            cache.move_to_end(key)
+            return report, None
+
+    report = build_allocation_report(department, session)
+
+    with _cache_lock:
+        cache[key] = report
+        # Older versions of the same department are never asked for again
+        for stale_key in [k for k in cache if k[:2] == key[:2] and k != key]:
+            del cache[stale_key]
+        while len(cache) > current_app.config.get('REPORT_CACHE_SIZE', 256):
+            cache.popitem(last=False)
+
+    return report, None
+
+
+def clear_report_cache():
+    with _cache_lock:
+        _cache().clear()
+
+
+def iter_report_rows(report):
+    """
+    Yields one flat dict per course of a report, in print order.
+    """
+    for semester in report:
+        for program in semester["programs"]:
+            for level in program["levels"]:
+                for course in level["courses"]:
+                    yield {
+                        "session": semester["sessionName"],
+                        "semester": semester["name"],
+                        "program": program["name"],
+                        "level": level["name"],
+                        **course,
+                    }
+
+
+def iter_report_ndjson(report):
+    """
+    Yields an already built report as newline-delimited JSON: one line per
+    semester, program and level block. The report is built (or read from the
+    cache) in full before the first line, so this only spares clients from
+    parsing one large document; it does not shorten the time to the first byte.
+    """
+    for semester in report:
+        for program in semester["programs"]:
+            for level in program["levels"]:
+                yield json.dumps({
+                    "sessionId": semester["sessionId"],
+                    "sessionName": semester["sessionName"],
+                    "semester": {"id": semester["id"], "name": semester["name"]},
+                    "program": {"id": program["id"], "name": program["name"]},
+                    "level": level,
+                }) + "\n"
+
+
+def iter_report_csv(report):
+    """
+    Yields an already built report as CSV text, one course per row, after a header row.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    writer.writerow(CSV_HEADER)
+    for row in iter_report_rows(report):
+        writer.writerow([
+            row["session"], row["semester"], row["program"], row["level"],
+            row["code"], row["title"], row["unit"], row["allocatedTo"] or ""
+        ])
+        if buffer.tell() > 8192:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    yield buffer.getvalue()
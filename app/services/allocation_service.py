@@ -5,21 +5,40 @@ from app.models import (
     User, CourseAllocation, 
     ProgramCourse, Lecturer, 
     Semester, Program, Level,
-    Department
+    Department, Course, DepartmentAllocationSummary
 )
 from datetime import datetime, timezone
+from collections import defaultdict
 import requests
 import json
-from sqlalchemy import or_
+from sqlalchemy import or_, func, distinct, case
+from sqlalchemy.orm import aliased
 import os
 from dotenv import load_dotenv
 
 from app.models.models import Bulletin
+from app.services.umis_token_service import dev_token_manager
+from app.services.umis_client import umis_client
+from app.services import allocation_summary_service, lecturer_directory_service, reference_data_service
 
 load_dotenv()
 
-def push_allocation_to_umis(payload, token):
+# Departments left out of the allocation overview and metrics
+NON_ACADEMIC_DEPARTMENTS = ["Academic Planning", "Registry", "General Study Division", "Biosciences and Biotechnology"]
+
+# Returned by push_allocation_to_umis when UMIS rejects the token and refresh_token is False
+UMIS_TOKEN_REJECTED = "UMIS rejected the authorization token (401)"
+
+def push_allocation_to_umis(payload, token, http=None, timeout=30, refresh_token=True):
+    """
+    Pushes a single allocation payload to UMIS.
+    Pass a shared requests.Session as `http` to reuse keep-alive connections.
+    On a 401 the dev token is refreshed and the push retried once; callers running
+    outside the app context (worker threads) pass refresh_token=False and get
+    (False, UMIS_TOKEN_REJECTED) back instead.
+    """
     url = os.getenv('UMIS_ALLOCATION_URL')
+    http = http or requests
 
     headers = {
         'Content-Type': 'application/json',
@@ -28,7 +47,18 @@ def push_allocation_to_umis(payload, token):
     }
 
     try:
-        response = requests.post(url, headers=headers, json=payload)
+        response = http.post(url, headers=headers, json=payload, timeout=timeout)
+
+        if response.status_code == 401:
+            if not refresh_token:
+                return False, UMIS_TOKEN_REJECTED
+            # The cached dev token was rejected: refresh it and retry once
+            token, error = dev_token_manager.refresh(stale_token=token)
+            if error:
+                return False, f"Failed to authenticate with UMIS: {error}"
+            headers['authorization'] = token
+            response = http.post(url, headers=headers, json=payload, timeout=timeout)
+
         response.raise_for_status() # Raise an exception for bad status codes (4xx or 5xx)
         
         response_data = response.json()
@@ -63,7 +93,7 @@ def get_allocation_class_options(umis_token, umisid):
         'action': 'read',
         'authorization': umis_token
     }
-    resp = requests.get(class_option_api, headers=header)
+    resp = umis_client.get(class_option_api, headers=header)
 
     if resp.status_code != 200:
         return None, f"Failed to fetch class_option data ({resp.status_code})"
@@ -90,7 +120,7 @@ def get_allocation_status(department_id, semester_id):
     """
     Checks if the allocation for a given department and semester is submitted for the active session.
     """
-    session = AcademicSession.query.filter_by(is_active=True).first()
+    session = reference_data_service.active_session()
     if not session:
         return False, "No active session found."
 
@@ -106,7 +136,7 @@ def submit_allocation(department_id, user_id, semester_id):
     """
     Submits the allocation for a department and semester for the active session.
     """
-    session = AcademicSession.query.filter_by(is_active=True).first()
+    session = reference_data_service.active_session()
     if not session:
         return None, "No active academic session found."
 
@@ -131,6 +161,8 @@ def submit_allocation(department_id, user_id, semester_id):
     state.is_submitted = True
     state.submitted_at = datetime.now(timezone.utc)
     state.submitted_by_id = user_id
+
+    allocation_summary_service.refresh_department_summary(department_id, session.id, semester_id)
     
     db.session.commit()
     return state, None
@@ -139,7 +171,7 @@ def vet_allocation(department_id, admin_user_id, semester_id):
     """
     Marks an allocation as vetted for a department and semester in the active session.
     """
-    session = AcademicSession.query.filter_by(is_active=True).first()
+    session = reference_data_service.active_session()
     if not session:
         return None, "No active academic session found."
 
@@ -164,6 +196,8 @@ def vet_allocation(department_id, admin_user_id, semester_id):
     state.is_vetted = True
     state.vetted_at = datetime.now(timezone.utc)
     state.vetted_by_id = admin_user_id
+
+    allocation_summary_service.refresh_department_summary(department_id, session.id, semester_id)
     
     db.session.commit()
     return state, None
@@ -197,7 +231,7 @@ def unblock_allocation(department_id, semester_id):
     semester in the active session. This allows for a fresh submission.
     """
     try:
-        session = AcademicSession.query.filter_by(is_active=True).first()
+        session = reference_data_service.active_session()
         if not session:
             return None, "No active academic session found."
 
@@ -217,6 +251,7 @@ def unblock_allocation(department_id, semester_id):
 
         # Instead of resetting flags, delete the entire record from the database.
         db.session.delete(state)
+        allocation_summary_service.refresh_department_summary(department_id, session.id, semester_id)
         db.session.commit()
         
         # Return a success message instead of the now-deleted 'state' object.
@@ -242,7 +277,7 @@ def update_course_allocation(data_list, department_id):
     if is_submitted:
         return None, "Cannot update allocations that have already been submitted."
 
-    session = AcademicSession.query.filter_by(is_active=True).first()
+    session = reference_data_service.active_session()
     if not session:
         return None, "No active academic session found."
 
@@ -255,7 +290,7 @@ def update_course_allocation(data_list, department_id):
         semester_id = first_item.get('semesterId')
 
         # check if semester is summer semester, if yes, we need to find the courses in both first and second semester for the program
-        semester = Semester.query.filter_by(id=semester_id).first()
+        semester = reference_data_service.semester(semester_id)
 
         # Find the ProgramCourse ID, which links everything
         if semester and semester.name == "Summer Semester":
@@ -288,25 +323,22 @@ def update_course_allocation(data_list, department_id):
         
         # Create the new allocation records from the submitted data
         for item in data_list:
-            lecturer_name = item.get("allocatedTo")
-            if not lecturer_name: # Skip if no lecturer is assigned
+            lecturer_ref = lecturer_directory_service.lecturer_reference(item)
+            if not lecturer_ref: # Skip if no lecturer is assigned
                 continue
             
-            lecturer = (
-                Lecturer.query.join(User)
-                .filter(User.name == lecturer_name)
-                .first()
-            )
+            lecturer_id = lecturer_directory_service.resolve_lecturer(item, department_id)
             
-            if not lecturer:
-                return None, f"Lecturer '{lecturer_name}' not found."
+            if not lecturer_id:
+                db.session.rollback()
+                return None, f"Lecturer '{lecturer_ref}' not found."
                 
 
             new_allocation = CourseAllocation(
                 program_course_id=program_course.id,
                 session_id=session.id,
                 semester_id=semester_id,
-                lecturer_id=lecturer.id,
+                lecturer_id=lecturer_id,
                 source_bulletin_id=program_course.bulletin_id,
                 group_name=item.get('groupName'),
                 is_lead=item.get('groupName').lower() == "group a",
@@ -316,6 +348,8 @@ def update_course_allocation(data_list, department_id):
             )
             db.session.add(new_allocation)
 
+        allocation_summary_service.refresh_department_summary(department_id, session.id, semester_id)
+
         # Commit the transaction (deletes and adds happen together)
         db.session.commit()
         return True, None
@@ -332,8 +366,17 @@ def delete_allocation(program_course_id):
 
         return False, "Allocation not found"
 
+    # The summaries of every session and semester the course was allocated in change
+    affected = db.session.query(CourseAllocation.session_id, CourseAllocation.semester_id)\
+        .filter_by(program_course_id=program_course_id).distinct().all()
+
     CourseAllocation.query.filter_by(program_course_id=program_course_id).delete()
 
+    program_course = db.session.get(ProgramCourse, program_course_id)
+    if program_course:
+        for session_id, semester_id in affected:
+            allocation_summary_service.refresh_department_summary(program_course.program.department_id, session_id, semester_id)
+
     db.session.commit()
     return True, None
 
@@ -341,11 +384,16 @@ def get_allocations_by_department(department_id, semester_id):
     """
     Gets all course allocations for a given department and semester,
     organized by program and level.
+
+    Every allocation row (with its course, level, lecturer and pusher names) is
+    fetched in a single joined query and the bulletin/program/level tree is
+    assembled in memory, so the number of statements does not grow with the
+    size of the department.
     """
-    programs = Program.query.filter_by(department_id=department_id).all()
-    semester = db.session.get(Semester, semester_id)
-    session = AcademicSession.query.filter_by(is_active=True).first()
-    bulletins = Bulletin.query.all()
+    programs = Program.query.filter_by(department_id=department_id).order_by(Program.id).all()
+    semester = reference_data_service.semester(semester_id)
+    session = reference_data_service.active_session()
+    bulletins = reference_data_service.bulletins()
     
     if not programs:
         # If no programs exist, return empty list immediately
@@ -367,13 +415,35 @@ def get_allocations_by_department(department_id, semester_id):
         vetted = False
         submitted = False
 
+    department = db.session.get(Department, department_id)
+
+    rows = _department_allocation_rows(department_id, semester, session)
+
+    # bulletin_id -> program_id -> (level_id, level_name) -> [course dicts]
+    tree = defaultdict(lambda: defaultdict(lambda: defaultdict(list)))
+    totals = defaultdict(lambda: [0, 0]) # bulletin_id -> [allocated, pushed]
+
+    for row in rows:
+        totals[row.source_bulletin_id][0] += 1
+        if row.is_pushed_to_umis:
+            totals[row.source_bulletin_id][1] += 1
+
+        tree[row.source_bulletin_id][row.program_id][(row.level_id, row.level_name)].append({
+            "id": str(row.program_course_id),
+            "code": row.code,
+            "title": row.title,
+            "unit": row.units,
+            "isAllocated": True,
+            "allocatedTo": row.lecturer_name,
+            "class_option": row.class_option,
+            "groupName": row.group_name,
+            "is_pushed_to_umis": row.is_pushed_to_umis,
+            "pushed_to_umis_by": row.pushed_by_name,
+        })
+
     output = []
 
     for bulletin in bulletins:
-        tot_course_allocated = 0
-        tot_courses_pushed = 0
-
-        bulletin_data = {"id": bulletin.id, "name": bulletin.name, "is_all_pushed": False,"semester": []}
         semester_data = {
             "sessionId": session.id, 
             "sessionName": session.name,
@@ -381,99 +451,89 @@ def get_allocations_by_department(department_id, semester_id):
             "submitted": submitted,
             "id": semester.id, 
             "name": semester.name, 
-            "department_id": programs[0].department.id,
-            "department_name": programs[0].department.name, 
+            "department_id": department.id,
+            "department_name": department.name, 
             "programs": []
         }
 
+        programs_tree = tree.get(bulletin.id, {})
         for program in programs:
-            program_data = {"id": program.id, "name": program.name, "levels": []}
-            
-            level_ids = (
-                db.session.query(ProgramCourse.level_id)
-                .filter_by(program_id=program.id)
-                .distinct()
-                .all()
-            )
-            
-            for level_row in level_ids:
-                level_id = level_row.level_id
-                level = db.session.get(Level, level_id)
-
-                level_data = {"id": str(level.id), "name": f"{level.name} Level", "courses": []}
-                
-                if semester and semester.name == "Summer Semester":
-                    program_courses = ProgramCourse.query.filter_by(
-                        program_id=program.id, 
-                        level_id=level.id
-                        # bulletin_id=bulletin.id # only current bulletin courses
-                    ).distinct()
-                else:
-                    program_courses = ProgramCourse.query.filter_by(
-                        program_id=program.id, 
-                        level_id=level.id,
-                        semester_id=semester.id,
-                        # bulletin_id=bulletin.id # only current bulletin courses
-                    ).distinct()
-
-                for pc in program_courses:
-                    course = pc.course
-                    allocations = CourseAllocation.query.filter_by(
-                        program_course_id=pc.id,
-                        semester_id=semester.id,
-                        session_id=session.id,
-                        source_bulletin_id=bulletin.id
-                    ).all()
-
-                    if allocations:
-                        # check if all courses have been pushed to umis
-                        tot_course_allocated += len(allocations)
-                        courses_pushed = [alloc for alloc in allocations if alloc.is_pushed_to_umis]
-                        tot_courses_pushed += len(courses_pushed)
-
-                        for allocation in allocations:
-                            lecturer_name = None
-                            if allocation.lecturer_profile and allocation.lecturer_profile.user_account:
-                                lecturer_name = allocation.lecturer_profile.user_account[0].name
-
-                            level_data["courses"].append({
-                                "id": str(allocation.program_course_id),
-                                "code": course.code,
-                                "title": course.title,
-                                "unit": course.units,
-                                "isAllocated": bool(allocation),
-                                "allocatedTo": lecturer_name,
-                                "class_option": allocation.class_option,
-                                "groupName": allocation.group_name,
-                                "is_pushed_to_umis": allocation.is_pushed_to_umis,
-                                "pushed_to_umis_by": allocation.pushed_by.name if allocation.pushed_by else None,
-                            })
-                    # else:
-                    #     level_data["courses"].append({
-                    #         "id": str(course.id),
-                    #         "code": course.code,
-                    #         "title": course.title,
-                    #         "unit": course.units,
-                    #         "isAllocated": False,
-                    #         "allocatedTo": None,
-                    #         "groupName": None
-                    #     })
-                
-                if level_data["courses"]:
-                    program_data["levels"].append(level_data)
+            levels_tree = programs_tree.get(program.id)
+            if not levels_tree:
+                continue
 
-            if program_data["levels"]:
-                semester_data["programs"].append(program_data)
+            semester_data["programs"].append({
+                "id": program.id,
+                "name": program.name,
+                "levels": [
+                    {"id": str(level_id), "name": f"{level_name} Level", "courses": courses}
+                    for (level_id, level_name), courses in levels_tree.items()
+                ]
+            })
 
+        tot_course_allocated, tot_courses_pushed = totals.get(bulletin.id, (0, 0))
         is_all_pushed = (tot_course_allocated > 0) and (tot_course_allocated == tot_courses_pushed)
-        
-        bulletin_data["is_all_pushed"] = is_all_pushed
-        bulletin_data["semester"].append(semester_data)
-        output.append(bulletin_data)
 
-    
+        output.append({
+            "id": bulletin.id,
+            "name": bulletin.name,
+            "is_all_pushed": is_all_pushed,
+            "semester": [semester_data]
+        })
+
     return output, None
 
+def _department_allocation_rows(department_id, semester, session):
+    """
+    Returns one flat row per allocation of the department in the given semester
+    and session, ordered the way the report lists them (program, level, course, group).
+    For the summer semester, courses from every semester are considered.
+    """
+    pushed_by = aliased(User)
+    # A lecturer may have more than one account; name each allocation after the first one
+    lecturer_account = db.session.query(
+        User.lecturer_id,
+        func.min(User.id).label('user_id')
+    ).filter(User.lecturer_id.isnot(None)).group_by(User.lecturer_id).subquery()
+
+    query = db.session.query(
+        CourseAllocation.program_course_id,
+        CourseAllocation.source_bulletin_id,
+        CourseAllocation.class_option,
+        CourseAllocation.group_name,
+        CourseAllocation.is_pushed_to_umis,
+        ProgramCourse.program_id,
+        ProgramCourse.level_id,
+        Level.name.label('level_name'),
+        Course.code,
+        Course.title,
+        Course.units,
+        User.name.label('lecturer_name'),
+        pushed_by.name.label('pushed_by_name'),
+    ).join(ProgramCourse, ProgramCourse.id == CourseAllocation.program_course_id)\
+     .join(Program, Program.id == ProgramCourse.program_id)\
+     .join(Course, Course.id == ProgramCourse.course_id)\
+     .join(Level, Level.id == ProgramCourse.level_id)\
+     .outerjoin(lecturer_account, lecturer_account.c.lecturer_id == CourseAllocation.lecturer_id)\
+     .outerjoin(User, User.id == lecturer_account.c.user_id)\
+     .outerjoin(pushed_by, pushed_by.id == CourseAllocation.pushed_to_umis_by_id)\
+     .filter(
+        Program.department_id == department_id,
+        CourseAllocation.semester_id == semester.id,
+        CourseAllocation.session_id == session.id,
+        CourseAllocation.source_bulletin_id.isnot(None)
+     )
+
+    if semester.name != "Summer Semester":
+        query = query.filter(ProgramCourse.semester_id == semester.id)
+
+    return query.order_by(
+        ProgramCourse.program_id,
+        ProgramCourse.level_id,
+        ProgramCourse.id,
+        CourseAllocation.id
+    ).all()
+
 def department_courses(department_id, semester_id, session_id):
     """
     Gets the total number of relevant courses for a department in a given semester.
@@ -482,7 +542,7 @@ def department_courses(department_id, semester_id, session_id):
     2. Any courses from PREVIOUS bulletins that have been allocated in the given session.
     """
     # Get the active bulletin
-    active_bulletin = Bulletin.query.filter_by(is_active=True).first()
+    active_bulletin = reference_data_service.active_bulletin()
 
     if not active_bulletin:
         # If there's no bulletin, we can't determine the base list of courses.
@@ -552,21 +612,32 @@ def get_allocation_status_overview():
     Gets an overview of the allocation status for all departments for each semester.
     Status can be 'Allocated', 'Still Allocating', or 'Not Started'.
     Accessible by superadmins and vetters.
+
+    Course counts and allocation progress are read from the department allocation
+    summary table; states and HODs are fetched for every department at once, so the
+    number of statements does not depend on the number of departments.
     """
 
     try:
-        semesters = Semester.query.filter_by(is_active=True).all() # Get only active semesters (semesters = Semester.query.order_by(Semester.id).all())
+        semesters = reference_data_service.active_semesters() # Get only active semesters (semesters = Semester.query.order_by(Semester.id).all())
         departments = Department.query.order_by(Department.name).all()
-        active_session = AcademicSession.query.filter_by(is_active=True).first()
+        active_session = reference_data_service.active_session()
 
         if not active_session:
             return {"error": "No active academic session found."}
         
         # We need the active bulletin for our logic, check for it once
-        active_bulletin = Bulletin.query.filter_by(is_active=True).first()
+        active_bulletin = reference_data_service.active_bulletin()
         if not active_bulletin:
             return {"error": "No active bulletin found."}
 
+        if not semesters:
+            return []
+
+        summaries = allocation_summary_service.get_session_summaries(active_session.id)
+        states = _department_states(active_session.id)
+        hods = _department_hod_names()
+
         output = []
         for semester in semesters:
             semester_data = {
@@ -580,31 +651,18 @@ def get_allocation_status_overview():
             for i, department in enumerate(departments):
                 
                 # Check if the department has submitted allocations for this semester
-                if department.name not in ["Academic Planning", "Registry", "General Study Division", "Biosciences and Biotechnology"]:
+                if department.name not in NON_ACADEMIC_DEPARTMENTS:
 
                     submitted = False 
                     vet_status = "Not Vetted" 
                     status = "Not Started"
 
-                    # Fetch list of courses in a semester for this department based on active bulletin
-                    if semester.name == "Summer Semester":
-                        first_semest = Semester.query.filter_by(name="First Semester").first()
-                        second_semest = Semester.query.filter_by(name="Second Semester").first()
-                        
-                        # For summer semester, we consider all courses from both first and second semesters that are in the active bulletin.
-                        first_sem_courses = department_courses(department.id, first_semest.id, active_session.id)
-                        second_sem_courses = department_courses(department.id, second_semest.id, active_session.id)
-                        courses = list(set(first_sem_courses + second_sem_courses))
-                    else:
-                        courses = department_courses(department.id, semester.id, active_session.id)
-
-                    allco, _ = department_allocation_progress(department.id, semester.id, active_session.id)
-                    
-                    state = DepartmentAllocationState.query.filter_by(
-                        department_id=department.id,
-                        semester_id=semester.id,
-                        session_id=active_session.id
-                    ).first()
+                    # Summer totals already include the courses of both first and second semesters
+                    summary = summaries.get((department.id, semester.id))
+                    total_courses = summary.total_courses if summary else 0
+                    allocated_courses = summary.allocated_courses if summary else 0
+                    last_alloc_at = summary.last_allocation_at if summary else None
+                    state = states.get((department.id, semester.id))
                     
                     if state:
                         status = "Allocated"
@@ -614,46 +672,21 @@ def get_allocation_status_overview():
 
                         if state.is_submitted:
                             submitted = state.is_submitted
-                    elif len(allco) > 0:
+                    elif allocated_courses > 0:
                         status = "Still Allocating"
-                        # # 2. If not submitted, check if there are any partial allocations
-                        # has_allocations = db.session.query(CourseAllocation.id)\
-                        #     .join(ProgramCourse, ProgramCourse.id == CourseAllocation.program_course_id)\
-                        #     .join(Program, Program.id == ProgramCourse.program_id)\
-                        #     .filter(Program.department_id == department.id)\
-                        #     .filter(CourseAllocation.semester_id == semester.id)\
-                        #     .filter(CourseAllocation.session_id == active_session.id)\
-                        #     .first() is not None
-                        
-                        # if has_allocations:
-                        #     status = "Still Allocating"
-
-                    # get most recent allocation timestamp for this department (if any)
-                    last_alloc_row = db.session.query(CourseAllocation.created_at)\
-                        .join(ProgramCourse, ProgramCourse.id == CourseAllocation.program_course_id)\
-                        .join(Program, Program.id == ProgramCourse.program_id)\
-                        .filter(Program.department_id == department.id)\
-                        .filter(CourseAllocation.semester_id == semester.id)\
-                        .filter(CourseAllocation.session_id == active_session.id)\
-                        .order_by(CourseAllocation.created_at.desc())\
-                        .first()
-
-                    last_alloc_at = last_alloc_row[0] if last_alloc_row else None
-                    
-                    hod = next((u for u in department.users if u.is_hod), None)
 
                     semester_data["departments"].append({
                         "sn": i + 1,
                         "department_id": department.id,
                         "department_name": department.name,
-                        "hod_name": hod.name if hod else "-",
-                        "total_courses": len(courses) if len(courses) > 0 else 0,
-                        "total_courses_allocated": len(allco) if len(allco) > 0 else 0,
-                        "allocation_rate": round((len(allco)/len(courses))*100, 1) if len(courses) > 0 else 0,
+                        "hod_name": hods.get(department.id, "-"),
+                        "total_courses": total_courses,
+                        "total_courses_allocated": allocated_courses,
+                        "allocation_rate": round((allocated_courses/total_courses)*100, 1) if total_courses > 0 else 0,
                         "status": status,
                         "submitted": submitted,
                         "vet_status": vet_status if state else "Not Vetted",
-                        "vetted_by": state.vetted_by.name if state and state.is_vetted and state.vetted_by else None,
+                        "vetted_by": state.vetted_by_name if state and state.is_vetted else None,
                         "last_allocation_at": last_alloc_at.isoformat() if last_alloc_at else None
                     })
         
@@ -668,16 +701,74 @@ def get_allocation_status_overview():
         # Log the error e
         return {"error": "An unexpected error occurred.", "details": str(e)}
 
+def _department_states(session_id):
+    """
+    Returns {(department_id, semester_id): state row} for the session, with the vetter's name.
+    """
+    rows = db.session.query(
+        DepartmentAllocationState.department_id,
+        DepartmentAllocationState.semester_id,
+        DepartmentAllocationState.is_submitted,
+        DepartmentAllocationState.is_vetted,
+        User.name.label('vetted_by_name')
+    ).outerjoin(User, User.id == DepartmentAllocationState.vetted_by_id)\
+     .filter(DepartmentAllocationState.session_id == session_id)\
+     .all()
+
+    return {(row.department_id, row.semester_id): row for row in rows}
+
+def _department_hod_names():
+    """
+    Returns {department_id: HOD name}, taking the first HOD when a department has several.
+    """
+    hods = {}
+    rows = db.session.query(User.department_id, User.name)\
+        .filter(User.role == 'hod', User.department_id.isnot(None))\
+        .order_by(User.id).all()
+    for department_id, name in rows:
+        hods.setdefault(department_id, name)
+    return hods
+
+
+def _semester_stats_query(session_id, semester_id):
+    """
+    Aggregates the summary rows and submission states of a session and semester
+    over every department in one statement, without loading any rows.
+    """
+    summary = DepartmentAllocationSummary
+    state = DepartmentAllocationState
+    academic = Department.name.notin_(NON_ACADEMIC_DEPARTMENTS)
+    submitted = state.department_id.isnot(None)
+    allocated = func.coalesce(summary.allocated_courses, 0)
+
+    return db.session.query(
+        func.count(summary.department_id).label('summary_rows'),
+        func.sum(case((summary.is_stale == True, 1), else_=0)).label('stale_rows'),
+        # Groups and pushes are counted across every department
+        func.coalesce(func.sum(summary.allocation_groups), 0).label('allocation_groups'),
+        func.coalesce(func.sum(summary.pushed_count), 0).label('pushed'),
+        func.sum(case((academic, 1), else_=0)).label('departments'),
+        func.sum(case((academic, allocated), else_=0)).label('allocated_courses'),
+        func.sum(case((academic & submitted, 1), else_=0)).label('submitted'),
+        func.sum(case((academic & ~submitted & (allocated > 0), 1), else_=0)).label('in_progress'),
+    ).select_from(Department).outerjoin(
+        summary, (summary.department_id == Department.id) & (summary.session_id == session_id) & (summary.semester_id == semester_id)
+    ).outerjoin(
+        state, (state.department_id == Department.id) & (state.session_id == session_id)
+        & (state.semester_id == semester_id) & (state.is_submitted == True)
+    ).one()
 
 def get_active_semester_allocation_stats():
     """
     Gets active semesters' allocation stats for admin users oversight and decision making.
+
+    Counts come from one aggregate over the department allocation summary rows and
+    submission states of the active session and semester. The summary rows are
+    rebuilt first when they are missing or stale.
     """
     try:
-        active_semester = Semester.query.filter_by(is_active=True).first()
-        departments = Department.query.order_by(Department.name).all()
-        active_session = AcademicSession.query.filter_by(is_active=True).first()
-        all_allocation = CourseAllocation.query.filter_by(session_id=active_session.id, semester_id=active_semester.id).all()
+        active_semester = reference_data_service.active_semester()
+        active_session = reference_data_service.active_session()
 
         # Add robust checks
         if not active_semester:
@@ -685,63 +776,32 @@ def get_active_semester_allocation_stats():
         if not active_session:
             return None, "No active academic session found."
 
-        semester_data = {
-            "id": active_semester.id,
-            "name": active_semester.name,
-        }
+        stats = _semester_stats_query(active_session.id, active_semester.id)
+        if not stats.summary_rows or stats.stale_rows:
+            allocation_summary_service.refresh_stale_summaries(active_session.id)
+            stats = _semester_stats_query(active_session.id, active_semester.id)
 
-        number_of_pushed_allocation = sum(1 for alloc in all_allocation if alloc.is_pushed_to_umis) if all_allocation else 0
-        
-        department_acad = [d for d in departments if d.name not in ["Academic Planning", "Registry", "General Study Division", "Biosciences and Biotechnology"]]
-        
-        if not department_acad:
+        total_departments = stats.departments or 0
+        if not total_departments:
              return None, "No academic departments found to generate stats."
 
-        allocation_in_progress_count = 0
-        allocation_submitted_count = 0
-        total_allocated_courses = 0
-        total_allocated_course_groups = 0
-        total_courses_to_allocate = 0 # New metric
-
-        for department in department_acad:
-            
-            # --- UPDATED METRICS CALCULATION ---
-            # Get the definitive list of total courses for this department
-            courses_to_allocate = department_courses(department.id, active_semester.id, active_session.id)
-            total_courses_to_allocate += len(courses_to_allocate)
-
-            # Get the number of actually allocated courses
-            allocations, _ = department_allocation_progress(department.id, active_semester.id, active_session.id)
-            total_allocated_courses += len(allocations)
-            
-            
-            # Check submission state
-            state = DepartmentAllocationState.query.filter_by(
-                department_id=department.id,
-                semester_id=active_semester.id,
-                session_id=active_session.id
-            ).first()
-            
-            if state and state.is_submitted:
-                allocation_submitted_count += 1
-            elif len(allocations) > 0:
-                allocation_in_progress_count += 1
-
-        total_allocated_course_groups += len(all_allocation)
-        total_departments = len(department_acad)
+        allocation_submitted_count = stats.submitted or 0
+        allocation_in_progress_count = stats.in_progress or 0
         allocation_not_started_count = total_departments - allocation_submitted_count - allocation_in_progress_count
 
-        semester_data["total_allocated_course_groups"] = total_allocated_course_groups
-        semester_data["number_of_pushed_allocation"] = number_of_pushed_allocation
-        semester_data["allocated_courses"] = total_allocated_courses
-        semester_data["allocation_in_progress"] = allocation_in_progress_count
-        semester_data["allocation_submitted"] = allocation_submitted_count
-        semester_data["allocation_not_started"] = allocation_not_started_count
-        semester_data["compliance_score"] = round((allocation_submitted_count / total_departments) * 100, 1)
-        semester_data["in_progress_rate"] = round((allocation_in_progress_count / total_departments) * 100, 1)
-        semester_data["not_started_rate"] = round((allocation_not_started_count / total_departments) * 100, 1)
-
-        return semester_data, None
+        return {
+            "id": active_semester.id,
+            "name": active_semester.name,
+            "total_allocated_course_groups": int(stats.allocation_groups),
+            "number_of_pushed_allocation": int(stats.pushed),
+            "allocated_courses": int(stats.allocated_courses or 0),
+            "allocation_in_progress": allocation_in_progress_count,
+            "allocation_submitted": allocation_submitted_count,
+            "allocation_not_started": allocation_not_started_count,
+            "compliance_score": round((allocation_submitted_count / total_departments) * 100, 1),
+            "in_progress_rate": round((allocation_in_progress_count / total_departments) * 100, 1),
+            "not_started_rate": round((allocation_not_started_count / total_departments) * 100, 1),
+        }, None
 
     except Exception as e:
         # Log the error e
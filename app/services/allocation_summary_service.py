@@ -0,0 +1,264 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import or_, func, distinct, case, bindparam, insert, update
+from sqlalchemy.exc import IntegrityError
+
+from app import db
+from app.models import (
+    AcademicSession, Bulletin, CourseAllocation, Department,
+    DepartmentAllocationSummary, Program, ProgramCourse, Semester
+)
+from app.services import reference_data_service
+
+
+def _compute_summaries(session_id, department_id=None):
+    """
+    Computes the summary values of every (department_id, semester_id) pair of the
+    session, or only those of one department, with two GROUP BY queries.
+
+    Totals follow department_courses: courses of the active bulletin plus courses
+    from previous bulletins allocated in the session. The summer semester total is
+    the sum of the first and second semester totals.
+    """
+    semesters = reference_data_service.semesters()
+    active_bulletin = reference_data_service.active_bulletin()
+
+    if department_id is None:
+        department_ids = [row.id for row in db.session.query(Department.id).all()]
+    else:
+        department_ids = [department_id]
+
+    allocated_in_session = db.session.query(CourseAllocation.program_course_id)\
+        .filter(CourseAllocation.session_id == session_id)
+
+    course_query = db.session.query(
+        Program.department_id,
+        ProgramCourse.semester_id,
+        func.count(distinct(ProgramCourse.id))
+    ).join(Program, Program.id == ProgramCourse.program_id)\
+     .filter(or_(
+        ProgramCourse.bulletin_id == (active_bulletin.id if active_bulletin else None),
+        ProgramCourse.id.in_(allocated_in_session)
+     ))
+
+    allocation_query = db.session.query(
+        Program.department_id,
+        CourseAllocation.semester_id,
+        func.count(distinct(CourseAllocation.program_course_id)),
+        func.count(CourseAllocation.id),
+        func.sum(case((CourseAllocation.is_pushed_to_umis == True, 1), else_=0)),
+        func.max(CourseAllocation.created_at)
+    ).join(ProgramCourse, ProgramCourse.id == CourseAllocation.program_course_id)\
+     .join(Program, Program.id == ProgramCourse.program_id)\
+     .filter(CourseAllocation.session_id == session_id)
+
+    if department_id is not None:
+        course_query = course_query.filter(Program.department_id == department_id)
+        allocation_query = allocation_query.filter(Program.department_id == department_id)
+
+    course_counts = {
+        (dept_id, sem_id): count
+        for dept_id, sem_id, count in course_query.group_by(Program.department_id, ProgramCourse.semester_id).all()
+    }
+    allocation_stats = {
+        (dept_id, sem_id): (allocated, groups, pushed or 0, last_at)
+        for dept_id, sem_id, allocated, groups, pushed, last_at
+        in allocation_query.group_by(Program.department_id, CourseAllocation.semester_id).all()
+    }
+
+    regular_semester_ids = [s.id for s in semesters if s.name in ["First Semester", "Second Semester"]]
+
+    summaries = {}
+    for dept_id in department_ids:
+        for semester in semesters:
+            if semester.name == "Summer Semester":
+                total_courses = sum(course_counts.get((dept_id, sem_id), 0) for sem_id in regular_semester_ids)
+            else:
+                total_courses = course_counts.get((dept_id, semester.id), 0)
+
+            allocated, groups, pushed, last_at = allocation_stats.get((dept_id, semester.id), (0, 0, 0, None))
+            summaries[(dept_id, semester.id)] = {
+                "total_courses": total_courses,
+                "allocated_courses": allocated,
+                "allocation_groups": groups,
+                "pushed_count": pushed,
+                "last_allocation_at": last_at,
+            }
+
+    return summaries
+
+
+def _store_summaries(session_id, summaries, existing, touched=()):
+    """
+    Writes computed values over the existing summary rows, adding the missing ones.
+    `touched` holds the (department_id, semester_id) keys whose last activity is now.
+    """
+    now = datetime.now(timezone.utc)
+    for (dept_id, sem_id), values in summaries.items():
+        row = existing.get((dept_id, sem_id))
+        if not row:
+            row = DepartmentAllocationSummary(department_id=dept_id, session_id=session_id, semester_id=sem_id, version=1)
+            db.session.add(row)
+        else:
+            # Incremented in SQL so that concurrent writers never produce the same version
+            row.version = DepartmentAllocationSummary.version + 1
+
+        for key, value in values.items():
+            setattr(row, key, value)
+        row.is_stale = False
+
+        if (dept_id, sem_id) in touched:
+            row.last_activity_at = now
+        elif row.last_activity_at is None:
+            row.last_activity_at = values["last_allocation_at"]
+
+
+def refresh_department_summary(department_id, session_id, semester_id=None):
+    """
+    Recomputes the summary rows of one department in a session and records the
+    activity on `semester_id` (every semester when omitted).
+
+    Does not commit: call it before the commit of the write it accounts for so
+    that the summary changes in the same transaction.
+    """
+    if not department_id or not session_id:
+        return
+
+    summaries = _compute_summaries(session_id, department_id)
+    existing = {
+        (row.department_id, row.semester_id): row
+        for row in DepartmentAllocationSummary.query.filter_by(session_id=session_id, department_id=department_id).all()
+    }
+    touched = [key for key in summaries if semester_id is None or key[1] == semester_id]
+    _store_summaries(session_id, summaries, existing, touched)
+
+
+def rebuild_summaries(session_id=None):
+    """
+    Recomputes every summary row of a session (the active one by default) and commits.
+    Rows are overwritten whatever their state, so this is for rebuild_allocation_summary.py
+    and maintenance, not for request reads: see refresh_stale_summaries.
+    Returns (number of rows, error).
+    """
+    if session_id is None:
+        session = reference_data_service.active_session()
+        if not session:
+            return None, "No active academic session found."
+        session_id = session.id
+
+    summaries = _compute_summaries(session_id)
+    existing = {
+        (row.department_id, row.semester_id): row
+        for row in DepartmentAllocationSummary.query.filter_by(session_id=session_id).all()
+    }
+    _store_summaries(session_id, summaries, existing)
+    db.session.commit()
+
+    return len(summaries), None
+
+
+def refresh_stale_summaries(session_id):
+    """
+    Brings the summary rows of a session up to date for a read, and commits.
+
+    Only the stale (department, semester) rows are recomputed, each written with
+    UPDATE ... WHERE is_stale AND version = <version read>. A row that a concurrent
+    allocation write refreshed, or a curriculum change marked stale again, after
+    the values were computed is left alone. Missing rows are inserted; when
+    another transaction inserted some of them first, the insert is skipped and
+    retried by a later read. Returns the number of rows written.
+    """
+    summary = DepartmentAllocationSummary.__table__
+    current = {
+        (dept_id, sem_id): (version, is_stale)
+        for dept_id, sem_id, version, is_stale in db.session.query(
+            DepartmentAllocationSummary.department_id, DepartmentAllocationSummary.semester_id,
+            DepartmentAllocationSummary.version, DepartmentAllocationSummary.is_stale
+        ).filter_by(session_id=session_id).all()
+    }
+    if current and not any(is_stale for _, is_stale in current.values()):
+        summaries = {}
+    else:
+        summaries = _compute_summaries(session_id)
+
+    stale_rows = [
+        {
+            **values,
+            "b_department_id": dept_id, "b_semester_id": sem_id, "b_version": current[(dept_id, sem_id)][0],
+            "b_last_activity_at": values["last_allocation_at"],
+        }
+        for (dept_id, sem_id), values in summaries.items()
+        if (dept_id, sem_id) in current and current[(dept_id, sem_id)][1]
+    ]
+    missing_rows = [
+        {
+            **values, "department_id": dept_id, "session_id": session_id, "semester_id": sem_id,
+            "last_activity_at": values["last_allocation_at"], "is_stale": False, "version": 1,
+        }
+        for (dept_id, sem_id), values in summaries.items()
+        if (dept_id, sem_id) not in current
+    ]
+
+    if stale_rows:
+        db.session.execute(
+            update(summary).where(
+                summary.c.session_id == session_id,
+                summary.c.department_id == bindparam("b_department_id"),
+                summary.c.semester_id == bindparam("b_semester_id"),
+                summary.c.version == bindparam("b_version"),
+                summary.c.is_stale == True,
+            ).values(
+                is_stale=False,
+                version=summary.c.version + 1,
+                last_activity_at=func.coalesce(summary.c.last_activity_at, bindparam("b_last_activity_at")),
+            ),
+            stale_rows
+        )
+
+    if missing_rows:
+        try:
+            with db.session.begin_nested():
+                db.session.execute(insert(summary), missing_rows)
+        except IntegrityError:
+            # A concurrent allocation write created some of these rows first
+            missing_rows = []
+
+    db.session.commit()
+    return len(stale_rows) + len(missing_rows)
+
+
+def invalidate_summaries():
+    """
+    Marks every summary row as stale after a curriculum change (courses, program
+    courses or the active bulletin), which changes the course totals. Stale rows
+    are recomputed on the next read. Does not commit.
+    """
+    DepartmentAllocationSummary.query.update({
+        DepartmentAllocationSummary.is_stale: True,
+        DepartmentAllocationSummary.version: DepartmentAllocationSummary.version + 1,
+    }, synchronize_session=False)
+
+
+def delete_department_summaries(department_id):
+    """
+    Removes the summary rows of a department that is being deleted. Does not commit.
+    """
+    DepartmentAllocationSummary.query.filter_by(department_id=department_id).delete(synchronize_session=False)
+
+
+def get_session_summaries(session_id, semester_id=None):
+    """
+    Returns {(department_id, semester_id): summary row} for a session, optionally
+    limited to one semester. Missing and stale rows are brought up to date first
+    with refresh_stale_summaries.
+    """
+    query = DepartmentAllocationSummary.query.filter_by(session_id=session_id)
+    if semester_id is not None:
+        query = query.filter_by(semester_id=semester_id)
+
+    rows = query.all()
+    if not rows or any(row.is_stale for row in rows):
+        refresh_stale_summaries(session_id)
+        rows = query.all()
+
+    return {(row.department_id, row.semester_id): row for row in rows}
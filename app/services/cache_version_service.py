@@ -0,0 +1,40 @@
+from sqlalchemy.exc import IntegrityError
+
+from app import db
+from app.models import CacheVersion
+
+
+def get_version(name):
+    """
+    Returns the current version of a cached dataset, 0 when it was never bumped.
+    """
+    return db.session.query(CacheVersion.version).filter_by(name=name).scalar() or 0
+
+
+def bump_version(name):
+    """
+    Increments the version of a cached dataset so that every worker reloads its copy.
+    Does not commit: call it in the transaction that changes the data.
+    """
+    updated = CacheVersion.query.filter_by(name=name).update(
+        {CacheVersion.version: CacheVersion.version + 1}, synchronize_session=False
+    )
+    if updated:
+        return
+
+    try:
+        with db.session.begin_nested():
+            db.session.add(CacheVersion(name=name, version=1))
+    except IntegrityError:
+        # Another worker created the row first
+        CacheVersion.query.filter_by(name=name).update(
+            {CacheVersion.version: CacheVersion.version + 1}, synchronize_session=False
+        )
+
+
+def get_versions(names):
+    """
+    Returns {name: version} for several cached datasets in one query, 0 for those never bumped.
+    """
+    rows = dict(db.session.query(CacheVersion.name, CacheVersion.version).filter(CacheVersion.name.in_(names)).all())
+    return {name: rows.get(name, 0) for name in names}
@@ -1,12 +1,80 @@
 from app import db
-from app.models.models import Course, ProgramCourse, Specialization, Program, Level, Semester, AcademicSession, Bulletin
-from sqlalchemy import desc 
+from app.models.models import Course, CourseType, ProgramCourse, Specialization, Program, Department, School, Level, Semester, AcademicSession, Bulletin, program_course_specializations
+from sqlalchemy import desc, func, insert
 from sqlalchemy.orm.exc import NoResultFound, MultipleResultsFound
 from sqlalchemy.exc import IntegrityError
+from app.services import allocation_summary_service, reference_data_service, response_cache_service
+
+# Filters accepted by get_course_catalog and the column each one applies to
+COURSE_CATALOG_FILTERS = {
+    'department_id': Program.department_id,
+    'program_id': ProgramCourse.program_id,
+    'bulletin_id': ProgramCourse.bulletin_id,
+    'level_id': ProgramCourse.level_id,
+    'semester_id': ProgramCourse.semester_id,
+}
+
+def get_course_catalog(filters=None, code_prefix=None, after=None, limit=None):
+    """
+    Returns the program courses matching the filters, newest first, as rows that
+    carry the course, course type, program, department, school, bulletin, level,
+    semester and first specialization columns. Everything comes from one joined
+    query whatever the catalog size.
+
+    Pages are keyset based: pass the last program_course_id of a page as `after`
+    to get the next one.
+    """
+    # The lowest specialization of each program course is the one shown
+    first_specialization = db.session.query(
+        program_course_specializations.c.program_course_id.label('program_course_id'),
+        func.min(program_course_specializations.c.specialization_id).label('specialization_id')
+    ).group_by(program_course_specializations.c.program_course_id).subquery()
+
+    query = db.session.query(
+        ProgramCourse.id.label('program_course_id'),
+        Course.id.label('course_id'), Course.code, Course.title, Course.units,
+        CourseType.id.label('course_type_id'), CourseType.name.label('course_type_name'),
+        Program.id.label('program_id'), Program.name.label('program_name'),
+        Department.id.label('department_id'), Department.name.label('department_name'),
+        School.id.label('school_id'), School.name.label('school_name'),
+        Specialization.id.label('specialization_id'), Specialization.name.label('specialization_name'),
+        Bulletin.id.label('bulletin_id'), Bulletin.name.label('bulletin_name'),
+        Level.id.label('level_id'), Level.name.label('level_name'),
+        Semester.id.label('semester_id'), Semester.name.label('semester_name'),
+    ).select_from(ProgramCourse).join(
+        Course, ProgramCourse.course_id == Course.id
+    ).outerjoin(
+        CourseType, Course.course_type_id == CourseType.id
+    ).join(
+        Program, ProgramCourse.program_id == Program.id
+    ).join(
+        Department, Program.department_id == Department.id
+    ).join(
+        School, Department.school_id == School.id
+    ).join(
+        Bulletin, ProgramCourse.bulletin_id == Bulletin.id
+    ).join(
+        Level, ProgramCourse.level_id == Level.id
+    ).join(
+        Semester, ProgramCourse.semester_id == Semester.id
+    ).outerjoin(
+        first_specialization, first_specialization.c.program_course_id == ProgramCourse.id
+    ).outerjoin(
+        Specialization, Specialization.id == first_specialization.c.specialization_id
+    )
 
-def get_all_courses():
-    program_courses = ProgramCourse.query.order_by(desc(ProgramCourse.id)).all()
-    return program_courses
+    for name, value in (filters or {}).items():
+        if value is not None:
+            query = query.filter(COURSE_CATALOG_FILTERS[name] == value)
+    if code_prefix:
+        query = query.filter(Course.code.startswith(code_prefix, autoescape=True))
+    if after is not None:
+        query = query.filter(ProgramCourse.id < after)
+
+    query = query.order_by(desc(ProgramCourse.id))
+    if limit is not None:
+        query = query.limit(limit)
+    return query.all()
 
 def get_courses():
     courses = Course.query.order_by(Course.code).all()
@@ -21,6 +89,8 @@ def delete_course(id):
 
     Course.query.filter_by(id=id).delete()
 
+    allocation_summary_service.invalidate_summaries()
+    response_cache_service.bump('course', 'program_course')
     db.session.commit()
     return True, None
 
@@ -114,6 +184,8 @@ def create_program_course_link(data):
         )
         db.session.add(program_course)
 
+    allocation_summary_service.invalidate_summaries()
+    response_cache_service.bump('program_course')
     db.session.commit()
     
     return program_course, None
@@ -155,6 +227,8 @@ def create_course(data):
         # You might want to add a check here if a course can't be both general and specialized.
         pass
 
+    allocation_summary_service.invalidate_summaries()
+    response_cache_service.bump('course', 'program_course')
     db.session.commit()
 
     return course, None
@@ -231,23 +305,69 @@ def create_course(data):
 #     db.session.commit() # Commit once after the loop, similar to specialization_service
 #     return created_count, errors
 
+BATCH_CHUNK_SIZE = 1000
+
+def _chunks(items, size=BATCH_CHUNK_SIZE):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+def _program_course_key(course_ref, row):
+    return (course_ref, row['program_id'], row['level_id'], row['semester_id'], row['bulletin_id'])
+
+def _resolve_course_ref(course_ref, courses_by_code):
+    return courses_by_code[course_ref[1]] if isinstance(course_ref, tuple) else course_ref
+
+def _load_program_course_ids(rows):
+    """
+    Returns {(course_id, program_id, level_id, semester_id, bulletin_id): program_course_id}
+    for every program course in the programs and bulletins of the given rows.
+    """
+    program_ids = {row['program_id'] for row in rows}
+    bulletin_ids = {row['bulletin_id'] for row in rows}
+    if not program_ids:
+        return {}
+
+    existing = db.session.query(
+        ProgramCourse.id, ProgramCourse.course_id, ProgramCourse.program_id,
+        ProgramCourse.level_id, ProgramCourse.semester_id, ProgramCourse.bulletin_id
+    ).filter(
+        ProgramCourse.program_id.in_(program_ids),
+        ProgramCourse.bulletin_id.in_(bulletin_ids)
+    ).all()
+
+    return {
+        (pc.course_id, pc.program_id, pc.level_id, pc.semester_id, pc.bulletin_id): pc.id
+        for pc in existing
+    }
+
+def _in_row_order(errors):
+    """
+    Turns (row number, message) pairs into messages sorted by row, so that the
+    upload report follows the file whichever validation pass found each error.
+    """
+    return [message for _, message in sorted(errors, key=lambda error: error[0])]
+
 def batch_create_courses(courses_data):
     """
     Batch creates or updates course associations.
     Saves all valid rows to the database and reports errors for invalid rows.
+
+    Courses, program courses and specializations referenced by the upload are
+    loaded into lookup maps up front, every row is validated in memory, and the
+    new rows are written with executemany inserts in chunks.
     """
     processed_count = 0
     errors = []
 
-    # Loop through each row of data provided
+    # VALIDATE THE ROWS THAT DO NOT NEED THE DATABASE
+    rows = []
     for index, course_item in enumerate(courses_data):
-        row_num = index + 1 
+        row_num = index + 1
+        code = course_item.get('code')
 
         try:
-            # Extract and validate data for the current row
-            code = course_item.get('code')
             title = course_item.get('title')
-            units = course_item.get('unit') 
+            units = course_item.get('unit')
             bulletin_id = course_item.get('bulletin_id')
             program_id = course_item.get('program_id')
             semester_id = course_item.get('semester_id')
@@ -256,65 +376,139 @@ def batch_create_courses(courses_data):
             course_type_id = course_item.get('course_type_id')
 
             if not all([code, title, bulletin_id, program_id, semester_id, level_id, course_type_id]):
-                # If a row fails basic validation, we add an error and skip it.
-                # No database changes have been made yet for this row.
-                errors.append(f"Row {row_num}: Missing required fields.")
+                errors.append((row_num, f"Row {row_num}: Missing required fields."))
                 continue
 
             try:
                 units = int(units) if units is not None else 0
             except (ValueError, TypeError):
-                errors.append(f"Row {row_num}: Invalid unit value '{units}' for course '{code}'.")
+                errors.append((row_num, f"Row {row_num}: Invalid unit value '{units}' for course '{code}'."))
                 continue
 
-            # Use the helper to find/create the main objects
-            # This adds new objects to the session if they don't exist
-            course, program_course = get_or_create_course_and_link(
-                code, title, units, program_id, level_id, semester_id, bulletin_id, course_type_id
-            )
+            # Ids are compared against the lookup maps, so they must be integers
+            rows.append({
+                "row_num": row_num, "code": code, "title": title, "units": units,
+                "bulletin_id": int(bulletin_id), "program_id": int(program_id), "semester_id": int(semester_id),
+                "level_id": int(level_id), "specialization_id": int(specialization_id) if specialization_id else None,
+                "course_type_id": int(course_type_id),
+            })
+        except Exception as e:
+            errors.append((row_num, f"Row {row_num}: An unexpected error occurred for course '{code}': {str(e)}"))
 
-            # Apply the specialization logic
-            if specialization_id:
-                specialization = Specialization.query.get(specialization_id)
-                if not specialization:
-                    errors.append(f"Row {row_num}: Specialization with ID '{specialization_id}' not found.")
-                    continue
+    if not rows:
+        db.session.rollback()
+        return processed_count, _in_row_order(errors)
 
-                if specialization in program_course.specializations:
-                    errors.append(f"Row {row_num}: Course '{code}' is already linked to specialization '{specialization.name}'.")
+    try:
+        # PRELOAD LOOKUP MAPS
+        courses_by_code = {}
+        for codes in _chunks(list({row['code'] for row in rows})):
+            for course in db.session.query(Course.id, Course.code).filter(Course.code.in_(codes)).all():
+                courses_by_code[course.code] = course.id
+
+        specialization_ids = {row['specialization_id'] for row in rows if row['specialization_id']}
+        specializations = {
+            spec.id: spec.name for spec in db.session.query(Specialization.id, Specialization.name)
+            .filter(Specialization.id.in_(specialization_ids)).all()
+        } if specialization_ids else {}
+
+        program_course_ids = _load_program_course_ids(rows)
+        linked = set()
+        if specialization_ids and program_course_ids:
+            for pc_ids in _chunks(list(program_course_ids.values())):
+                linked.update(
+                    (link.program_course_id, link.specialization_id) for link in db.session.query(
+                        program_course_specializations.c.program_course_id,
+                        program_course_specializations.c.specialization_id
+                    ).filter(program_course_specializations.c.program_course_id.in_(pc_ids)).all()
+                )
+
+        # VALIDATE AGAINST THE MAPS AND PLAN THE INSERTS
+        # Rows that are not in the database yet are referenced by key until they have ids:
+        # a new course by ('new', code) and a new program course by its full key tuple.
+        new_courses = {}
+        new_program_courses = {}
+        new_links = []
+        for row in rows:
+            spec_id = row['specialization_id']
+            if spec_id and spec_id not in specializations:
+                errors.append((row['row_num'], f"Row {row['row_num']}: Specialization with ID '{spec_id}' not found."))
+                continue
+
+            course_id = courses_by_code.get(row['code'])
+            if course_id is None:
+                course_ref = ('new', row['code'])
+                new_courses.setdefault(row['code'], {
+                    "code": row['code'], "title": row['title'],
+                    "units": row['units'], "course_type_id": row['course_type_id']
+                })
+            else:
+                course_ref = course_id
+
+            pc_key = _program_course_key(course_ref, row)
+            pc_ref = program_course_ids.get(pc_key)
+            if pc_ref is None:
+                pc_ref = pc_key
+                new_program_courses.setdefault(pc_key, row)
+
+            if spec_id:
+                if (pc_ref, spec_id) in linked:
+                    errors.append((row['row_num'], f"Row {row['row_num']}: Course '{row['code']}' is already linked to specialization '{specializations[spec_id]}'."))
                     continue
-                
-                # Add the specialization to the session's pending changes
-                program_course.specializations.append(specialization)
+                linked.add((pc_ref, spec_id))
+                new_links.append((pc_ref, spec_id))
 
-            # If we reach here, this row is valid and its changes are staged in the session
             processed_count += 1
 
-        except Exception as e:
-            # If an unexpected error occurs during a row's processing,
-            # we'll just log the error and continue.
-            errors.append(f"Row {row_num}: An unexpected error occurred for course '{code}': {str(e)}")
-            continue 
-
-    # After the loop finishes, decide whether to commit or rollback.
-    try:
-        if processed_count > 0:
-            # If at least one row was processed successfully, commit all the staged changes.
-            db.session.commit()
-        else:
-            # If no rows were successfully processed, there's nothing to commit.
-            # Rollback to be safe and clear the session.
+        if processed_count == 0:
             db.session.rollback()
+            return processed_count, _in_row_order(errors)
+
+        # WRITE IN CHUNKS
+        if new_courses:
+            for chunk in _chunks(list(new_courses.values())):
+                db.session.execute(insert(Course), chunk)
+            for codes in _chunks(list(new_courses)):
+                for course in db.session.query(Course.id, Course.code).filter(Course.code.in_(codes)).all():
+                    courses_by_code[course.code] = course.id
+
+        if new_program_courses:
+            pc_rows = []
+            for pc_key, row in new_program_courses.items():
+                course_id = _resolve_course_ref(pc_key[0], courses_by_code)
+                pc_rows.append({
+                    "course_id": course_id, "program_id": row['program_id'], "level_id": row['level_id'],
+                    "semester_id": row['semester_id'], "bulletin_id": row['bulletin_id']
+                })
+            for chunk in _chunks(pc_rows):
+                db.session.execute(insert(ProgramCourse), chunk)
+
+        if new_links:
+            if new_program_courses:
+                program_course_ids = _load_program_course_ids(rows)
+
+            link_rows = []
+            for pc_ref, spec_id in new_links:
+                if isinstance(pc_ref, tuple):
+                    course_id = _resolve_course_ref(pc_ref[0], courses_by_code)
+                    pc_ref = program_course_ids[(course_id,) + pc_ref[1:]]
+                link_rows.append({"program_course_id": pc_ref, "specialization_id": spec_id})
+            for chunk in _chunks(link_rows):
+                db.session.execute(insert(program_course_specializations), chunk)
+
+        allocation_summary_service.invalidate_summaries()
+        response_cache_service.bump('course', 'program_course')
+        db.session.commit()
     except Exception as e:
         # This is a failsafe. If the final commit fails (e.g., due to a database-level constraint
-        # that wasn't caught in the loop), we must rollback.
+        # that wasn't caught in validation), we must rollback.
         db.session.rollback()
         # Add a generic error to the list to inform the user that the save failed.
-        errors.append(f"A final error occurred while saving the data, and all changes were rolled back. Please check your data. Details: {str(e)}")
+        errors.append((len(courses_data) + 1, f"A final error occurred while saving the data, and all changes were rolled back. Please check your data. Details: {str(e)}"))
         # Reset the success count since nothing was saved
         processed_count = 0
 
-    return processed_count, errors
+    return processed_count, _in_row_order(errors)
 
 def validate_course_identifiers(course_id, program_id, level_id, semester_id, bulletin_id):
     # Basic validation
@@ -422,6 +616,8 @@ def update_course(program_course_id, data):
                     program_course.specializations = [specialization]
 
     try:
+        allocation_summary_service.invalidate_summaries()
+        response_cache_service.bump('course', 'program_course')
         db.session.commit()
     except IntegrityError as e:
         db.session.rollback()
@@ -453,6 +649,7 @@ def update_course_main(course_id, data):
     course.units = data.get('unit', course.units)
     # course_type_id = data.get('course_type_id', course.course_type_id)
 
+    response_cache_service.bump('course')
     db.session.commit()
 
     return course, None
@@ -467,6 +664,8 @@ def delete_course(id):
 
     db.session.delete(course)
 
+    allocation_summary_service.invalidate_summaries()
+    response_cache_service.bump('course', 'program_course')
     db.session.commit()
     return True, None
 
@@ -482,6 +681,8 @@ def delete_program_course(program_course_id):
 
     db.session.delete(program_course)
 
+    allocation_summary_service.invalidate_summaries()
+    response_cache_service.bump('program_course')
     db.session.commit()
     return True, None
 
@@ -568,9 +769,9 @@ def get_courses_by_department(department_id, semester_id):
     program, level, and specialization.
     """
     programs = Program.query.filter_by(department_id=department_id).all()
-    semester = db.session.get(Semester, semester_id)
-    session = AcademicSession.query.filter_by(is_active=True).first()
-    bulletins = Bulletin.query.all()
+    semester = reference_data_service.semester(semester_id)
+    session = reference_data_service.active_session()
+    bulletins = reference_data_service.bulletins()
 
     if not semester or not session:
         return None, "Invalid semester or session."
@@ -596,7 +797,7 @@ def get_courses_by_department(department_id, semester_id):
             
             for level_row in level_ids:
                 level_id = level_row.level_id
-                level = db.session.get(Level, level_id)
+                level = reference_data_service.level(level_id)
 
                 # Initialize with a 'specializations' list instead of a 'courses' list.
                 level_data = {"id": str(level.id), "name": f"{level.name} Level", "specializations": []}
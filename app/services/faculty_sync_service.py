@@ -0,0 +1,198 @@
+from collections import Counter
+
+from flask import current_app
+from sqlalchemy import insert, update
+
+from app import db
+from app.models import Department, Lecturer, UmisInstructor, User
+from app.services import lecturer_directory_service, umis_directory_service
+
+# Only these roles are switched by the sync; admins, vetters and superadmins keep theirs
+SYNCED_ROLES = ('hod', 'lecturer')
+
+
+def _load_state():
+    """
+    Reads the directory, departments, lecturers and users in four queries.
+    """
+    instructors = db.session.query(
+        UmisInstructor.instructor_id, UmisInstructor.name, UmisInstructor.email,
+        UmisInstructor.department_name, UmisInstructor.is_hod
+    ).order_by(UmisInstructor.instructor_id).all()
+    departments = dict(db.session.query(Department.name, Department.id).all())
+    lecturers = {
+        staff_id: {'id': lecturer_id, 'department_id': department_id}
+        for lecturer_id, staff_id, department_id in db.session.query(Lecturer.id, Lecturer.staff_id, Lecturer.department_id).all()
+    }
+    users = [
+        row._asdict() for row in
+        db.session.query(User.id, User.name, User.email, User.role, User.department_id, User.lecturer_id).all()
+    ]
+    return instructors, departments, lecturers, users
+
+
+def _plan(instructors, departments, lecturers, users):
+    """
+    Diffs the UMIS directory against the local lecturers and users.
+    Returns the rows to insert and update and the report counters.
+    """
+    users_by_lecturer = {user['lecturer_id']: user for user in users if user['lecturer_id'] is not None}
+    taken_emails = {user['email'].lower() for user in users if user['email']}
+
+    new_lecturers, lecturer_updates = [], []
+    # (instructor, department id) of instructors whose user account must be created
+    pending_users = []
+    user_changes = {}
+    unknown_departments = Counter()
+    # Departments whose UMIS HOD gets (or keeps) the HOD role, and the names of all flagged ones
+    hod_departments = set()
+    flagged_hod_departments = {}
+    umis_hod_user_ids = set()
+
+    for instructor in instructors:
+        department_id = departments.get(instructor.department_name)
+        if department_id is None:
+            unknown_departments[instructor.department_name or ''] += 1
+            continue
+        if instructor.is_hod:
+            flagged_hod_departments[department_id] = instructor.department_name
+
+        lecturer = lecturers.get(instructor.instructor_id)
+        if lecturer is None:
+            new_lecturers.append({'staff_id': instructor.instructor_id, 'department_id': department_id})
+            pending_users.append((instructor, department_id))
+            if instructor.is_hod:
+                hod_departments.add(department_id)
+            continue
+
+        if lecturer['department_id'] != department_id:
+            lecturer_updates.append({'id': lecturer['id'], 'department_id': department_id})
+
+        user = users_by_lecturer.get(lecturer['id'])
+        if user is None:
+            pending_users.append((instructor, department_id))
+            if instructor.is_hod:
+                hod_departments.add(department_id)
+            continue
+
+        changes = {}
+        if instructor.name and user['name'] != instructor.name:
+            changes['name'] = instructor.name
+        if user['department_id'] != department_id:
+            changes['department_id'] = department_id
+        if user['role'] in SYNCED_ROLES:
+            role = 'hod' if instructor.is_hod else 'lecturer'
+            if user['role'] != role:
+                changes['role'] = role
+            if instructor.is_hod:
+                hod_departments.add(department_id)
+        if instructor.is_hod:
+            umis_hod_user_ids.add(user['id'])
+        if changes:
+            user_changes[user['id']] = changes
+
+    # A department with a HOD in UMIS has no other HOD, unless that HOD's role is not ours to change
+    for user in users:
+        if user['role'] == 'hod' and user['department_id'] in hod_departments \
+                and user['id'] not in umis_hod_user_ids and 'role' not in user_changes.get(user['id'], {}):
+            user_changes.setdefault(user['id'], {})['role'] = 'lecturer'
+
+    new_users = []
+    for instructor, department_id in pending_users:
+        email = instructor.email
+        if email and email.lower() in taken_emails:
+            email = None
+        elif email:
+            taken_emails.add(email.lower())
+        new_users.append({
+            'staff_id': instructor.instructor_id,
+            'name': instructor.name or instructor.instructor_id,
+            'email': email,
+            'role': 'hod' if instructor.is_hod else 'lecturer',
+            'department_id': department_id,
+        })
+
+    # Bulk updates by primary key need the same keys in every row
+    users_by_id = {user['id']: user for user in users}
+    user_updates = [
+        {
+            'id': user_id,
+            'name': changes.get('name', users_by_id[user_id]['name']),
+            'department_id': changes.get('department_id', users_by_id[user_id]['department_id']),
+            'role': changes.get('role', users_by_id[user_id]['role']),
+        }
+        for user_id, changes in sorted(user_changes.items())
+    ]
+
+    report = {
+        "instructors": len(instructors),
+        "lecturers_created": len(new_lecturers),
+        "lecturers_moved": len(lecturer_updates),
+        "users_created": len(new_users),
+        "users_updated": len(user_updates),
+        "promoted_to_hod": sum(1 for changes in user_changes.values() if changes.get('role') == 'hod')
+                           + sum(1 for user in new_users if user['role'] == 'hod'),
+        "demoted_from_hod": sum(1 for changes in user_changes.values() if changes.get('role') == 'lecturer'),
+        "unknown_departments": dict(sorted(unknown_departments.items())),
+        "skipped_hod_departments": sorted(
+            name for department_id, name in flagged_hod_departments.items() if department_id not in hod_departments
+        ),
+    }
+    return new_lecturers, lecturer_updates, new_users, user_updates, report
+
+
+def _apply(new_lecturers, lecturer_updates, new_users, user_updates):
+    if new_lecturers:
+        db.session.execute(insert(Lecturer), new_lecturers)
+    if lecturer_updates:
+        db.session.execute(update(Lecturer), lecturer_updates)
+
+    if new_users:
+        staff_ids = [user['staff_id'] for user in new_users]
+        lecturer_ids = dict(db.session.query(Lecturer.staff_id, Lecturer.id).filter(Lecturer.staff_id.in_(staff_ids)).all())
+        db.session.execute(insert(User), [
+            {
+                'name': user['name'],
+                'email': user['email'],
+                'role': user['role'],
+                'department_id': user['department_id'],
+                'lecturer_id': lecturer_ids[user['staff_id']],
+            }
+            for user in new_users
+        ])
+    if user_updates:
+        db.session.execute(update(User), user_updates)
+
+
+def sync_faculty(refresh=True, dry_run=False):
+    """
+    Brings Lecturer and User in line with the UMIS instructor directory: creates the
+    missing lecturers and their user accounts, moves them between departments,
+    renames them, and gives the HOD role to the instructors UMIS flags as heads of
+    department (demoting the department's other HODs). Instructors of departments
+    unknown locally are skipped and reported.
+
+    The directory is downloaded from UMIS first unless `refresh` is False; with
+    `dry_run` the changes are only reported. Returns (report, error).
+    """
+    if refresh:
+        _, error = umis_directory_service.refresh_directory()
+        if error:
+            return None, error
+
+    try:
+        new_lecturers, lecturer_updates, new_users, user_updates, report = _plan(*_load_state())
+        report["dry_run"] = dry_run
+        if dry_run:
+            return report, None
+
+        _apply(new_lecturers, lecturer_updates, new_users, user_updates)
+        lecturer_directory_service.bump()
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"UMIS faculty sync failed: {e}", exc_info=True)
+        return None, f"UMIS faculty sync error: {str(e)}"
+
+    current_app.logger.info(f"UMIS faculty sync: {report}")
+    return report, None
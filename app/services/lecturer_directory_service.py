@@ -0,0 +1,172 @@
+import threading
+import time
+from collections import namedtuple
+
+from flask import current_app, g
+from sqlalchemy import func
+
+from app import db
+from app.models import Lecturer, User
+from app.services import cache_version_service
+
+VERSION_NAME = 'lecturer_directory'
+
+# Lecturer ids keyed by lecturer id, staff id and normalized user name
+LecturerDirectory = namedtuple('LecturerDirectory', ['by_id', 'by_staff_id', 'by_name'])
+
+_lock = threading.Lock()
+
+
+def normalize_name(name):
+    """
+    Folds case and repeated whitespace, the way names are compared by the MySQL collation.
+    """
+    return " ".join(str(name).split()).casefold()
+
+
+def _store():
+    # Kept per application so that separate apps (and test runs) never share entries
+    return current_app.extensions.setdefault('lecturer_directory', {'version': None, 'directories': {}})
+
+
+def _directories():
+    """
+    Returns this worker's directories, dropped when another worker has bumped the
+    version. The version row is read at most once per request (or once per
+    LECTURER_DIRECTORY_CHECK_INTERVAL seconds in a long application context).
+    """
+    store = _store()
+    interval = current_app.config.get('LECTURER_DIRECTORY_CHECK_INTERVAL', 1.0)
+    checked_at = g.get('lecturer_directory_checked_at')
+    if checked_at is not None and time.monotonic() - checked_at < interval:
+        return store['directories']
+
+    version = cache_version_service.get_version(VERSION_NAME)
+    with _lock:
+        if store['version'] != version:
+            store['version'] = version
+            store['directories'] = {}
+    g.lecturer_directory_checked_at = time.monotonic()
+    return store['directories']
+
+
+def _load_directory(department_id):
+    query = db.session.query(Lecturer.id, Lecturer.staff_id, User.name)\
+        .outerjoin(User, User.lecturer_id == Lecturer.id)\
+        .order_by(Lecturer.id)
+    if department_id is not None:
+        query = query.filter(Lecturer.department_id == department_id)
+
+    by_id, by_staff_id, by_name = {}, {}, {}
+    for lecturer_id, staff_id, name in query.all():
+        by_id[lecturer_id] = lecturer_id
+        by_staff_id[staff_id] = lecturer_id
+        if name:
+            # The lecturer with the lowest id wins when two staff share a name
+            by_name.setdefault(normalize_name(name), lecturer_id)
+
+    return LecturerDirectory(by_id, by_staff_id, by_name)
+
+
+def get_directory(department_id=None):
+    """
+    Returns the lecturer directory of a department, or of every department when
+    `department_id` is None. Directories are loaded with one query and kept in
+    memory until the directory version is bumped.
+    """
+    directories = _directories()
+
+    with _lock:
+        directory = directories.get(department_id)
+    if directory:
+        return directory
+
+    directory = _load_directory(department_id)
+    with _lock:
+        directories[department_id] = directory
+    return directory
+
+
+def bump():
+    """
+    Marks the directory as changed. Call it in the transaction that creates,
+    renames, moves or deletes lecturers or their user accounts; this worker
+    reloads on its next read and the others once they see the new version.
+    Does not commit.
+    """
+    cache_version_service.bump_version(VERSION_NAME)
+    with _lock:
+        _store()['directories'] = {}
+    g.pop('lecturer_directory_checked_at', None)
+
+
+def lecturer_reference(item):
+    """
+    Returns the value an allocation item identifies its lecturer by: `lecturerId`,
+    then `staffId`, then the `allocatedTo` name.
+    """
+    for key in ("lecturerId", "staffId", "allocatedTo"):
+        if item.get(key) not in (None, ""):
+            return item.get(key)
+    return None
+
+
+def _lookup(directory, item):
+    if item.get("lecturerId") not in (None, ""):
+        try:
+            return directory.by_id.get(int(item.get("lecturerId")))
+        except (TypeError, ValueError):
+            return None
+    if item.get("staffId") not in (None, ""):
+        return directory.by_staff_id.get(str(item.get("staffId")))
+    if item.get("allocatedTo"):
+        return directory.by_name.get(normalize_name(item.get("allocatedTo")))
+    return None
+
+
+def _query_lecturer(item, department_id):
+    """
+    Looks an allocation item's lecturer up in the database, preferring the
+    allocating department. Used when the cached directories do not know it.
+    """
+    query = db.session.query(Lecturer.id)
+    if item.get("lecturerId") not in (None, ""):
+        try:
+            query = query.filter(Lecturer.id == int(item.get("lecturerId")))
+        except (TypeError, ValueError):
+            return None
+    elif item.get("staffId") not in (None, ""):
+        query = query.filter(Lecturer.staff_id == str(item.get("staffId")))
+    elif item.get("allocatedTo"):
+        query = query.join(User, User.lecturer_id == Lecturer.id)\
+            .filter(func.lower(User.name) == normalize_name(item.get("allocatedTo")))
+    else:
+        return None
+
+    if department_id is not None:
+        query = query.order_by((Lecturer.department_id == department_id).desc())
+    return query.order_by(Lecturer.id).limit(1).scalar()
+
+
+def resolve_lecturer(item, department_id=None):
+    """
+    Returns the id of the lecturer an allocation item refers to, or None. The
+    department's own lecturers are searched first, so a shared name resolves to
+    the colleague in the allocating department; other departments are searched
+    only when that fails. A lecturer missing from the cached directories is
+    looked up with one query, in case it was added since they were loaded.
+    """
+    if department_id is not None:
+        lecturer_id = _lookup(get_directory(department_id), item)
+        if lecturer_id is not None:
+            return lecturer_id
+    lecturer_id = _lookup(get_directory(), item)
+    if lecturer_id is not None:
+        return lecturer_id
+
+    lecturer_id = _query_lecturer(item, department_id)
+    if lecturer_id is not None:
+        # The directories are behind the database: reload them on the next read
+        with _lock:
+            _store()['directories'] = {}
+    return lecturer_id
@@ -0,0 +1,238 @@
+import os
+import smtplib
+import socket
+import time
+from datetime import datetime, timezone, timedelta
+
+from flask import current_app
+from flask_mail import Message
+from sqlalchemy import func
+
+from app.extensions import db, mail
+from app.models import MailOutboxMessage
+
+# Errors about one message; the connection stays usable for the next one
+MESSAGE_ERRORS = (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused, smtplib.SMTPDataError)
+# Message errors after which the message is not retried
+PERMANENT_ERRORS = (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused)
+# Errors that mean the SMTP connection is gone and must be reopened
+CONNECTION_ERRORS = (smtplib.SMTPServerDisconnected, ConnectionError, socket.timeout)
+# Replaces the body of a sent or failed message: credentials emails carry a plaintext password
+REDACTED_BODY = "[removed after the message was sent or given up on]"
+
+
+def enqueue(recipient, subject, body):
+    """
+    Queues an email for the outbox worker. Does not commit: call it in the
+    transaction that creates what the email announces, so that both are saved
+    or neither is.
+    """
+    message = MailOutboxMessage(recipient=recipient, subject=subject, body=body)
+    db.session.add(message)
+    return message
+
+
+def get_message_status(message_id):
+    """
+    Returns the delivery status of a queued email, or an error if it does not exist.
+    """
+    message = db.session.get(MailOutboxMessage, message_id)
+    if not message:
+        return None, "Message not found"
+
+    return {
+        "id": message.id,
+        "recipient": message.recipient,
+        "subject": message.subject,
+        "status": message.status,
+        "attempts": message.attempts,
+        "last_error": message.last_error,
+        "created_at": message.created_at.isoformat() if message.created_at else None,
+        "next_attempt_at": message.next_attempt_at.isoformat() if message.status == 'pending' else None,
+        "sent_at": message.sent_at.isoformat() if message.sent_at else None,
+    }, None
+
+
+def get_outbox_summary(recent_failures=10):
+    """
+    Returns the number of messages per status and the most recent failures.
+    """
+    counts = dict(db.session.query(MailOutboxMessage.status, func.count(MailOutboxMessage.id))
+                  .group_by(MailOutboxMessage.status).all())
+    failures = MailOutboxMessage.query.filter(MailOutboxMessage.last_error.isnot(None))\
+        .order_by(MailOutboxMessage.id.desc()).limit(recent_failures).all()
+
+    return {
+        "counts": {status: counts.get(status, 0) for status in ("pending", "sending", "sent", "failed")},
+        "recent_failures": [{
+            "id": message.id,
+            "recipient": message.recipient,
+            "status": message.status,
+            "attempts": message.attempts,
+            "last_error": message.last_error,
+        } for message in failures],
+    }
+
+
+def claim_batch(worker_id, limit):
+    """
+    Claims up to `limit` due messages for this worker, oldest first.
+    The conditional UPDATE makes sure two workers never send the same message.
+    """
+    now = datetime.now(timezone.utc)
+    ids = [message_id for (message_id,) in db.session.query(MailOutboxMessage.id).filter(
+        MailOutboxMessage.status == 'pending',
+        MailOutboxMessage.next_attempt_at <= now
+    ).order_by(MailOutboxMessage.id).limit(limit).all()]
+    if not ids:
+        return []
+
+    MailOutboxMessage.query.filter(
+        MailOutboxMessage.id.in_(ids),
+        MailOutboxMessage.status == 'pending'
+    ).update({
+        MailOutboxMessage.status: 'sending',
+        MailOutboxMessage.worker_id: worker_id,
+        MailOutboxMessage.claimed_at: now,
+    }, synchronize_session=False)
+    db.session.commit()
+
+    return MailOutboxMessage.query.filter(
+        MailOutboxMessage.id.in_(ids),
+        MailOutboxMessage.status == 'sending',
+        MailOutboxMessage.worker_id == worker_id
+    ).order_by(MailOutboxMessage.id).all()
+
+
+def requeue_stale_messages(max_age_seconds):
+    """
+    Puts back into the queue messages whose worker died while sending them.
+    """
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=max_age_seconds)
+    count = MailOutboxMessage.query.filter(
+        MailOutboxMessage.status == 'sending',
+        MailOutboxMessage.claimed_at < cutoff
+    ).update({MailOutboxMessage.status: 'pending', MailOutboxMessage.worker_id: None}, synchronize_session=False)
+    db.session.commit()
+    return count
+
+
+def _record_failure(message, error):
+    config = current_app.config
+    message.attempts += 1
+    message.last_error = f"{type(error).__name__}: {error}"
+    message.worker_id = None
+
+    if isinstance(error, PERMANENT_ERRORS) or message.attempts >= config.get('MAIL_OUTBOX_MAX_ATTEMPTS', 5):
+        message.status = 'failed'
+        message.body = REDACTED_BODY
+        current_app.logger.error(f"Mail outbox gave up on message {message.id} to {message.recipient}: {message.last_error}")
+    else:
+        delay = config.get('MAIL_OUTBOX_RETRY_DELAY', 60) * 2 ** (message.attempts - 1)
+        message.status = 'pending'
+        message.next_attempt_at = datetime.now(timezone.utc) + timedelta(seconds=delay)
+
+
+class _SmtpSession:
+    """
+    One SMTP connection reused for every message of a batch, opened on the first
+    send and reopened once if the server dropped it.
+    """
+
+    def __init__(self):
+        self.connection = None
+
+    def send(self, email):
+        if self.connection is not None:
+            try:
+                self.connection.send(email)
+                return
+            except CONNECTION_ERRORS:
+                self.close()
+
+        self.connection = mail.connect()
+        self.connection.__enter__()
+        self.connection.send(email)
+
+    def close(self):
+        if self.connection is None:
+            return
+        try:
+            self.connection.__exit__(None, None, None)
+        except Exception:
+            # The server may already have dropped the connection
+            pass
+        self.connection = None
+
+
+def send_messages(messages, clock=time.monotonic, sleep=time.sleep):
+    """
+    Sends claimed messages over one SMTP connection, at most MAIL_OUTBOX_RATE_PER_SECOND
+    per second. Failed messages are retried later with a doubling delay until
+    MAIL_OUTBOX_MAX_ATTEMPTS; when the server cannot be reached the rest of the batch
+    is put back the same way. Each outcome is committed as soon as it is known, and
+    the body of a sent or failed message is not kept.
+    Returns the number of messages sent.
+    """
+    rate = current_app.config.get('MAIL_OUTBOX_RATE_PER_SECOND', 5)
+    interval = 1.0 / rate if rate else 0
+    sent = 0
+    next_send = clock()
+    smtp = _SmtpSession()
+
+    try:
+        for index, message in enumerate(messages):
+            if interval:
+                wait = next_send - clock()
+                if wait > 0:
+                    sleep(wait)
+                next_send = max(next_send, clock()) + interval
+
+            try:
+                smtp.send(Message(message.subject, recipients=[message.recipient], body=message.body))
+            except MESSAGE_ERRORS as e:
+                _record_failure(message, e)
+            except OSError as e:
+                # The server is unreachable (smtplib errors are OSErrors too): retry the rest of the batch later
+                smtp.close()
+                for unsent in messages[index:]:
+                    _record_failure(unsent, e)
+                db.session.commit()
+                break
+            except Exception as e:
+                _record_failure(message, e)
+            else:
+                message.status = 'sent'
+                message.sent_at = datetime.now(timezone.utc)
+                message.last_error = None
+                message.body = REDACTED_BODY
+                sent += 1
+            db.session.commit()
+    finally:
+        smtp.close()
+
+    return sent
+
+
+def run_worker(worker_id=None, poll_interval=5.0, burst=False):
+    """
+    Drains the mail outbox. In burst mode the worker returns once no message is
+    due, otherwise it keeps polling every `poll_interval` seconds.
+    Returns the number of messages sent.
+    """
+    worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+    config = current_app.config
+    requeue_stale_messages(config.get('MAIL_OUTBOX_STALE_SECONDS', 900))
+
+    sent = 0
+    while True:
+        messages = claim_batch(worker_id, config.get('MAIL_OUTBOX_BATCH_SIZE', 50))
+        if messages:
+            sent += send_messages(messages)
+            continue
+
+        if burst:
+            return sent
+
+        db.session.remove()
+        time.sleep(poll_interval)
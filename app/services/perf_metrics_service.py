@@ -0,0 +1,180 @@
+import bisect
+import threading
+import time
+
+from flask import current_app, g, has_request_context, request
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Upper bounds, in milliseconds, of the latency histogram buckets; the last one is open
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+_lock = threading.Lock()
+_engine_hooks_installed = False
+
+
+class TimedJSONProvider(DefaultJSONProvider):
+    """
+    The default JSON provider, timing every dumps() made during a request so that
+    serialization shows up apart from database time.
+    """
+
+    def dumps(self, obj, **kwargs):
+        started = time.perf_counter()
+        try:
+            return super().dumps(obj, **kwargs)
+        finally:
+            perf = _current()
+            if perf is not None:
+                perf['serialization'] += time.perf_counter() - started
+
+
+def _current():
+    # Statements and JSON outside requests (workers, shell scripts) are not recorded
+    if has_request_context():
+        return g.get('perf')
+    return None
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # Kept on the execution context, which is dropped with a failing statement
+    if context is not None and _current() is not None:
+        context._perf_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    perf = _current()
+    started = getattr(context, '_perf_started', None)
+    if perf is not None and started is not None:
+        perf['statements'] += 1
+        perf['db'] += time.perf_counter() - started
+
+
+def init_app(app):
+    """
+    Records, for every request, the number of SQL statements, the time spent in the
+    database and in JSON serialization and the total latency, per endpoint. Requests
+    over SLOW_REQUEST_MS or SLOW_REQUEST_STATEMENTS are logged as they finish.
+    """
+    global _engine_hooks_installed
+
+    if not app.config.get('PERF_METRICS_ENABLED', True):
+        return
+
+    provider = TimedJSONProvider(app)
+    provider.sort_keys = app.json.sort_keys
+    app.json = provider
+
+    with _lock:
+        if not _engine_hooks_installed:
+            event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+            event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+            _engine_hooks_installed = True
+
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+
+
+def _start_request():
+    g.perf = {'started': time.perf_counter(), 'statements': 0, 'db': 0.0, 'serialization': 0.0}
+
+
+def _finish_request(response):
+    perf = g.pop('perf', None)
+    if perf is None:
+        return response
+
+    total_ms = (time.perf_counter() - perf['started']) * 1000
+    db_ms = perf['db'] * 1000
+    serialization_ms = perf['serialization'] * 1000
+    endpoint = f"{request.method} {request.url_rule.rule}" if request.url_rule else f"{request.method} <unmatched>"
+
+    _record(endpoint, total_ms, db_ms, serialization_ms, perf['statements'])
+
+    config = current_app.config
+    if total_ms >= config.get('SLOW_REQUEST_MS', 1000) or perf['statements'] >= config.get('SLOW_REQUEST_STATEMENTS', 100):
+        current_app.logger.warning(
+            f"Slow request {request.method} {request.full_path.rstrip('?')} endpoint='{endpoint}' "
+            f"status={response.status_code} total_ms={total_ms:.1f} db_ms={db_ms:.1f} "
+            f"serialization_ms={serialization_ms:.1f} statements={perf['statements']}"
+        )
+    return response
+
+
+def _store():
+    # Kept per application so that separate apps (and test runs) never share metrics
+    return current_app.extensions.setdefault('perf_metrics', {})
+
+
+def _record(endpoint, total_ms, db_ms, serialization_ms, statements):
+    bucket = bisect.bisect_left(LATENCY_BUCKETS_MS, total_ms)
+
+    with _lock:
+        stats = _store().setdefault(endpoint, {
+            'requests': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'db_ms': 0.0, 'max_db_ms': 0.0,
+            'serialization_ms': 0.0, 'statements': 0, 'max_statements': 0,
+            'histogram': [0] * (len(LATENCY_BUCKETS_MS) + 1),
+        })
+        stats['requests'] += 1
+        stats['total_ms'] += total_ms
+        stats['max_ms'] = max(stats['max_ms'], total_ms)
+        stats['db_ms'] += db_ms
+        stats['max_db_ms'] = max(stats['max_db_ms'], db_ms)
+        stats['serialization_ms'] += serialization_ms
+        stats['statements'] += statements
+        stats['max_statements'] = max(stats['max_statements'], statements)
+        stats['histogram'][bucket] += 1
+
+
+def _bucket_label(index):
+    if index < len(LATENCY_BUCKETS_MS):
+        return f"<={LATENCY_BUCKETS_MS[index]}ms"
+    return f">{LATENCY_BUCKETS_MS[-1]}ms"
+
+
+def _percentile(histogram, requests, fraction, max_ms):
+    """
+    Returns the upper bound of the bucket holding the given fraction of requests,
+    or the slowest request seen when that bucket is the open one.
+    """
+    seen = 0
+    for index, count in enumerate(histogram):
+        seen += count
+        if seen >= fraction * requests:
+            return LATENCY_BUCKETS_MS[index] if index < len(LATENCY_BUCKETS_MS) else round(max_ms, 1)
+    return round(max_ms, 1)
+
+
+def get_report():
+    """
+    Returns the per-endpoint figures of this worker since it started (or was reset),
+    the endpoints taking the most time overall first.
+    """
+    with _lock:
+        snapshot = {endpoint: dict(stats, histogram=list(stats['histogram'])) for endpoint, stats in _store().items()}
+
+    report = []
+    for endpoint, stats in sorted(snapshot.items(), key=lambda item: item[1]['total_ms'], reverse=True):
+        requests = stats['requests']
+        report.append({
+            "endpoint": endpoint,
+            "requests": requests,
+            "latency_ms": {
+                "avg": round(stats['total_ms'] / requests, 1),
+                "p50": _percentile(stats['histogram'], requests, 0.50, stats['max_ms']),
+                "p95": _percentile(stats['histogram'], requests, 0.95, stats['max_ms']),
+                "p99": _percentile(stats['histogram'], requests, 0.99, stats['max_ms']),
+                "max": round(stats['max_ms'], 1),
+            },
+            "db_ms": {"avg": round(stats['db_ms'] / requests, 1), "max": round(stats['max_db_ms'], 1)},
+            "serialization_ms": {"avg": round(stats['serialization_ms'] / requests, 1)},
+            "statements": {"avg": round(stats['statements'] / requests, 1), "max": stats['max_statements']},
+            "histogram": {_bucket_label(i): count for i, count in enumerate(stats['histogram']) if count},
+        })
+    return report
+
+
+def reset():
+    with _lock:
+        _store().clear()
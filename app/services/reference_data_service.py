@@ -0,0 +1,129 @@
+import time
+from collections import namedtuple
+
+from flask import current_app, g
+
+from app import db
+from app.models import AcademicSession, Bulletin, Level, Semester
+from app.services import cache_version_service
+
+VERSION_NAME = 'reference_data'
+
+# Read-only copies of the reference rows, safe to share between requests and threads
+SemesterRef = namedtuple('SemesterRef', ['id', 'name', 'is_active'])
+LevelRef = namedtuple('LevelRef', ['id', 'name'])
+BulletinRef = namedtuple('BulletinRef', ['id', 'name', 'start_year', 'end_year', 'is_active'])
+SessionRef = namedtuple('SessionRef', ['id', 'name', 'is_active'])
+
+ReferenceData = namedtuple('ReferenceData', ['version', 'semesters', 'levels', 'bulletins', 'sessions'])
+
+
+def _store():
+    # Kept per application so that separate apps (and test runs) never share data
+    return current_app.extensions.setdefault('reference_data', {})
+
+
+def _load(version):
+    return ReferenceData(
+        version=version,
+        semesters=[SemesterRef(*row) for row in db.session.query(Semester.id, Semester.name, Semester.is_active).order_by(Semester.id).all()],
+        levels=[LevelRef(*row) for row in db.session.query(Level.id, Level.name).order_by(Level.id).all()],
+        bulletins=[BulletinRef(*row) for row in db.session.query(
+            Bulletin.id, Bulletin.name, Bulletin.start_year, Bulletin.end_year, Bulletin.is_active
+        ).order_by(Bulletin.id).all()],
+        sessions=[SessionRef(*row) for row in db.session.query(
+            AcademicSession.id, AcademicSession.name, AcademicSession.is_active
+        ).order_by(AcademicSession.id).all()],
+    )
+
+
+def _data():
+    """
+    Returns the reference data of this process. The version row is read at most
+    once per request (or once per REFERENCE_DATA_CHECK_INTERVAL seconds in a long
+    application context such as a worker), and the tables are reloaded only when
+    another worker has bumped it.
+    """
+    store = _store()
+    data = store.get('data')
+    interval = current_app.config.get('REFERENCE_DATA_CHECK_INTERVAL', 1.0)
+    checked_at = g.get('reference_data_checked_at')
+
+    if data is not None and checked_at is not None and time.monotonic() - checked_at < interval:
+        return data
+
+    version = cache_version_service.get_version(VERSION_NAME)
+    if data is None or data.version != version:
+        data = _load(version)
+        store['data'] = data
+    g.reference_data_checked_at = time.monotonic()
+    return data
+
+
+def bump():
+    """
+    Marks sessions, semesters, levels or bulletins as changed. Call it in the
+    transaction that changes them; this worker reloads on its next read and the
+    others once they see the new version. Does not commit.
+    """
+    cache_version_service.bump_version(VERSION_NAME)
+    _store().pop('data', None)
+    g.pop('reference_data_checked_at', None)
+
+
+def _as_id(value):
+    # Ids often arrive as strings from request bodies
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def semesters():
+    return _data().semesters
+
+
+def semester(semester_id):
+    semester_id = _as_id(semester_id)
+    return next((s for s in _data().semesters if s.id == semester_id), None)
+
+
+def semester_by_name(name):
+    return next((s for s in _data().semesters if s.name == name), None)
+
+
+def active_semester():
+    return next((s for s in _data().semesters if s.is_active), None)
+
+
+def active_semesters():
+    return [s for s in _data().semesters if s.is_active]
+
+
+def levels():
+    return _data().levels
+
+
+def level(level_id):
+    level_id = _as_id(level_id)
+    return next((l for l in _data().levels if l.id == level_id), None)
+
+
+def bulletins():
+    return _data().bulletins
+
+
+def bulletin_by_name(name):
+    return next((b for b in _data().bulletins if b.name == name), None)
+
+
+def active_bulletin():
+    return next((b for b in _data().bulletins if b.is_active), None)
+
+
+def sessions():
+    return _data().sessions
+
+
+def active_session():
+    return next((s for s in _data().sessions if s.is_active), None)
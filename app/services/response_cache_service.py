@@ -0,0 +1,76 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+from flask import Response, current_app, request
+
+from app.services import cache_version_service, reference_data_service
+
+VERSION_PREFIX = 'table:'
+
+# Tables whose version is already kept by the reference data cache
+_SHARED_VERSIONS = {
+    'academic_session': reference_data_service.VERSION_NAME,
+    'bulletin': reference_data_service.VERSION_NAME,
+    'level': reference_data_service.VERSION_NAME,
+    'semester': reference_data_service.VERSION_NAME,
+}
+
+_cache_lock = threading.Lock()
+
+
+def _cache():
+    # Kept per application so that separate apps (and test runs) never share responses
+    return current_app.extensions.setdefault('response_cache', OrderedDict())
+
+
+def _version_name(table):
+    return _SHARED_VERSIONS.get(table, VERSION_PREFIX + table)
+
+
+def bump(*tables):
+    """
+    Marks catalog tables as changed, so every cached response built from them is
+    rebuilt and gets a new ETag. Call it in the transaction that changes the rows.
+    Does not commit.
+    """
+    for name in sorted({_version_name(table) for table in tables}):
+        cache_version_service.bump_version(name)
+
+
+def cached_response(tables, build):
+    """
+    Returns the JSON response of a read-only catalog endpoint. The response is keyed
+    by the request path and query string together with the versions of the tables it
+    is built from, which cost one query to read. The serialized bytes are kept in a
+    bounded LRU cache, and an If-None-Match carrying the current ETag gets a 304
+    without the body being built at all.
+    """
+    names = sorted({_version_name(table) for table in tables})
+    versions = cache_version_service.get_versions(names)
+    key = (request.full_path, tuple(versions[name] for name in names))
+    etag = hashlib.md5(repr(key).encode()).hexdigest()
+
+    cache = _cache()
+    with _cache_lock:
+        body = cache.get(key)
+        if body is not None:
+            cache.move_to_end(key)
+
+    if body is None and etag not in request.if_none_match:
+        body = current_app.json.dumps(build()).encode() + b"\n"
+        with _cache_lock:
+            cache[key] = body
+            while len(cache) > current_app.config.get('RESPONSE_CACHE_SIZE', 512):
+                cache.popitem(last=False)
+
+    response = Response(body or b"", mimetype='application/json')
+    response.set_etag(etag)
+    # Clients may keep the body but must revalidate it on every use
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response.make_conditional(request)
+
+
+def clear_response_cache():
+    with _cache_lock:
+        _cache().clear()
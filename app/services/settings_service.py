@@ -0,0 +1,99 @@
+import hashlib
+import json
+import threading
+import time
+
+from flask import current_app
+
+from app import db
+from app.models.models import AppSetting, Semester
+from app.services import cache_version_service
+
+VERSION_NAME = 'app_settings'
+
+# Flags served by the public status endpoints: response key -> (source, name)
+FLAGS = {
+    "isMaintenanceMode": ("setting", "maintenance_mode"),
+    "isAllocationClosed": ("setting", "close_allocation"),
+    "isFirstSemesterActive": ("semester", "First Semester"),
+    "isSecondSemesterActive": ("semester", "Second Semester"),
+    "isSummerSemesterActive": ("semester", "Summer Semester"),
+}
+
+_lock = threading.Lock()
+
+
+def _store():
+    # Kept per application so that separate apps (and test runs) never share flags
+    return current_app.extensions.setdefault('app_settings', {})
+
+
+def _load():
+    settings = dict(db.session.query(AppSetting.setting_name, AppSetting.is_enabled).all())
+    semesters = dict(db.session.query(Semester.name, Semester.is_active).all())
+
+    flags = {}
+    for key, (source, name) in FLAGS.items():
+        # Missing rows mean the flag was never switched on
+        value = settings.get(name) if source == "setting" else semesters.get(name)
+        flags[key] = bool(value)
+    return flags
+
+
+def get_flags():
+    """
+    Returns every public flag from memory. The version row is read at most once
+    per SETTINGS_CHECK_INTERVAL seconds per worker, and the flags are reloaded
+    only when another worker has bumped it, so polling them costs no queries.
+    """
+    store = _store()
+    interval = current_app.config.get('SETTINGS_CHECK_INTERVAL', 1.0)
+
+    with _lock:
+        flags = store.get('flags')
+        if flags is not None and time.monotonic() - store['checked_at'] < interval:
+            return flags
+
+    version = cache_version_service.get_version(VERSION_NAME)
+    if flags is None or store.get('version') != version:
+        flags = _load()
+
+    with _lock:
+        store.update(flags=flags, version=version, checked_at=time.monotonic())
+    return flags
+
+
+def get_flag(key):
+    return get_flags()[key]
+
+
+def flags_etag(flags):
+    """
+    Returns an ETag for a set of flags; it changes whenever one of them does.
+    """
+    payload = json.dumps(flags, sort_keys=True).encode()
+    return hashlib.md5(payload).hexdigest()
+
+
+def set_setting(setting_name, enable):
+    """
+    Switches an AppSetting flag on or off, creating it when missing, and bumps the
+    settings version. Does not commit.
+    """
+    setting = AppSetting.query.filter_by(setting_name=setting_name).first()
+    if not setting:
+        setting = AppSetting(setting_name=setting_name)
+        db.session.add(setting)
+
+    setting.is_enabled = enable
+    bump()
+
+
+def bump():
+    """
+    Marks the flags as changed: this worker reloads on its next read and the
+    others within SETTINGS_CHECK_INTERVAL seconds. Does not commit.
+    """
+    cache_version_service.bump_version(VERSION_NAME)
+    with _lock:
+        _store().clear()
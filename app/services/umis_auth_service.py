@@ -1,16 +1,17 @@
 import json
 import base64
-import requests
 import os
 from dotenv import load_dotenv
 from flask import session, current_app
+from app.services.umis_client import umis_client, UmisUnavailableError
+from app.services.umis_directory_service import find_instructor
 
 # Load the variables from .env
 load_dotenv()
     
 def auth_user(data):
     """
-    Authenticates with UMIS and fetches instructor data.
+    Authenticates with UMIS and returns the instructor's entry from the UMIS directory.
     Reuses the UMIS token from the Flask session if available.
     """
     try:
@@ -114,7 +115,7 @@ def auth_user(data):
                 'authpass': password_enc
             }
             url = os.getenv('UMIS_AUTH_URL')
-            response = requests.post(url, headers=header)
+            response = umis_client.post(url, headers=header)
 
             if response.status_code != 200:
                 return None, f"UMIS auth failed ({response.status_code})"
@@ -183,74 +184,14 @@ def auth_user(data):
         if "bsad" in temp_dept:
             umisid = os.getenv('BSAD')
 
-        # FETCH INSTRUCTOR DATA
-        instructor_api = f"{os.getenv('UMIS_INSTRUCTOR_URL')}{umisid}"
-        header = {
-            'action': 'read',
-            'authorization': umis_token
-        }
-        resp = requests.get(instructor_api, headers=header)
-
-        # --- ADVANCED: Handle expired tokens ---
-        # if resp.status_code == 401:
-        #     print("UMIS token expired. Clearing from session and retrying.")
-        #     session.pop('umis_token', None) # Remove the bad token
-        #     # We can recursively call the function again to get a new token.
-        #     # This is a robust way to handle expiration.
-        #     return auth_user(data)
-
-        if resp.status_code != 200:
-            return None, f"Failed to fetch instructor data ({resp.status_code})"
-        
-        instructors = resp.json()
-        if 'data' not in instructors or not isinstance(instructors['data'], list):
-            return None, "Invalid instructor data format from UMIS"
-
-        for instructor in instructors['data']:
-            if instructor.get('instructorid') == umisid:
-                return instructor, None, umis_token, umisid # Success
-                         
-        return None, "Instructor not found in UMIS data"
-    
-    except Exception as e:
-        return None, f"UMIS authentication error: {str(e)}"
-    
+        # Look the instructor up in the local UMIS directory, refreshed with the dev account when stale
+        instructor, error = find_instructor(umisid)
+        if error:
+            return None, error
 
-def auth_dev_user():
-    """
-    Authenticates with UMIS and push allocation.
-    """
-    try:
-        umisid = os.getenv('API_DEV_ID')
-        password = os.getenv('API_DEV_PASSWORD')
+        return instructor, None, umis_token, umisid # Success
 
-        if not umisid or not password:
-            return None, "Missing UMIS ID or password"
-        
-            
-        username_byte = base64.b64encode(umisid.encode('ascii'))
-        username = username_byte.decode('ascii')
-        password_byte = base64.b64encode(password.encode('ascii'))
-        password_enc = password_byte.decode('ascii')
-
-        header = {
-            'Content-Type': 'multipart/form-data',
-            'action': 'authorization',
-            'authuser': username,
-            'authpass': password_enc
-        }
-        url = os.getenv('UMIS_AUTH_URL')
-        response = requests.post(url, headers=header)
-
-        if response.status_code != 200:
-            return None, f"UMIS auth failed ({response.status_code})"
-        
-        token_data = response.json()
-        umis_token = token_data.get('access_token')
-        if not umis_token:
-            return None, "No access token received from UMIS"
-                         
-        return umis_token, None # Success
-    
+    except UmisUnavailableError as e:
+        return None, str(e)
     except Exception as e:
-        return None, f"UMIS authentication error: {str(e)}"
\ No newline at end of file
+        return None, f"UMIS authentication error: {str(e)}"
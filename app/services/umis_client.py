@@ -0,0 +1,137 @@
+import threading
+import time
+
+import requests
+from flask import current_app
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+class UmisUnavailableError(requests.exceptions.RequestException):
+    """
+    Raised without contacting UMIS while the circuit breaker is open.
+    """
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive UMIS failures and then rejects calls
+    for `reset_timeout` seconds. After that a single trial call is let through:
+    success closes the breaker, failure opens it again.
+    """
+
+    def __init__(self, clock=time.monotonic):
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.failures = 0
+        self.opened_at = None
+        self._trial_running = False
+
+    def _config(self):
+        config = current_app.config
+        return config.get('UMIS_BREAKER_FAILURE_THRESHOLD', 5), config.get('UMIS_BREAKER_RESET_TIMEOUT', 30)
+
+    @property
+    def state(self):
+        _, reset_timeout = self._config()
+        if self.opened_at is None:
+            return "closed"
+        if self._clock() - self.opened_at >= reset_timeout:
+            return "half-open"
+        return "open"
+
+    def before_call(self):
+        with self._lock:
+            state = self.state
+            if state == "open" or (state == "half-open" and self._trial_running):
+                raise UmisUnavailableError("UMIS is unavailable, please try again shortly")
+            if state == "half-open":
+                self._trial_running = True
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_running = False
+
+    def record_failure(self):
+        failure_threshold, _ = self._config()
+        with self._lock:
+            self.failures += 1
+            self._trial_running = False
+            if self.opened_at is not None or self.failures >= failure_threshold:
+                self.opened_at = self._clock()
+
+    def reset(self):
+        self.record_success()
+
+
+class UmisClient:
+    """
+    The HTTP client used for UMIS authentication and lookups: one keep-alive session
+    per process, connect and read timeouts on every call, retries with backoff on
+    connection errors and 502/503/504, and a circuit breaker that fails fast while
+    UMIS is down instead of tying up workers.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._session = None
+        self.breaker = CircuitBreaker()
+
+    def _http(self):
+        with self._lock:
+            if self._session is None:
+                config = current_app.config
+                retries = Retry(
+                    total=config.get('UMIS_RETRIES', 2),
+                    backoff_factor=config.get('UMIS_RETRY_BACKOFF', 0.3),
+                    status_forcelist=(502, 503, 504),
+                    allowed_methods=None,  # UMIS reads and authorization calls are safe to repeat
+                    raise_on_status=False,
+                )
+                pool_size = config.get('UMIS_HTTP_POOL_SIZE', 20)
+                adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retries)
+                session = requests.Session()
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                self._session = session
+            return self._session
+
+    def request(self, method, url, **kwargs):
+        """
+        Sends a request to UMIS and returns the response. Raises UmisUnavailableError
+        while the breaker is open and requests' exceptions on network failures.
+        Responses of 500 and above count as failures for the breaker.
+        """
+        self.breaker.before_call()
+
+        config = current_app.config
+        kwargs.setdefault('timeout', (config.get('UMIS_CONNECT_TIMEOUT', 3), config.get('UMIS_READ_TIMEOUT', 10)))
+        try:
+            response = self._http().request(method, url, **kwargs)
+        except requests.exceptions.RequestException:
+            self.breaker.record_failure()
+            raise
+
+        if response.status_code >= 500:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+        return response
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def close(self):
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+        self.breaker.reset()
+
+
+umis_client = UmisClient()
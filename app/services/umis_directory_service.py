@@ -0,0 +1,164 @@
+import os
+import threading
+from datetime import datetime, timezone
+
+from flask import current_app
+from sqlalchemy import func, insert
+
+from app import db
+from app.models import UmisInstructor
+from app.services.umis_token_service import auth_dev_user, dev_token_manager
+from app.services.umis_client import umis_client
+
+# Serializes refreshes within a worker so that a stale snapshot is downloaded once
+_refresh_lock = threading.Lock()
+
+
+def _age_seconds(refreshed_at):
+    if refreshed_at.tzinfo is None:
+        refreshed_at = refreshed_at.replace(tzinfo=timezone.utc)
+    return (datetime.now(timezone.utc) - refreshed_at).total_seconds()
+
+
+def _is_fresh(refreshed_at):
+    return _age_seconds(refreshed_at) < current_app.config.get('UMIS_DIRECTORY_TTL', 3600)
+
+
+def _fetch_instructors():
+    """
+    Downloads the full instructor list from UMIS with the dev account, refreshing
+    the cached dev token once if UMIS rejects it. User tokens are never used: the
+    list UMIS returns depends on the id it is asked for, and the snapshot must
+    hold every department.
+    Returns (list of instructors, error).
+    """
+    umisid = os.getenv('API_DEV_ID')
+    umis_token, error = auth_dev_user()
+    if error:
+        return None, f"Failed to authenticate with UMIS: {error}"
+
+    instructor_api = f"{os.getenv('UMIS_INSTRUCTOR_URL')}{umisid}"
+    header = {
+        'action': 'read',
+        'authorization': umis_token
+    }
+    resp = umis_client.get(instructor_api, headers=header)
+
+    if resp.status_code == 401:
+        # The cached dev token was rejected: refresh it and retry once
+        umis_token, error = dev_token_manager.refresh(stale_token=umis_token)
+        if error:
+            return None, f"Failed to authenticate with UMIS: {error}"
+        header['authorization'] = umis_token
+        resp = umis_client.get(instructor_api, headers=header)
+
+    if resp.status_code != 200:
+        return None, f"Failed to fetch instructor data ({resp.status_code})"
+
+    instructors = resp.json()
+    if 'data' not in instructors or not isinstance(instructors['data'], list):
+        return None, "Invalid instructor data format from UMIS"
+
+    return instructors['data'], None
+
+
+def replace_snapshot(instructors):
+    """
+    Replaces the stored directory with `instructors` (UMIS instructor list entries)
+    in one transaction. Returns the number of instructors stored.
+    """
+    refreshed_at = datetime.now(timezone.utc)
+    rows = {}
+    for instructor in instructors:
+        instructor_id = instructor.get('instructorid')
+        if not instructor_id:
+            continue
+        rows[str(instructor_id)] = {
+            'instructor_id': str(instructor_id),
+            'name': instructor.get('instructorname'),
+            'email': instructor.get('email'),
+            'umis_department_id': instructor.get('departmentid'),
+            'department_name': instructor.get('departmentname'),
+            'umis_school_id': instructor.get('schoolid'),
+            'school_name': instructor.get('schoolname'),
+            'is_hod': instructor.get('headofdepartment') == 'Yes',
+            'refreshed_at': refreshed_at,
+        }
+
+    db.session.query(UmisInstructor).delete(synchronize_session=False)
+    if rows:
+        db.session.execute(insert(UmisInstructor), list(rows.values()))
+    db.session.commit()
+    return len(rows)
+
+
+def refresh_directory():
+    """
+    Downloads the instructor list from UMIS and stores it as the new snapshot.
+    Returns (number of instructors, error).
+    """
+    with _refresh_lock:
+        try:
+            instructors, error = _fetch_instructors()
+        except Exception as e:
+            return None, f"UMIS directory refresh error: {str(e)}"
+        if error:
+            return None, error
+
+        count = replace_snapshot(instructors)
+        current_app.logger.info(f"UMIS instructor directory refreshed with {count} instructor(s)")
+        return count, None
+
+
+def snapshot_refreshed_at():
+    """Returns when the stored directory was last refreshed, None if it is empty."""
+    return db.session.query(func.max(UmisInstructor.refreshed_at)).scalar()
+
+
+def find_instructor(instructor_id):
+    """
+    Returns (UMIS instructor entry, error) for an instructor id, read from the stored
+    directory. The directory is refreshed first when it is older than
+    UMIS_DIRECTORY_TTL, or when the id is missing and the snapshot is older than
+    UMIS_DIRECTORY_MISS_REFRESH_INTERVAL (e.g. a newly hired HOD). If a refresh fails,
+    a stale entry is still returned.
+    """
+    instructor = db.session.get(UmisInstructor, instructor_id)
+    if instructor and _is_fresh(instructor.refreshed_at):
+        return instructor.to_umis(), None
+
+    if instructor is None:
+        refreshed_at = snapshot_refreshed_at()
+        miss_interval = current_app.config.get('UMIS_DIRECTORY_MISS_REFRESH_INTERVAL', 60)
+        if refreshed_at and _age_seconds(refreshed_at) < miss_interval:
+            return None, "Instructor not found in UMIS data"
+
+    stale = instructor.to_umis() if instructor else None
+    _, error = refresh_directory()
+    if error:
+        if stale:
+            current_app.logger.warning(f"Using stale UMIS directory entry for {instructor_id}: {error}")
+            return stale, None
+        return None, error
+
+    instructor = db.session.get(UmisInstructor, instructor_id)
+    if not instructor:
+        return None, "Instructor not found in UMIS data"
+    return instructor.to_umis(), None
+
+
+def list_instructors():
+    """
+    Returns (UMIS instructor entries ordered by name, error) from the stored directory,
+    refreshing it with the dev token first when it is empty or older than UMIS_DIRECTORY_TTL.
+    """
+    refreshed_at = snapshot_refreshed_at()
+    if refreshed_at is None or not _is_fresh(refreshed_at):
+        _, error = refresh_directory()
+        if error and refreshed_at is None:
+            return None, error
+        if error:
+            current_app.logger.warning(f"Using stale UMIS instructor directory: {error}")
+
+    instructors = UmisInstructor.query.order_by(UmisInstructor.name, UmisInstructor.instructor_id).all()
+    return [instructor.to_umis() for instructor in instructors], None
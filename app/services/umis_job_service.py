@@ -0,0 +1,247 @@
+import json
+import os
+import socket
+import time
+from datetime import datetime, timezone, timedelta
+
+from flask import current_app
+from sqlalchemy import func
+
+from app.extensions import db
+from app.models import CourseAllocation, ProgramCourse, Program, UmisPushJob
+from app.services import umis_push_service, allocation_summary_service
+from app.services.umis_token_service import auth_dev_user
+
+
+def _unpushed_count(query):
+    return query.filter(CourseAllocation.is_pushed_to_umis.isnot(True)).count()
+
+
+def _bulk_allocations_query(department_id, semester_id, session_id):
+    return db.session.query(CourseAllocation)\
+        .join(ProgramCourse, CourseAllocation.program_course_id == ProgramCourse.id)\
+        .join(Program, ProgramCourse.program_id == Program.id)\
+        .filter(
+            Program.department_id == department_id,
+            CourseAllocation.semester_id == semester_id,
+            CourseAllocation.session_id == session_id
+        )
+
+
+def _course_allocations_query(program_course_id):
+    return CourseAllocation.query.filter_by(program_course_id=program_course_id)
+
+
+def enqueue_bulk_push(department_id, semester_id, session_id, user_id):
+    """
+    Queues a push of every allocation of a department's semester to UMIS.
+    """
+    job = UmisPushJob(
+        job_type='bulk',
+        department_id=department_id,
+        semester_id=semester_id,
+        session_id=session_id,
+        requested_by_id=user_id,
+        total_count=_unpushed_count(_bulk_allocations_query(department_id, semester_id, session_id))
+    )
+    db.session.add(job)
+    db.session.commit()
+    return job
+
+
+def enqueue_course_push(program_course_id, user_id):
+    """
+    Queues a push of every allocated group of a program course to UMIS.
+    """
+    job = UmisPushJob(
+        job_type='course',
+        program_course_id=program_course_id,
+        requested_by_id=user_id,
+        total_count=_unpushed_count(_course_allocations_query(program_course_id))
+    )
+    db.session.add(job)
+    db.session.commit()
+    return job
+
+
+def get_job_status(job_id):
+    """
+    Returns the progress of a UMIS push job, or an error if it does not exist.
+    """
+    job = db.session.get(UmisPushJob, job_id)
+    if not job:
+        return None, "Push job not found"
+
+    return {
+        "id": job.id,
+        "job_type": job.job_type,
+        "status": job.status,
+        "department_id": job.department_id,
+        "semester_id": job.semester_id,
+        "program_course_id": job.program_course_id,
+        "total": job.total_count,
+        "pushed": job.pushed_count,
+        "failed": job.failed_count,
+        "pending": job.pending_count,
+        "errors": json.loads(job.errors) if job.errors else [],
+        "keyfields": json.loads(job.keyfields) if job.keyfields else [],
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "started_at": job.started_at.isoformat() if job.started_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+    }, None
+
+
+def claim_next_job(worker_id):
+    """
+    Atomically claims the oldest pending job for this worker.
+    The conditional UPDATE makes sure two workers never run the same job.
+    """
+    while True:
+        job = UmisPushJob.query.filter_by(status='pending')\
+            .order_by(UmisPushJob.created_at, UmisPushJob.id).first()
+        if not job:
+            return None
+
+        now = datetime.now(timezone.utc)
+        claimed = UmisPushJob.query.filter_by(id=job.id, status='pending').update({
+            UmisPushJob.status: 'running',
+            UmisPushJob.worker_id: worker_id,
+            UmisPushJob.started_at: now,
+            UmisPushJob.heartbeat_at: now,
+        }, synchronize_session=False)
+        db.session.commit()
+
+        if claimed == 1:
+            db.session.refresh(job)
+            return job
+
+
+def requeue_stale_jobs(max_age_seconds):
+    """
+    Puts back into the queue jobs whose worker died while running them: running
+    jobs without a heartbeat for `max_age_seconds`. A long job that is still
+    making progress keeps its heartbeat fresh and is left alone.
+
+    The progress is reset, since the rerun counts only the allocations still
+    unpushed; allocations that failed are retried and report their errors again.
+    """
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=max_age_seconds)
+    count = UmisPushJob.query.filter(
+        UmisPushJob.status == 'running',
+        func.coalesce(UmisPushJob.heartbeat_at, UmisPushJob.started_at) < cutoff
+    ).update({
+        UmisPushJob.status: 'pending',
+        UmisPushJob.worker_id: None,
+        UmisPushJob.pushed_count: 0,
+        UmisPushJob.failed_count: 0,
+        UmisPushJob.errors: None,
+        UmisPushJob.keyfields: None,
+    }, synchronize_session=False)
+    db.session.commit()
+    return count
+
+
+def run_job(job):
+    """
+    Pushes the allocations of a claimed job to UMIS in chunks, committing the
+    progress counters after each chunk so the status endpoint can report them.
+    """
+    chunk_size = current_app.config.get('UMIS_JOB_CHUNK_SIZE', 50)
+    errors = []
+    keyfields = []
+
+    try:
+        if job.job_type == 'bulk':
+            query = _bulk_allocations_query(job.department_id, job.semester_id, job.session_id)
+        else:
+            query = _course_allocations_query(job.program_course_id)
+
+        allocation_ids = [
+            row.id for row in query.with_entities(CourseAllocation.id)
+            .filter(CourseAllocation.is_pushed_to_umis.isnot(True))
+            .order_by(CourseAllocation.id).all()
+        ]
+
+        job.total_count = len(allocation_ids)
+        job.heartbeat_at = datetime.now(timezone.utc)
+        db.session.commit()
+
+        umis_token, auth_error = auth_dev_user()
+        if auth_error:
+            raise RuntimeError(f"Failed to authenticate with UMIS: {auth_error}")
+
+        for start in range(0, len(allocation_ids), chunk_size):
+            # Reload each chunk: committing progress expires previously loaded objects
+            chunk = CourseAllocation.query.filter(
+                CourseAllocation.id.in_(allocation_ids[start:start + chunk_size])
+            ).options(
+                db.joinedload(CourseAllocation.program_course).joinedload(ProgramCourse.course),
+                db.joinedload(CourseAllocation.program_course).joinedload(ProgramCourse.program),
+                db.joinedload(CourseAllocation.lecturer_profile),
+                db.joinedload(CourseAllocation.semester),
+                db.joinedload(CourseAllocation.session)
+            ).order_by(CourseAllocation.id).all()
+
+            result = umis_push_service.push_allocations_to_umis(chunk, umis_token, job.requested_by_id)
+
+            errors.extend(result["failed_pushes"])
+            keyfields.extend(result["success_keyfields"])
+            job.pushed_count += result["successful_pushes"]
+            job.failed_count += len(result["failed_pushes"])
+            job.errors = json.dumps(errors)
+            job.keyfields = json.dumps(keyfields)
+            job.heartbeat_at = datetime.now(timezone.utc)
+            db.session.commit()
+
+        # Allocations UMIS already holds are treated as pushed for single-course jobs
+        if job.job_type == 'course' and "already exists" in ' '.join(errors).lower():
+            _course_allocations_query(job.program_course_id).update({
+                CourseAllocation.is_pushed_to_umis: True,
+                CourseAllocation.pushed_to_umis_by_id: job.requested_by_id,
+                CourseAllocation.pushed_to_umis_at: datetime.now(timezone.utc),
+            }, synchronize_session=False)
+
+            program_course = db.session.get(ProgramCourse, job.program_course_id)
+            affected = db.session.query(CourseAllocation.session_id, CourseAllocation.semester_id)\
+                .filter_by(program_course_id=job.program_course_id).distinct().all()
+            for session_id, semester_id in affected:
+                allocation_summary_service.refresh_department_summary(program_course.program.department_id, session_id, semester_id)
+
+        job.status = 'completed'
+        job.finished_at = datetime.now(timezone.utc)
+        db.session.commit()
+
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"UMIS push job {job.id} failed: {str(e)}")
+        errors.append(str(e))
+        job.status = 'failed'
+        job.errors = json.dumps(errors)
+        job.finished_at = datetime.now(timezone.utc)
+        db.session.commit()
+
+    return job
+
+
+def run_worker(worker_id=None, poll_interval=2.0, burst=False):
+    """
+    Drains the push job queue. In burst mode the worker returns once the queue
+    is empty, otherwise it keeps polling for new jobs every `poll_interval` seconds.
+    Returns the number of jobs processed.
+    """
+    worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+    requeue_stale_jobs(current_app.config.get('UMIS_JOB_STALE_SECONDS', 3600))
+
+    processed = 0
+    while True:
+        job = claim_next_job(worker_id)
+        if job:
+            run_job(job)
+            processed += 1
+            continue
+
+        if burst:
+            return processed
+
+        db.session.remove()
+        time.sleep(poll_interval)
@@ -0,0 +1,151 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+import requests
+from requests.adapters import HTTPAdapter
+from flask import current_app
+
+from app.extensions import db
+from app.models import CourseAllocation
+from app.services import allocation_service, allocation_summary_service
+from app.services.umis_token_service import dev_token_manager
+
+
+def build_umis_payload(allocation, session_name=None):
+    """
+    Builds the UMIS allocation payload for a single CourseAllocation.
+    The allocation's own session is used when no session name is given.
+    """
+    session_name = session_name or allocation.session.name
+    semester_name = allocation.semester.name.lower()
+    if semester_name == 'first semester':
+        quarterid = f"{session_name}.1"
+    elif semester_name == 'second semester':
+        quarterid = f"{session_name}.2"
+    else:
+        quarterid = f"{session_name}.3"
+
+    return {
+        "quarterid": quarterid,
+        "instructorid": allocation.lecturer_profile.staff_id,
+        "courseid": allocation.program_course.course.code,
+        "org_id": "0",
+        "coursetitle": allocation.program_course.course.title,
+        "classoption": allocation.class_option,
+        "maxclass": str(allocation.class_size),
+    }
+
+
+def create_http_session(pool_size):
+    """
+    Creates a keep-alive requests.Session whose connection pool is large enough
+    for every worker to hold its own connection to UMIS.
+    """
+    http = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    http.mount('http://', adapter)
+    http.mount('https://', adapter)
+    return http
+
+
+def _push_jobs(jobs, umis_token, max_workers, timeout):
+    """
+    Pushes (allocation_id, payload) jobs through the worker pool and returns their
+    results in order. Workers have no app context, so a 401 is returned as
+    UMIS_TOKEN_REJECTED rather than refreshed in the worker.
+    """
+    workers = max(1, min(max_workers, len(jobs)))
+    with create_http_session(workers) as http, ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(
+            lambda job: allocation_service.push_allocation_to_umis(
+                job[1], umis_token, http=http, timeout=timeout, refresh_token=False
+            ),
+            jobs
+        ))
+
+
+def push_allocations_to_umis(allocations, umis_token, pushed_by_id, session_name=None, max_workers=None, timeout=None):
+    """
+    Pushes a list of allocations to UMIS through a bounded worker pool sharing one
+    HTTP session, then marks every successful push in a single UPDATE statement.
+
+    Payloads are built up front in the calling thread so that no ORM object is
+    touched from a worker. If UMIS rejects the token, it is refreshed once on the
+    calling thread and the rejected pushes are sent again. Returns a summary dict with the number of successful
+    pushes, the UMIS keyfields and the list of failure messages (in allocation order).
+    """
+    max_workers = max_workers or current_app.config.get('UMIS_PUSH_MAX_WORKERS', 8)
+    timeout = timeout or current_app.config.get('UMIS_PUSH_TIMEOUT', 30)
+
+    failed_pushes = []
+    jobs = [] # (allocation_id, payload)
+
+    for allocation in allocations:
+        # Ensure all related objects exist
+        if not allocation.program_course or not allocation.program_course.course:
+            failed_pushes.append(f"Skipping allocation ID {allocation.id}: Missing related course data.")
+            continue
+
+        # Check for missing data
+        if not allocation.lecturer_profile or not allocation.lecturer_profile.staff_id:
+            failed_pushes.append(f"Course {allocation.program_course.course.code}: Missing lecturer staff ID.")
+            continue
+
+        # Ensure semester relationship is valid
+        if not allocation.semester:
+            failed_pushes.append(f"Course {allocation.program_course.course.code}: Missing semester information.")
+            continue
+
+        # Skip already pushed allocations
+        if allocation.is_pushed_to_umis:
+            continue
+
+        jobs.append((allocation.id, build_umis_payload(allocation, session_name)))
+
+    results = _push_jobs(jobs, umis_token, max_workers, timeout) if jobs else []
+
+    rejected = [index for index, result in enumerate(results) if result == (False, allocation_service.UMIS_TOKEN_REJECTED)]
+    if rejected:
+        umis_token, error = dev_token_manager.refresh(stale_token=umis_token)
+        if error:
+            retried = [(False, f"Failed to authenticate with UMIS: {error}")] * len(rejected)
+        else:
+            retried = _push_jobs([jobs[index] for index in rejected], umis_token, max_workers, timeout)
+        for index, result in zip(rejected, retried):
+            results[index] = result
+
+    pushed_ids = []
+    success_keyfields = []
+    for (allocation_id, payload), (is_success, response_data) in zip(jobs, results):
+        if is_success:
+            keyfield = response_data.get('data', {}).get('keyfield')
+            if keyfield:
+                success_keyfields.append(str(keyfield))
+            pushed_ids.append(allocation_id)
+        else:
+            failed_pushes.append(
+                f"Course {payload['courseid']} ({payload['classoption']}): {response_data}"
+            )
+
+    if pushed_ids:
+        CourseAllocation.query.filter(CourseAllocation.id.in_(pushed_ids)).update({
+            CourseAllocation.is_pushed_to_umis: True,
+            CourseAllocation.pushed_to_umis_by_id: pushed_by_id,
+            CourseAllocation.pushed_to_umis_at: datetime.now(timezone.utc),
+        }, synchronize_session='fetch')
+
+        # Keep the department summaries in step, inside the caller's transaction
+        pushed = set(pushed_ids)
+        affected = {
+            (allocation.program_course.program.department_id, allocation.session_id, allocation.semester_id)
+            for allocation in allocations if allocation.id in pushed
+        }
+        for department_id, session_id, semester_id in affected:
+            allocation_summary_service.refresh_department_summary(department_id, session_id, semester_id)
+
+    return {
+        "successful_pushes": len(pushed_ids),
+        "success_keyfields": success_keyfields,
+        "failed_pushes": failed_pushes,
+        "pushed_ids": pushed_ids,
+    }
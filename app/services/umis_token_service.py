@@ -0,0 +1,132 @@
+import base64
+import os
+import threading
+import time
+
+from dotenv import load_dotenv
+from flask import current_app
+
+from app.services.umis_client import umis_client
+
+load_dotenv()
+
+
+class UmisTokenManager:
+    """
+    Process-wide cache for the UMIS dev token used by pushes and faculty lookups.
+
+    The token is reused until shortly before it expires; refreshes happen under a
+    lock so concurrent callers trigger a single UMIS authorization request.
+    """
+
+    def __init__(self, fetch_token, clock=time.monotonic):
+        self._fetch_token = fetch_token
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._token = None
+        self._expires_at = 0
+        self.hits = 0
+        self.misses = 0
+
+    def _is_fresh(self):
+        margin = current_app.config.get('UMIS_TOKEN_REFRESH_MARGIN', 60)
+        return self._token is not None and self._clock() < self._expires_at - margin
+
+    def get_token(self):
+        """Returns (token, error), fetching a new token only when the cached one is about to expire."""
+        if self._is_fresh():
+            self.hits += 1
+            return self._token, None
+
+        with self._lock:
+            # Another thread may have refreshed while we waited for the lock
+            if self._is_fresh():
+                self.hits += 1
+                return self._token, None
+
+            self.misses += 1
+            return self._refresh()
+
+    def refresh(self, stale_token=None):
+        """
+        Forces a new token after UMIS rejected `stale_token` (e.g. with a 401).
+        If another caller already replaced that token, the newer one is returned.
+        """
+        with self._lock:
+            if stale_token is not None and self._token != stale_token and self._is_fresh():
+                self.hits += 1
+                return self._token, None
+
+            self.misses += 1
+            return self._refresh()
+
+    def _refresh(self):
+        token, expires_in, error = self._fetch_token()
+        if error:
+            self._token = None
+            return None, error
+
+        self._token = token
+        self._expires_at = self._clock() + (expires_in or current_app.config.get('UMIS_TOKEN_TTL', 3600))
+        return token, None
+
+    def invalidate(self):
+        with self._lock:
+            self._token = None
+            self._expires_at = 0
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses}
+
+
+def _request_dev_token():
+    """
+    Authenticates the dev account with UMIS.
+    Returns (token, expires_in seconds or None, error).
+    """
+    try:
+        umisid = os.getenv('API_DEV_ID')
+        password = os.getenv('API_DEV_PASSWORD')
+
+        if not umisid or not password:
+            return None, None, "Missing UMIS ID or password"
+        
+            
+        username_byte = base64.b64encode(umisid.encode('ascii'))
+        username = username_byte.decode('ascii')
+        password_byte = base64.b64encode(password.encode('ascii'))
+        password_enc = password_byte.decode('ascii')
+
+        header = {
+            'Content-Type': 'multipart/form-data',
+            'action': 'authorization',
+            'authuser': username,
+            'authpass': password_enc
+        }
+        url = os.getenv('UMIS_AUTH_URL')
+        response = umis_client.post(url, headers=header)
+
+        if response.status_code != 200:
+            return None, None, f"UMIS auth failed ({response.status_code})"
+        
+        token_data = response.json()
+        umis_token = token_data.get('access_token')
+        if not umis_token:
+            return None, None, "No access token received from UMIS"
+
+        expires_in = token_data.get('expires_in')
+        return umis_token, int(expires_in) if expires_in else None, None # Success
+    
+    except Exception as e:
+        return None, None, f"UMIS authentication error: {str(e)}"
+
+
+dev_token_manager = UmisTokenManager(_request_dev_token)
+
+
+def auth_dev_user():
+    """
+    Returns the UMIS dev token used to push allocations, reusing the cached
+    token until it is about to expire.
+    """
+    return dev_token_manager.get_token()
@@ -1,7 +1,8 @@
 import uuid
 from app.models.models import User, Lecturer, Department
 from app.extensions import db
-from sqlalchemy import desc
+from sqlalchemy import desc, insert
+from app.services import lecturer_directory_service
 
 def get_all_users():
     """
@@ -60,6 +61,7 @@ def create_user(data):
         )
         # new_user.set_password('default_password')
         db.session.add(new_user)
+        lecturer_directory_service.bump()
         db.session.commit()
 
         department = Department.query.get(new_user.department_id)
@@ -79,18 +81,112 @@ def create_user(data):
         db.session.rollback()
         return None, str(e)
 
+USER_BATCH_CHUNK_SIZE = 500
+LECTURER_ROLES = ('lecturer', 'hod')
+USER_ROLES = ("superadmin", "admin", "vetter", "hod", "lecturer")
+
+def _chunks(items, size=USER_BATCH_CHUNK_SIZE):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+def _existing_values(column, values):
+    """Returns the subset of `values` already stored in `column`, with one IN query per chunk."""
+    existing = set()
+    for chunk in _chunks(list(values)):
+        existing.update(value for (value,) in db.session.query(column).filter(column.in_(chunk)).all())
+    return existing
+
 def create_users_batch(users_data):
     """
-    Creates multiple users from a list of user data.
+    Creates multiple users from a list of user data, with a lecturer profile for
+    lecturers and HODs.
+
+    Every row is validated in memory first; duplicate emails and staff ids, within
+    the upload or against the database, and unknown departments are found with one
+    IN query each. Valid rows are then written with executemany inserts, one commit
+    per chunk of USER_BATCH_CHUNK_SIZE rows.
     """
     created_count = 0
     errors = []
-    for user_data in users_data:
-        _, error = create_user(user_data)
-        if error:
-            errors.append(error)
+
+    # VALIDATE THE ROWS THAT DO NOT NEED THE DATABASE
+    rows = []
+    for index, data in enumerate(users_data):
+        row_num = index + 1
+        try:
+            role = (data.get('role') or '').lower()
+            # Lecturers and HODs belong to a department; other roles may have none
+            if not data.get('name') or role not in USER_ROLES or (role in LECTURER_ROLES and not data.get('department_id')):
+                errors.append(f"Row {row_num}: Missing or invalid name, role or department.")
+                continue
+
+            staff_id = None
+            if role in LECTURER_ROLES:
+                staff_id = str(data.get('staff_id') or uuid.uuid4())
+
+            rows.append({
+                "row_num": row_num, "name": data.get('name').title(), "email": data.get('email') or None,
+                "role": role, "staff_id": staff_id,
+                "department_id": int(data.get('department_id')) if data.get('department_id') else None,
+                "gender": data.get('gender').title() if data.get('gender') else None, "phone": data.get('phone'),
+                "rank": data.get('rank'), "specialization": data.get('specialization'),
+                "qualification": data.get('qualification'), "other_responsibilities": data.get('other_responsibilities'),
+            })
+        except Exception as e:
+            errors.append(f"Row {row_num}: {str(e)}")
+
+    if not rows:
+        return created_count, errors if errors else None
+
+    # VALIDATE AGAINST THE DATABASE
+    emails = {row['email'] for row in rows if row['email']}
+    staff_ids = {row['staff_id'] for row in rows if row['staff_id']}
+    taken_emails = _existing_values(User.email, emails)
+    taken_staff_ids = _existing_values(Lecturer.staff_id, staff_ids)
+    department_ids = _existing_values(Department.id, {row['department_id'] for row in rows if row['department_id']})
+
+    valid_rows = []
+    for row in rows:
+        if row['department_id'] and row['department_id'] not in department_ids:
+            errors.append(f"Row {row['row_num']}: Department with ID '{row['department_id']}' not found.")
+        elif row['email'] and row['email'] in taken_emails:
+            errors.append(f"Row {row['row_num']}: Email '{row['email']}' already exists.")
+        elif row['staff_id'] and row['staff_id'] in taken_staff_ids:
+            errors.append(f"Row {row['row_num']}: Staff ID '{row['staff_id']}' already exists.")
         else:
-            created_count += 1
+            # Later rows with the same email or staff id are reported as duplicates
+            if row['email']:
+                taken_emails.add(row['email'])
+            if row['staff_id']:
+                taken_staff_ids.add(row['staff_id'])
+            valid_rows.append(row)
+
+    # WRITE IN CHUNKS
+    for chunk in _chunks(valid_rows):
+        try:
+            lecturer_rows = [row for row in chunk if row['staff_id']]
+            lecturer_ids = {}
+            if lecturer_rows:
+                db.session.execute(insert(Lecturer), [{
+                    "staff_id": row['staff_id'], "gender": row['gender'], "phone": row['phone'], "rank": row['rank'],
+                    "specialization": row['specialization'], "qualification": row['qualification'],
+                    "other_responsibilities": row['other_responsibilities'], "department_id": row['department_id'],
+                } for row in lecturer_rows])
+                lecturer_ids = dict(db.session.query(Lecturer.staff_id, Lecturer.id).filter(
+                    Lecturer.staff_id.in_([row['staff_id'] for row in lecturer_rows])
+                ).all())
+
+            db.session.execute(insert(User), [{
+                "name": row['name'], "email": row['email'], "role": row['role'],
+                "department_id": row['department_id'], "lecturer_id": lecturer_ids.get(row['staff_id']),
+            } for row in chunk])
+            lecturer_directory_service.bump()
+            db.session.commit()
+            created_count += len(chunk)
+        except Exception as e:
+            db.session.rollback()
+            errors.append(f"Rows {chunk[0]['row_num']}-{chunk[-1]['row_num']} were not saved: {str(e)}")
+
     return created_count, errors if errors else None
 
 def update_user(user_id, data):
@@ -116,6 +212,7 @@ def update_user(user_id, data):
             lecturer.qualification = data.get('qualification', lecturer.qualification)
             lecturer.other_responsibilities = data.get('other_responsibilities', lecturer.other_responsibilities)
 
+        lecturer_directory_service.bump()
         db.session.commit()
 
         department = Department.query.get(user.department_id)
@@ -148,6 +245,7 @@ def delete_user(user_id):
             db.session.delete(user.lecturer)
         
         db.session.delete(user)
+        lecturer_directory_service.bump()
         db.session.commit()
         return True, None
     except Exception as e:
@@ -0,0 +1,185 @@
+"""
+Synthetic university-scale data for benchmarking the allocation queries and endpoints.
+
+All rows are written with executemany inserts so that a full dataset
+(tens of thousands of program courses and allocations) loads in seconds.
+"""
+import random
+from datetime import datetime, timezone
+
+from sqlalchemy import insert
+
+from app.extensions import db
+from app.models import (
+    School, Department, Program, Specialization, Level, Semester, Bulletin, AcademicSession,
+    Course, ProgramCourse, Lecturer, User, CourseAllocation
+)
+from app.models.models import CourseType, program_course_specializations
+from app.services.allocation_summary_service import rebuild_summaries
+
+SEMESTER_NAMES = ["First Semester", "Second Semester", "Summer Semester"]
+LEVEL_NAMES = ["100", "200", "300", "400", "500"]
+COURSE_TYPE_NAMES = ["Core", "Elective", "General"]
+# Levels from which students follow a specialization
+SPECIALIZATION_LEVELS = {"300", "400", "500"}
+SUPERADMIN_EMAIL = "superadmin@example.edu"
+CHUNK_SIZE = 5000
+
+# Default sizes roughly match a mid-sized private university
+DEFAULT_SIZES = {
+    "schools": 10,
+    "departments_per_school": 6,
+    "programs_per_department": 2,
+    "specializations_per_program": 2,
+    "courses_per_level_semester": 8,
+    "bulletins": 3,
+    "sessions": 3,
+    "lecturers_per_department": 25,
+    "max_groups": 2,
+}
+
+
+def _bulk_insert(model, rows):
+    for start in range(0, len(rows), CHUNK_SIZE):
+        db.session.execute(insert(model), rows[start:start + CHUNK_SIZE])
+
+
+def generate(scale=1.0, seed=42, sizes=None):
+    """
+    Fills the current database with a synthetic university and returns the row counts.
+    `scale` multiplies the number of schools; `sizes` overrides individual defaults.
+    The database is expected to be empty.
+    """
+    rng = random.Random(seed)
+    sizes = {**DEFAULT_SIZES, **(sizes or {})}
+    now = datetime.now(timezone.utc)
+
+    # Reference data
+    levels = [{"id": i + 1, "name": name} for i, name in enumerate(LEVEL_NAMES)]
+    semesters = [{"id": i + 1, "name": name, "is_active": name == "First Semester"} for i, name in enumerate(SEMESTER_NAMES)]
+    bulletins = [{
+        "id": i + 1, "name": f"{2016 + 4 * i}-{2020 + 4 * i}",
+        "start_year": 2016 + 4 * i, "end_year": 2020 + 4 * i,
+        "is_active": i == sizes["bulletins"] - 1, "created_at": now
+    } for i in range(sizes["bulletins"])]
+    sessions = [{
+        "id": i + 1, "name": f"{2022 + i}/{2023 + i}", "is_active": i == sizes["sessions"] - 1
+    } for i in range(sizes["sessions"])]
+    _bulk_insert(Level, levels)
+    _bulk_insert(Semester, semesters)
+    _bulk_insert(Bulletin, bulletins)
+    _bulk_insert(AcademicSession, sessions)
+
+    # Organisation
+    school_count = max(1, int(sizes["schools"] * scale))
+    schools = [{"id": i + 1, "name": f"School {i + 1}", "acronym": f"S{i + 1}"} for i in range(school_count)]
+    departments = []
+    programs = []
+    for school in schools:
+        for d in range(sizes["departments_per_school"]):
+            dept_id = len(departments) + 1
+            departments.append({"id": dept_id, "name": f"Department {dept_id}", "acronym": f"D{dept_id}", "school_id": school["id"]})
+            for p in range(sizes["programs_per_department"]):
+                program_id = len(programs) + 1
+                programs.append({"id": program_id, "name": f"Program {program_id}", "acronym": f"P{program_id}", "department_id": dept_id})
+    specializations = [
+        {"id": p * sizes["specializations_per_program"] + n + 1,
+         "name": f"Specialization {n + 1} of Program {program['id']}", "program_id": program["id"]}
+        for p, program in enumerate(programs) for n in range(sizes["specializations_per_program"])
+    ]
+    _bulk_insert(School, schools)
+    _bulk_insert(Department, departments)
+    _bulk_insert(Program, programs)
+    if specializations:
+        _bulk_insert(Specialization, specializations)
+    specializations_by_program = {}
+    for spec in specializations:
+        specializations_by_program.setdefault(spec["program_id"], []).append(spec["id"])
+
+    # Lecturers, each with a user account; the first one of a department is its HOD
+    lecturers = []
+    users = []
+    lecturers_by_department = {}
+    for dept in departments:
+        for n in range(sizes["lecturers_per_department"]):
+            lecturer_id = len(lecturers) + 1
+            lecturers.append({"id": lecturer_id, "staff_id": f"STAFF{lecturer_id:06d}", "department_id": dept["id"], "rank": "Lecturer I"})
+            users.append({
+                "id": lecturer_id, "name": f"Lecturer {lecturer_id}", "email": f"lecturer{lecturer_id}@example.edu",
+                "role": "hod" if n == 0 else "lecturer", "department_id": dept["id"], "lecturer_id": lecturer_id
+            })
+            lecturers_by_department.setdefault(dept["id"], []).append(lecturer_id)
+    users.append({"id": len(users) + 1, "name": "Benchmark Superadmin", "email": SUPERADMIN_EMAIL, "role": "superadmin"})
+    _bulk_insert(Lecturer, lecturers)
+    _bulk_insert(User, users)
+
+    # Courses and curriculum: every program offers courses per level, teaching semester and bulletin
+    course_types = [{"id": i + 1, "name": name} for i, name in enumerate(COURSE_TYPE_NAMES)]
+    courses = []
+    program_courses = []
+    specialization_links = []
+    active_bulletin_id = bulletins[-1]["id"]
+    for program in programs:
+        for level in levels:
+            for semester in semesters[:2]:
+                for c in range(sizes["courses_per_level_semester"]):
+                    course_id = len(courses) + 1
+                    courses.append({
+                        "id": course_id, "code": f"P{program['id']}{level['name']}{semester['id']}{c:02d}",
+                        "title": f"Course {course_id}", "units": rng.choice([2, 3, 4]),
+                        "course_type_id": rng.choice(course_types)["id"]
+                    })
+                    for bulletin in bulletins:
+                        program_courses.append({
+                            "id": len(program_courses) + 1, "program_id": program["id"], "course_id": course_id,
+                            "level_id": level["id"], "semester_id": semester["id"], "bulletin_id": bulletin["id"],
+                            "created_at": now
+                        })
+                        # Upper level courses are shared by one specialization of the program
+                        if level["name"] in SPECIALIZATION_LEVELS and specializations_by_program.get(program["id"]) and c % 2:
+                            specialization_links.append({
+                                "program_course_id": program_courses[-1]["id"],
+                                "specialization_id": rng.choice(specializations_by_program[program["id"]])
+                            })
+    _bulk_insert(CourseType, course_types)
+    _bulk_insert(Course, courses)
+    _bulk_insert(ProgramCourse, program_courses)
+    if specialization_links:
+        _bulk_insert(program_course_specializations, specialization_links)
+
+    # Allocations: every active-bulletin course is allocated in past sessions, most of them in the active one
+    program_department = {p["id"]: p["department_id"] for p in programs}
+    allocations = []
+    for session in sessions:
+        allocated_share = 0.7 if session["is_active"] else 1.0
+        for pc in program_courses:
+            if pc["bulletin_id"] != active_bulletin_id or rng.random() > allocated_share:
+                continue
+            candidates = lecturers_by_department[program_department[pc["program_id"]]]
+            for g in range(rng.randint(1, sizes["max_groups"])):
+                allocations.append({
+                    "program_course_id": pc["id"], "session_id": session["id"], "semester_id": pc["semester_id"],
+                    "lecturer_id": rng.choice(candidates), "group_name": f"Group {chr(65 + g)}", "is_lead": g == 0,
+                    "is_allocated": True, "is_pushed_to_umis": not session["is_active"] or rng.random() < 0.3,
+                    "source_bulletin_id": pc["bulletin_id"], "class_size": rng.randint(20, 150),
+                    "class_option": rng.choice(["Morning", "Evening", "Weekend"]), "created_at": now
+                })
+    _bulk_insert(CourseAllocation, allocations)
+
+    db.session.commit()
+
+    # The bulk inserts bypass the services that keep the summary table up to date
+    for session in sessions:
+        rebuild_summaries(session["id"])
+
+    return {
+        "schools": len(schools),
+        "departments": len(departments),
+        "programs": len(programs),
+        "specializations": len(specializations),
+        "lecturers": len(lecturers),
+        "courses": len(courses),
+        "program_courses": len(program_courses),
+        "specialization_links": len(specialization_links),
+        "allocations": len(allocations),
+    }
@@ -0,0 +1,133 @@
+"""
+Measures the hot allocation queries with and without the composite indexes
+declared on CourseAllocation and ProgramCourse.
+
+    BENCHMARK_DATABASE_URL=sqlite:////tmp/bench.db python -m benchmarks.index_benchmark --scale 1
+"""
+import argparse
+import json
+import random
+import statistics
+import time
+
+from app import create_app, db
+from app.models import CourseAllocation, ProgramCourse, Program, Department, Semester, AcademicSession, Bulletin, Level
+from app.services import allocation_service
+from benchmarks import data_generator
+
+
+def composite_indexes():
+    return [index for table in (CourseAllocation.__table__, ProgramCourse.__table__) for index in table.indexes]
+
+
+def hot_queries(rng, samples):
+    """
+    Returns (name, [callables]) pairs that mirror the filters used by the
+    allocation service and routes, each bound to random sample parameters.
+    """
+    session = AcademicSession.query.filter_by(is_active=True).first()
+    bulletin = Bulletin.query.filter_by(is_active=True).first()
+    semester_ids = [s.id for s in Semester.query.filter(Semester.name != "Summer Semester").all()]
+    department_ids = [d.id for d in Department.query.all()]
+    program_ids = [p.id for p in Program.query.all()]
+    level_ids = [l.id for l in Level.query.all()]
+    pc_ids = [row.id for row in db.session.query(ProgramCourse.id).filter_by(bulletin_id=bulletin.id).all()]
+
+    def pick(values):
+        return [rng.choice(values) for _ in range(samples)]
+
+    return [
+        ("department_allocation_progress", [
+            (lambda d=d, s=s: allocation_service.department_allocation_progress(d, s, session.id))
+            for d, s in zip(pick(department_ids), pick(semester_ids))
+        ]),
+        ("department_courses", [
+            (lambda d=d, s=s: allocation_service.department_courses(d, s, session.id))
+            for d, s in zip(pick(department_ids), pick(semester_ids))
+        ]),
+        ("allocation_details_by_program_course", [
+            (lambda pc=pc, s=s: CourseAllocation.query.filter_by(program_course_id=pc, semester_id=s, session_id=session.id).all())
+            for pc, s in zip(pick(pc_ids), pick(semester_ids))
+        ]),
+        ("program_courses_by_program_level", [
+            (lambda p=p, l=l, s=s: ProgramCourse.query.filter_by(program_id=p, level_id=l, semester_id=s, bulletin_id=bulletin.id).all())
+            for p, l, s in zip(pick(program_ids), pick(level_ids), pick(semester_ids))
+        ]),
+        ("bulk_push_selection", [
+            (lambda d=d, s=s: db.session.query(CourseAllocation.id)
+                .join(ProgramCourse, CourseAllocation.program_course_id == ProgramCourse.id)
+                .join(Program, ProgramCourse.program_id == Program.id)
+                .filter(Program.department_id == d, CourseAllocation.semester_id == s, CourseAllocation.session_id == session.id)
+                .all())
+            for d, s in zip(pick(department_ids), pick(semester_ids))
+        ]),
+    ]
+
+
+def time_queries(queries, repeat):
+    results = {}
+    for name, calls in queries:
+        timings = []
+        for _ in range(repeat):
+            for call in calls:
+                started = time.perf_counter()
+                call()
+                timings.append((time.perf_counter() - started) * 1000)
+                db.session.expunge_all()
+        timings.sort()
+        results[name] = {
+            "calls": len(timings),
+            "median_ms": round(statistics.median(timings), 3),
+            "p95_ms": round(timings[int(len(timings) * 0.95) - 1], 3),
+        }
+    return results
+
+
+def run(scale, samples, repeat, seed):
+    app = create_app('benchmark')
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+
+        started = time.perf_counter()
+        dataset = data_generator.generate(scale=scale, seed=seed)
+        dataset["seconds_to_generate"] = round(time.perf_counter() - started, 2)
+
+        queries = hot_queries(random.Random(seed), samples)
+
+        for index in composite_indexes():
+            index.drop(bind=db.engine)
+        before = time_queries(queries, repeat)
+
+        for index in composite_indexes():
+            index.create(bind=db.engine)
+        after = time_queries(queries, repeat)
+
+        return {
+            "database": db.engine.url.render_as_string(hide_password=True),
+            "dataset": dataset,
+            "before": before,
+            "after": after,
+            "speedup": {
+                name: round(before[name]["median_ms"] / after[name]["median_ms"], 2) if after[name]["median_ms"] else None
+                for name in before
+            },
+        }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark hot allocation queries before and after the composite indexes.')
+    parser.add_argument('--scale', type=float, default=1.0, help='Multiplier for the number of schools in the synthetic dataset.')
+    parser.add_argument('--samples', type=int, default=20, help='Distinct parameter sets per query.')
+    parser.add_argument('--repeat', type=int, default=3, help='How many times each parameter set is run.')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed for data and parameters.')
+    parser.add_argument('--output', type=str, help='Write the JSON report to this file instead of stdout.')
+
+    args = parser.parse_args()
+
+    report = json.dumps(run(args.scale, args.samples, args.repeat, args.seed), indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(report)
+    else:
+        print(report)
@@ -0,0 +1,17 @@
+import argparse
+import os
+from app import create_app
+from app.services.mail_outbox_service import run_worker
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Run the worker that sends the emails queued in the mail outbox.')
+    parser.add_argument('--poll-interval', type=float, default=5.0, help='Seconds to wait between polls when no email is due.')
+    parser.add_argument('--burst', action='store_true', help='Exit once no email is due instead of polling forever.')
+    parser.add_argument('--config', type=str, default=os.getenv('FLASK_CONFIG') or 'default', help='Configuration name to load.')
+
+    args = parser.parse_args()
+
+    app = create_app(args.config)
+    with app.app_context():
+        sent = run_worker(poll_interval=args.poll_interval, burst=args.burst)
+        app.logger.info(f"Mail outbox worker {os.getpid()} sent {sent} email(s)")
@@ -0,0 +1,53 @@
+"""Add UmisPushJob table for background UMIS pushes
+
+Revision ID: 3c8e1f7a2b90
+Revises: 9a471f2c9eb2
+Create Date: 2026-10-17 09:15:42.531204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3c8e1f7a2b90'
+down_revision = '9a471f2c9eb2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('umis_push_job',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('job_type', sa.String(length=20), nullable=False),
+    sa.Column('status', sa.Enum('pending', 'running', 'completed', 'failed', name='umis_push_job_status'), nullable=False),
+    sa.Column('department_id', sa.Integer(), nullable=True),
+    sa.Column('semester_id', sa.Integer(), nullable=True),
+    sa.Column('session_id', sa.Integer(), nullable=True),
+    sa.Column('program_course_id', sa.Integer(), nullable=True),
+    sa.Column('requested_by_id', sa.Integer(), nullable=False),
+    sa.Column('total_count', sa.Integer(), nullable=False),
+    sa.Column('pushed_count', sa.Integer(), nullable=False),
+    sa.Column('failed_count', sa.Integer(), nullable=False),
+    sa.Column('errors', sa.Text(), nullable=True),
+    sa.Column('keyfields', sa.Text(), nullable=True),
+    sa.Column('worker_id', sa.String(length=100), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('started_at', sa.DateTime(), nullable=True),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['department_id'], ['department.id'], ),
+    sa.ForeignKeyConstraint(['semester_id'], ['semester.id'], ),
+    sa.ForeignKeyConstraint(['session_id'], ['academic_session.id'], ),
+    sa.ForeignKeyConstraint(['program_course_id'], ['program_course.id'], ),
+    sa.ForeignKeyConstraint(['requested_by_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('umis_push_job', schema=None) as batch_op:
+        batch_op.create_index('ix_umis_push_job_status_created', ['status', 'created_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('umis_push_job', schema=None) as batch_op:
+        batch_op.drop_index('ix_umis_push_job_status_created')
+
+    op.drop_table('umis_push_job')
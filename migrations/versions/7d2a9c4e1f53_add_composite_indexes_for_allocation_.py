@@ -0,0 +1,34 @@
+"""Add composite indexes for allocation and program course lookups
+
+Revision ID: 7d2a9c4e1f53
+Revises: 3c8e1f7a2b90
+Create Date: 2026-10-17 10:02:11.204518
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7d2a9c4e1f53'
+down_revision = '3c8e1f7a2b90'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('course_allocation', schema=None) as batch_op:
+        batch_op.create_index('ix_course_allocation_session_semester_pc', ['session_id', 'semester_id', 'program_course_id'], unique=False)
+
+    with op.batch_alter_table('program_course', schema=None) as batch_op:
+        batch_op.create_index('ix_program_course_program_level_semester_bulletin', ['program_id', 'level_id', 'semester_id', 'bulletin_id'], unique=False)
+        batch_op.create_index('ix_program_course_program_semester_bulletin', ['program_id', 'semester_id', 'bulletin_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('program_course', schema=None) as batch_op:
+        batch_op.drop_index('ix_program_course_program_semester_bulletin')
+        batch_op.drop_index('ix_program_course_program_level_semester_bulletin')
+
+    with op.batch_alter_table('course_allocation', schema=None) as batch_op:
+        batch_op.drop_index('ix_course_allocation_session_semester_pc')
@@ -0,0 +1,26 @@
+"""Add version to department_allocation_summary
+
+Revision ID: a8d4c2e6f913
+Revises: f1c6a9d4b258
+Create Date: 2026-10-18 09:12:40.207319
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a8d4c2e6f913'
+down_revision = 'f1c6a9d4b258'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('department_allocation_summary', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('version', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade():
+    with op.batch_alter_table('department_allocation_summary', schema=None) as batch_op:
+        batch_op.drop_column('version')
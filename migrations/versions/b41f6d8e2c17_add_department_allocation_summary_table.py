@@ -0,0 +1,40 @@
+"""Add department_allocation_summary table
+
+Revision ID: b41f6d8e2c17
+Revises: 7d2a9c4e1f53
+Create Date: 2026-10-17 11:24:37.118406
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b41f6d8e2c17'
+down_revision = '7d2a9c4e1f53'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('department_allocation_summary',
+    sa.Column('session_id', sa.Integer(), nullable=False),
+    sa.Column('semester_id', sa.Integer(), nullable=False),
+    sa.Column('department_id', sa.Integer(), nullable=False),
+    sa.Column('total_courses', sa.Integer(), nullable=False),
+    sa.Column('allocated_courses', sa.Integer(), nullable=False),
+    sa.Column('allocation_groups', sa.Integer(), nullable=False),
+    sa.Column('pushed_count', sa.Integer(), nullable=False),
+    sa.Column('last_allocation_at', sa.DateTime(), nullable=True),
+    sa.Column('last_activity_at', sa.DateTime(), nullable=True),
+    sa.Column('is_stale', sa.Boolean(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['department_id'], ['department.id'], ),
+    sa.ForeignKeyConstraint(['semester_id'], ['semester.id'], ),
+    sa.ForeignKeyConstraint(['session_id'], ['academic_session.id'], ),
+    sa.PrimaryKeyConstraint('session_id', 'semester_id', 'department_id')
+    )
+
+
+def downgrade():
+    op.drop_table('department_allocation_summary')
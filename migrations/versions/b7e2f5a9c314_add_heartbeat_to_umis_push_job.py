@@ -0,0 +1,26 @@
+"""Add heartbeat_at to umis_push_job
+
+Revision ID: b7e2f5a9c314
+Revises: a8d4c2e6f913
+Create Date: 2026-10-18 11:04:27.581930
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7e2f5a9c314'
+down_revision = 'a8d4c2e6f913'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('umis_push_job', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('heartbeat_at', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('umis_push_job', schema=None) as batch_op:
+        batch_op.drop_column('heartbeat_at')
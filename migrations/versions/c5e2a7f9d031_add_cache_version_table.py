@@ -0,0 +1,29 @@
+"""Add cache_version table
+
+Revision ID: c5e2a7f9d031
+Revises: b41f6d8e2c17
+Create Date: 2026-10-17 16:42:08.530917
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c5e2a7f9d031'
+down_revision = 'b41f6d8e2c17'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('cache_version',
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade():
+    op.drop_table('cache_version')
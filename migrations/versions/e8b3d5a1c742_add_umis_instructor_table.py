@@ -0,0 +1,42 @@
+"""Add umis_instructor table
+
+Revision ID: e8b3d5a1c742
+Revises: c5e2a7f9d031
+Create Date: 2026-10-17 19:05:41.207316
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e8b3d5a1c742'
+down_revision = 'c5e2a7f9d031'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('umis_instructor',
+    sa.Column('instructor_id', sa.String(length=50), nullable=False),
+    sa.Column('name', sa.String(length=150), nullable=True),
+    sa.Column('email', sa.String(length=120), nullable=True),
+    sa.Column('umis_department_id', sa.String(length=50), nullable=True),
+    sa.Column('department_name', sa.String(length=150), nullable=True),
+    sa.Column('umis_school_id', sa.String(length=50), nullable=True),
+    sa.Column('school_name', sa.String(length=150), nullable=True),
+    sa.Column('is_hod', sa.Boolean(), nullable=False),
+    sa.Column('refreshed_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('instructor_id')
+    )
+    with op.batch_alter_table('umis_instructor', schema=None) as batch_op:
+        batch_op.create_index('ix_umis_instructor_department_name', ['department_name'], unique=False)
+        batch_op.create_index('ix_umis_instructor_department_id', ['umis_department_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('umis_instructor', schema=None) as batch_op:
+        batch_op.drop_index('ix_umis_instructor_department_id')
+        batch_op.drop_index('ix_umis_instructor_department_name')
+
+    op.drop_table('umis_instructor')
@@ -0,0 +1,31 @@
+import argparse
+import os
+from app import create_app
+from app.models import AcademicSession
+from app.services.allocation_summary_service import rebuild_summaries
+
+def rebuild(session_id, all_sessions, config_name):
+    """Recomputes the department allocation summary rows of one or every session."""
+    app = create_app(config_name)
+    with app.app_context():
+        if all_sessions:
+            session_ids = [session.id for session in AcademicSession.query.order_by(AcademicSession.id).all()]
+        else:
+            session_ids = [session_id]
+
+        for sid in session_ids:
+            rows, error = rebuild_summaries(sid)
+            if error:
+                print(f"Error: {error}")
+                return
+            print(f"Rebuilt {rows} summary row(s) for session {sid or 'active'}")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Rebuild the department allocation summary table.')
+    parser.add_argument('--session-id', type=int, default=None, help='Session to rebuild (defaults to the active session).')
+    parser.add_argument('--all-sessions', action='store_true', help='Rebuild every academic session.')
+    parser.add_argument('--config', type=str, default=os.getenv('FLASK_CONFIG') or 'default', help='Configuration name to load.')
+
+    args = parser.parse_args()
+
+    rebuild(args.session_id, args.all_sessions, args.config)
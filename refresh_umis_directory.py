@@ -0,0 +1,22 @@
+import argparse
+import os
+from app import create_app
+from app.services.umis_directory_service import refresh_directory
+
+def refresh(config_name):
+    """Downloads the UMIS instructor directory into the umis_instructor table."""
+    app = create_app(config_name)
+    with app.app_context():
+        count, error = refresh_directory()
+        if error:
+            print(f"Error: {error}")
+            return
+        print(f"Stored {count} UMIS instructor(s)")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Refresh the local UMIS instructor directory (run it from cron, e.g. hourly).')
+    parser.add_argument('--config', type=str, default=os.getenv('FLASK_CONFIG') or 'default', help='Configuration name to load.')
+
+    args = parser.parse_args()
+
+    refresh(args.config)
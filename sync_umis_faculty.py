@@ -0,0 +1,25 @@
+import argparse
+import json
+import os
+from app import create_app
+from app.services.faculty_sync_service import sync_faculty
+
+def sync(refresh, dry_run, config_name):
+    """Creates and updates lecturers, users and HOD roles from the UMIS instructor directory."""
+    app = create_app(config_name)
+    with app.app_context():
+        report, error = sync_faculty(refresh=refresh, dry_run=dry_run)
+        if error:
+            print(f"Error: {error}")
+            return
+        print(json.dumps(report, indent=2))
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Sync lecturers, users and HOD roles from the UMIS faculty list.')
+    parser.add_argument('--no-refresh', action='store_true', help='Use the stored UMIS directory instead of downloading it.')
+    parser.add_argument('--dry-run', action='store_true', help='Report the changes without writing them.')
+    parser.add_argument('--config', type=str, default=os.getenv('FLASK_CONFIG') or 'default', help='Configuration name to load.')
+
+    args = parser.parse_args()
+
+    sync(not args.no_refresh, args.dry_run, args.config)
@@ -1,6 +1,7 @@
 import sys
 import os
 import pytest
+from sqlalchemy import event
 from app import create_app, db
 from app.models.models import User, School
 from flask_jwt_extended import create_access_token
@@ -41,4 +42,19 @@ def create_test_school(client, token):
         "acronym": "TS"
     }
     response = client.post('/api/v1/schools/create', headers={'Authorization': f'Bearer {token}'}, json=school_data)
-    return json.loads(response.data)["bulletin"]
\ No newline at end of file
+    return json.loads(response.data)["bulletin"]
+
+def count_statements(fn, *args):
+    """Runs fn with a fresh session and returns (result, number of SQL statements executed)."""
+    db.session.remove()
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        result = fn(*args)
+    finally:
+        event.remove(db.engine, "before_cursor_execute", before_cursor_execute)
+    return result, len(statements)
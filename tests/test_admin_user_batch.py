@@ -0,0 +1,65 @@
+import pytest
+from app import create_app, db
+from app.models.models import User, Department, School, AdminUser, MailOutboxMessage
+from flask_jwt_extended import create_access_token
+
+@pytest.fixture(scope='function')
+def test_client():
+    flask_app = create_app(config_name='testing')
+    flask_app.config['JWT_SECRET_KEY'] = 'super-secret-testing-key'
+
+    with flask_app.test_client() as testing_client:
+        with flask_app.app_context():
+            db.create_all()
+            setup_test_data()
+            yield testing_client
+            db.session.remove()
+            db.drop_all()
+
+def setup_test_data():
+    school = School(name="Test School", acronym="TS")
+    db.session.add(school)
+    db.session.flush()
+    department = Department(name="Registry", acronym="REG", school_id=school.id)
+    db.session.add(department)
+    db.session.flush()
+
+    superadmin = User(name="Super Admin", email="super@admin.com", role="superadmin", department_id=department.id)
+    superadmin.set_password("superadminpass")
+    db.session.add(superadmin)
+    db.session.commit()
+
+def get_auth_headers():
+    user = User.query.filter_by(email="super@admin.com").first()
+    return {'Authorization': f'Bearer {create_access_token(identity=str(user.id))}'}
+
+def test_batch_create_admin_users_queues_their_emails(test_client):
+    """
+    GIVEN an upload with two new admins, a taken email and a missing role
+    WHEN '/users/batch' is called
+    THEN the two admins are saved with their profiles, the bad lines are reported
+    and their credentials emails are queued in the mail outbox.
+    """
+    department = Department.query.first()
+    data = {"users": [
+        {"name": "Vetter One", "email": "vetter1@test.com", "role": "vetter", "department_id": department.id, "gender": "Female", "phone": "1"},
+        {"name": "Taken", "email": "super@admin.com", "role": "admin", "department_id": department.id},
+        {"name": "Admin Two", "email": "admin2@test.com", "role": "admin", "department_id": str(department.id)},
+        {"name": "No Role", "email": "norole@test.com", "department_id": department.id},
+    ]}
+
+    response = test_client.post('/api/v1/admin/users/batch', json=data, headers=get_auth_headers())
+
+    assert response.status_code == 207
+    assert response.get_json()["errors"] == [
+        {"line": 2, "error": "Email already exists"},
+        {"line": 4, "error": "Missing required fields: role"},
+    ]
+    assert AdminUser.query.count() == 2
+    vetter = User.query.filter_by(email="vetter1@test.com").one()
+    assert (vetter.role, vetter.admin_user.gender) == ("vetter", "Female")
+
+    queued = MailOutboxMessage.query.order_by(MailOutboxMessage.id).all()
+    assert [(m.recipient, m.status) for m in queued] == [("vetter1@test.com", "pending"), ("admin2@test.com", "pending")]
+    password = queued[0].body.split("Your password is: ")[1].splitlines()[0]
+    assert vetter.check_password(password)
@@ -0,0 +1,190 @@
+import pytest
+from sqlalchemy import Column, MetaData, Table, text
+from app import create_app, db
+from app.models import (
+    School, Department, User, Lecturer, Program, Level, Semester,
+    Course, Bulletin, AcademicSession, ProgramCourse, CourseAllocation
+)
+from app.services import allocation_service, reference_data_service
+from flask_jwt_extended import create_access_token
+from tests.conftest import count_statements
+
+@pytest.fixture(scope='function')
+def test_client():
+    flask_app = create_app(config_name='testing')
+    flask_app.config['JWT_SECRET_KEY'] = 'super-secret-testing-key'
+
+    with flask_app.test_client() as testing_client:
+        with flask_app.app_context():
+            db.create_all()
+            setup_test_data()
+            yield testing_client
+            db.session.remove()
+            db.drop_all()
+
+def setup_test_data(programs_count=2, courses_per_level=3):
+    """Builds a department with several programs, levels and grouped allocations."""
+    vetter = User(name="Dr. Vetter", email="vetter@test.com", role="vetter")
+    vetter.set_password("vetterpass")
+    school = School(name="School of Science", acronym="SOS")
+    department = Department(name="Computer Science", acronym="CS", school=school)
+    db.session.add_all([vetter, school, department])
+    db.session.commit()
+
+    lecturer = Lecturer(staff_id="LEC001", department_id=department.id)
+    lecturer_user = User(name="Dr. Lecturer", email="lec@test.com", role="lecturer", department_id=department.id)
+    lecturer_user.lecturer = lecturer
+    db.session.add_all([lecturer, lecturer_user])
+
+    sem1 = Semester(name="First Semester", is_active=True)
+    sem2 = Semester(name="Second Semester")
+    session = AcademicSession(name="2024/2025", is_active=True)
+    old_bulletin = Bulletin(name="2019-2023", start_year=2019, end_year=2023)
+    bulletin = Bulletin(name="2024-2028", start_year=2024, end_year=2028, is_active=True)
+    levels = [Level(name="100"), Level(name="200")]
+    db.session.add_all([sem1, sem2, session, old_bulletin, bulletin] + levels)
+    db.session.commit()
+
+    for p in range(programs_count):
+        program = Program(name=f"Program {p}", department_id=department.id, acronym=f"P{p}")
+        db.session.add(program)
+        db.session.commit()
+
+        for level in levels:
+            for c in range(courses_per_level):
+                course = Course(code=f"P{p}L{level.name}C{c}", title=f"Course {p}-{level.name}-{c}", units=3)
+                db.session.add(course)
+                db.session.flush()
+                pc = ProgramCourse(program_id=program.id, course_id=course.id, level_id=level.id, semester_id=sem1.id, bulletin_id=bulletin.id)
+                db.session.add(pc)
+                db.session.flush()
+                for group_name in ["Group A", "Group B"]:
+                    db.session.add(CourseAllocation(
+                        program_course_id=pc.id, session_id=session.id, semester_id=sem1.id,
+                        lecturer_id=lecturer.id, source_bulletin_id=bulletin.id,
+                        group_name=group_name, is_allocated=True,
+                        is_pushed_to_umis=(group_name == "Group A"), pushed_to_umis_by_id=vetter.id
+                    ))
+    db.session.commit()
+
+def test_get_allocations_by_department_shape(test_client):
+    """
+    GIVEN a department with allocations in the active bulletin
+    WHEN the '/allocation-by-department' endpoint is called by a vetter
+    THEN the bulletin/semester/program/level tree is returned with every allocated group.
+    """
+    vetter = User.query.filter_by(email="vetter@test.com").first()
+    department = Department.query.first()
+    semester = Semester.query.filter_by(name="First Semester").first()
+    headers = {'Authorization': f'Bearer {create_access_token(identity=str(vetter.id))}'}
+
+    response = test_client.post(
+        '/api/v1/allocation/allocation-by-department',
+        headers=headers,
+        json={"department": department.id, "semester": semester.id}
+    )
+    data = response.get_json()
+
+    assert response.status_code == 200
+    assert [b['name'] for b in data] == ["2019-2023", "2024-2028"]
+
+    old_bulletin, active_bulletin = data
+    assert old_bulletin['is_all_pushed'] is False
+    assert old_bulletin['semester'][0]['programs'] == []
+
+    semester_data = active_bulletin['semester'][0]
+    assert semester_data['department_name'] == "Computer Science"
+    assert semester_data['vetted'] is False
+    assert len(semester_data['programs']) == 2
+
+    levels = semester_data['programs'][0]['levels']
+    assert [l['name'] for l in levels] == ["100 Level", "200 Level"]
+
+    course = levels[0]['courses'][0]
+    assert len(levels[0]['courses']) == 6
+    assert course['code'] == "P0L100C0"
+    assert course['groupName'] == "Group A"
+    assert course['allocatedTo'] == "Dr. Lecturer"
+    assert course['is_pushed_to_umis'] is True
+    assert course['pushed_to_umis_by'] == "Dr. Vetter"
+    assert levels[0]['courses'][1]['is_pushed_to_umis'] is False
+    assert active_bulletin['is_all_pushed'] is False
+
+def test_get_allocations_by_department_query_count(test_client):
+    """
+    GIVEN departments of different sizes
+    WHEN get_allocations_by_department is called
+    THEN the number of SQL statements is fixed and does not grow with the department.
+    """
+    department_id = Department.query.first().id
+    semester_id = Semester.query.filter_by(name="First Semester").first().id
+    # Semesters, bulletins and the active session come from the warm reference-data cache
+    reference_data_service.semesters()
+
+    _, small_count = count_statements(allocation_service.get_allocations_by_department, department_id, semester_id)
+
+    # Grow the department and check the statement count stays the same
+    department = db.session.get(Department, department_id)
+    level = Level.query.first()
+    semester = db.session.get(Semester, semester_id)
+    bulletin = Bulletin.query.filter_by(is_active=True).first()
+    session = AcademicSession.query.first()
+    lecturer = Lecturer.query.first()
+    program = Program(name="Program Extra", department_id=department.id, acronym="PX")
+    db.session.add(program)
+    db.session.flush()
+    for c in range(10):
+        course = Course(code=f"EXTRA{c}", title=f"Extra {c}", units=2)
+        db.session.add(course)
+        db.session.flush()
+        pc = ProgramCourse(program_id=program.id, course_id=course.id, level_id=level.id, semester_id=semester.id, bulletin_id=bulletin.id)
+        db.session.add(pc)
+        db.session.flush()
+        db.session.add(CourseAllocation(
+            program_course_id=pc.id, session_id=session.id, semester_id=semester.id,
+            lecturer_id=lecturer.id, source_bulletin_id=bulletin.id, group_name="Group A"
+        ))
+    db.session.commit()
+
+    (output, error), large_count = count_statements(allocation_service.get_allocations_by_department, department_id, semester_id)
+
+    assert error is None
+    assert len(output[1]['semester'][0]['programs']) == 3
+    assert small_count == 4
+    assert large_count == small_count
+
+def test_get_allocations_by_department_with_a_lecturer_on_two_accounts(test_client):
+    """
+    GIVEN a lecturer linked to a second user account
+    WHEN get_allocations_by_department is called
+    THEN every allocated group is listed once, under the lecturer's first account.
+    """
+    department = Department.query.first()
+    semester_id = Semester.query.filter_by(name="First Semester").first().id
+    lecturer_id = Lecturer.query.first().id
+
+    # Rebuild the user table without its unique lecturer_id constraint to link a second account
+    users = db.session.execute(User.__table__.select()).mappings().all()
+    db.session.execute(text('DROP TABLE user'))
+    loose_users = Table('user', MetaData(), *[
+        Column(column.name, column.type, primary_key=column.primary_key) for column in User.__table__.columns
+    ])
+    loose_users.create(db.session.connection())
+    db.session.execute(loose_users.insert(), [dict(user) for user in users])
+    db.session.execute(loose_users.insert().values(
+        name="Dr. Lecturer (HOD)", email="lec.hod@test.com", role="hod",
+        department_id=department.id, lecturer_id=lecturer_id
+    ))
+    db.session.commit()
+
+    output, error = allocation_service.get_allocations_by_department(department.id, semester_id)
+
+    assert error is None
+    courses = [
+        course
+        for program in output[1]['semester'][0]['programs']
+        for level in program['levels']
+        for course in level['courses']
+    ]
+    assert len(courses) == CourseAllocation.query.count()
+    assert {course['allocatedTo'] for course in courses} == {"Dr. Lecturer"}
@@ -1,10 +1,18 @@
+import csv
+import io
+import json
+
 import pytest
+from sqlalchemy import func
 from app import create_app, db
 from app.models import (
     School, Department, User, Lecturer, Program, Level, Semester,
-    Course, Bulletin, AcademicSession, ProgramCourse, Specialization, CourseAllocation
+    Course, Bulletin, AcademicSession, ProgramCourse, Specialization, CourseAllocation,
+    DepartmentAllocationSummary
 )
 from flask_jwt_extended import create_access_token
+from app.services import allocation_summary_service, reference_data_service
+from tests.conftest import count_statements
 
 @pytest.fixture(scope='function')
 def test_client():
@@ -129,3 +137,166 @@ def test_get_hod_allocations_by_specialization(test_client):
     swe_300 = next((s for s in level300_data['specializations'] if s['name'] == 'Software Engineering'), None)
     assert swe_300 is not None
     assert swe_300['courses'][0]['code'] == 'SENG302'
+
+def test_get_detailed_course_list_for_allocation(test_client):
+    """
+    GIVEN an HOD whose department has courses over several levels
+    WHEN the '/detailed-list' endpoint is called
+    THEN the semester/program/level tree is returned and the number of SQL
+    statements does not grow with the number of levels and courses.
+    """
+    semester = Semester.query.first()
+    semester.is_active = True
+    semester_id = semester.id
+    reference_data_service.bump()
+    db.session.commit()
+    # Load the reference data so that both measurements start from a warm cache
+    reference_data_service.semesters()
+
+    hod_user = User.query.filter_by(email="hod@test.com").first()
+    headers = {'Authorization': f'Bearer {create_access_token(identity=str(hod_user.id))}'}
+
+    response, small_count = count_statements(lambda: test_client.get('/api/v1/allocation/detailed-list', headers=headers))
+    data = response.get_json()
+
+    assert response.status_code == 200
+    levels = data[0]['programs'][0]['levels']
+    assert [l['name'] for l in levels] == ['100 Level', '300 Level']
+    assert levels[0]['courses'][0]['code'] == 'COSC101'
+    assert levels[0]['courses'][0]['isAllocated'] is True
+    assert levels[0]['courses'][0]['allocatedTo'] == 'Dr. HOD'
+    assert [(c['code'], c['specialization']) for c in levels[1]['courses']] == [('COSC301', 'General'), ('SENG302', 'Software Engineering')]
+
+    # Add more levels and courses, then check the statement count stays the same
+    program = Program.query.first()
+    bulletin = Bulletin.query.first()
+    for name in ["200", "400"]:
+        level = Level(name=name)
+        db.session.add(level)
+        db.session.flush()
+        for c in range(3):
+            course = Course(code=f"EXT{name}{c}", title=f"Extra {name}-{c}", units=2)
+            db.session.add(course)
+            db.session.flush()
+            db.session.add(ProgramCourse(program_id=program.id, course_id=course.id, level_id=level.id, semester_id=semester_id, bulletin_id=bulletin.id))
+    db.session.commit()
+
+    response, large_count = count_statements(lambda: test_client.get('/api/v1/allocation/detailed-list', headers=headers))
+
+    assert len(response.get_json()[0]['programs'][0]['levels']) == 4
+    assert large_count == small_count
+
+def test_print_report_is_cached_until_allocations_change(test_client):
+    """
+    GIVEN a department with summary rows
+    WHEN the '/print' endpoint is called twice and then an allocation changes
+    THEN the second call is served from the cache and the third reflects the change.
+    """
+    allocation_summary_service.rebuild_summaries()
+    department = Department.query.first()
+    hod_user = User.query.filter_by(email="hod@test.com").first()
+    headers = {'Authorization': f'Bearer {create_access_token(identity=str(hod_user.id))}'}
+    body = {"department_id": department.id}
+
+    first, first_count = count_statements(lambda: test_client.post('/api/v1/allocation/print', headers=headers, json=body))
+    second, second_count = count_statements(lambda: test_client.post('/api/v1/allocation/print', headers=headers, json=body))
+
+    assert first.get_json() == second.get_json()
+    assert [c['code'] for c in first.get_json()[0]['programs'][0]['levels'][0]['courses']] == ['COSC101']
+    assert second_count < first_count
+    # The cache belongs to this application only
+    assert len(test_client.application.extensions['allocation_report_cache']) == 1
+    assert 'allocation_report_cache' not in create_app(config_name='testing').extensions
+
+    pc = ProgramCourse.query.join(Course).filter(Course.code == "COSC301").first()
+    semester = Semester.query.first()
+    session = AcademicSession.query.first()
+    lecturer = Lecturer.query.first()
+    db.session.add(CourseAllocation(program_course_id=pc.id, session_id=session.id, semester_id=semester.id, lecturer_id=lecturer.id, is_allocated=True))
+    allocation_summary_service.refresh_department_summary(pc.program.department_id, session.id, semester.id)
+    db.session.commit()
+
+    third = test_client.post('/api/v1/allocation/print', headers=headers, json=body).get_json()
+    assert [l['name'] for l in third[0]['programs'][0]['levels']] == ['100 Level', '300 Level']
+
+    # A second write within the same second of the summary's update time still changes the report
+    updated_at = db.session.query(func.max(DepartmentAllocationSummary.updated_at)).scalar()
+    CourseAllocation.query.filter_by(program_course_id=pc.id).delete()
+    allocation_summary_service.refresh_department_summary(pc.program.department_id, session.id, semester.id)
+    DepartmentAllocationSummary.query.update({DepartmentAllocationSummary.updated_at: updated_at})
+    db.session.commit()
+
+    fourth = test_client.post('/api/v1/allocation/print', headers=headers, json=body).get_json()
+    assert [l['name'] for l in fourth[0]['programs'][0]['levels']] == ['100 Level']
+
+def test_print_report_stream_and_csv(test_client):
+    """
+    GIVEN a department with an allocated course
+    WHEN the NDJSON stream and CSV export endpoints are called
+    THEN each returns the allocated course in its format.
+    """
+    department = Department.query.first()
+    hod_user = User.query.filter_by(email="hod@test.com").first()
+    headers = {'Authorization': f'Bearer {create_access_token(identity=str(hod_user.id))}'}
+    body = {"department_id": department.id}
+
+    response = test_client.post('/api/v1/allocation/print/stream', headers=headers, json=body)
+    lines = [json.loads(line) for line in response.data.decode().splitlines()]
+
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+    assert len(lines) == 1
+    assert lines[0]['program']['name'] == "B.Sc. Computer Science"
+    assert lines[0]['level']['courses'][0]['allocatedTo'] == "Dr. HOD"
+
+    response = test_client.post('/api/v1/allocation/print/csv', headers=headers, json=body)
+    rows = list(csv.reader(io.StringIO(response.data.decode())))
+
+    assert response.mimetype == 'text/csv'
+    assert response.headers['Content-Disposition'] == 'attachment; filename=allocation_report_CS.csv'
+    assert rows[0][0] == "Session"
+    assert rows[1] == ["2024/2025", "First Semester", "B.Sc. Computer Science", "100 Level", "COSC101", "Intro to CS", "3", "Dr. HOD"]
+
+    response = test_client.post('/api/v1/allocation/print/csv', headers=headers, json={"department_id": 999})
+    assert response.status_code == 404
+
+def test_allocate_resolves_groups_in_batches(test_client):
+    """
+    GIVEN an HOD allocating a course to several groups at once
+    WHEN the '/allocate' endpoint is called
+    THEN every group is created with a fixed number of statements and invalid lists write nothing.
+    """
+    hod_user = User.query.filter_by(email="hod@test.com").first()
+    headers = {'Authorization': f'Bearer {create_access_token(identity=str(hod_user.id))}'}
+    pc = ProgramCourse.query.join(Course).filter(Course.code == "COSC301").first()
+    pc_id, course_id, level_id = pc.id, pc.course_id, pc.level_id
+
+    def payload(groups, lecturer="Dr. HOD"):
+        return [{
+            "programId": "B.Sc. Computer Science", "courseId": course_id, "levelId": level_id,
+            "semesterId": "First Semester", "allocatedTo": lecturer, "groupName": group,
+            "isAllocated": True, "classSize": 40
+        } for group in groups]
+
+    # The first call also loads the lecturer directory
+    assert test_client.post('/api/v1/allocation/allocate', headers=headers, json=payload(["Group A"])).status_code == 201
+    two_groups, two_count = count_statements(lambda: test_client.post('/api/v1/allocation/allocate', headers=headers, json=payload(["Group B", "Group C"])))
+    six_groups, six_count = count_statements(lambda: test_client.post('/api/v1/allocation/allocate', headers=headers, json=payload([f"Group {g}" for g in "DEFGHI"])))
+
+    assert two_groups.status_code == 201
+    assert six_groups.status_code == 201
+    assert two_count == six_count
+    allocations = CourseAllocation.query.filter_by(program_course_id=pc_id).order_by(CourseAllocation.group_name).all()
+    assert len(allocations) == 9
+    assert allocations[0].is_lead is True and allocations[1].is_lead is False
+
+    response = test_client.post('/api/v1/allocation/allocate', headers=headers, json=payload(["Group X", "Group Y"], lecturer="Nobody"))
+    assert response.status_code == 404
+
+    response = test_client.post('/api/v1/allocation/allocate', headers=headers, json=payload(["Group X", "Group X"]))
+    assert response.status_code == 400
+    assert "already exists" in response.get_json()["message"]
+
+    response = test_client.post('/api/v1/allocation/allocate', headers=headers, json=payload(["Group X", "Group A"]))
+    assert response.status_code == 400
+    assert CourseAllocation.query.filter_by(program_course_id=pc_id).count() == 9
@@ -6,7 +6,9 @@ from app.models import (
     Course, Bulletin, AcademicSession, ProgramCourse, CourseAllocation,
     DepartmentAllocationState
 )
+from app.services import allocation_service, allocation_summary_service, reference_data_service
 from flask_jwt_extended import create_access_token
+from tests.conftest import count_statements
 
 @pytest.fixture(scope='module')
 def test_client():
@@ -156,3 +158,43 @@ def test_get_allocation_status_overview_unauthorized(test_client):
 
     response = test_client.get('/api/v1/allocation/allocation-status-overview', headers=headers)
     assert response.status_code == 403
+
+def test_allocation_status_overview_aggregates(test_client):
+    """
+    GIVEN active semesters and departments in different allocation states
+    WHEN get_allocation_status_overview is called
+    THEN counts, states and HODs are correct and the number of SQL statements
+    stays the same as departments are added.
+    """
+    for semester in Semester.query.all():
+        semester.is_active = True
+    reference_data_service.bump()
+    hod = User.query.filter_by(email="hod@test.com").first()
+    hod.department_id = Department.query.filter_by(name="Computer Science").first().id
+    db.session.commit()
+    allocation_summary_service.rebuild_summaries()
+
+    output, first_count = count_statements(allocation_service.get_allocation_status_overview)
+
+    sem1_data = next(s for s in output if s['name'] == 'First Semester')
+    cs_status = next(d for d in sem1_data['departments'] if d['department_name'] == 'Computer Science')
+    eco_status = next(d for d in sem1_data['departments'] if d['department_name'] == 'Economics')
+
+    assert (cs_status['status'], cs_status['total_courses'], cs_status['total_courses_allocated']) == ('Allocated', 1, 0)
+    assert cs_status['hod_name'] == 'Dr. HOD'
+    assert (eco_status['status'], eco_status['total_courses'], eco_status['total_courses_allocated']) == ('Still Allocating', 1, 1)
+    assert eco_status['allocation_rate'] == 100.0
+    assert eco_status['hod_name'] == '-'
+    assert eco_status['last_allocation_at'] is not None
+    # Departments with allocations come first
+    assert sem1_data['departments'][0]['department_name'] == 'Economics'
+
+    school = School.query.first()
+    for n in range(5):
+        db.session.add(Department(name=f"Extra Department {n}", acronym=f"EX{n}", school_id=school.id))
+    db.session.commit()
+
+    output, second_count = count_statements(allocation_service.get_allocation_status_overview)
+
+    assert len(output[0]['departments']) == 7
+    assert second_count == first_count
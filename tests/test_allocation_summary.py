@@ -0,0 +1,216 @@
+import pytest
+from app import create_app, db
+from app.models import (
+    School, Department, User, Lecturer, Program, Level, Semester,
+    Course, Bulletin, AcademicSession, ProgramCourse, CourseAllocation,
+    DepartmentAllocationSummary
+)
+from app.services import allocation_service, allocation_summary_service, course_service
+from flask_jwt_extended import create_access_token
+from tests.conftest import count_statements
+
+@pytest.fixture(scope='function')
+def test_client():
+    flask_app = create_app(config_name='testing')
+    flask_app.config['JWT_SECRET_KEY'] = 'super-secret-testing-key'
+
+    with flask_app.test_client() as testing_client:
+        with flask_app.app_context():
+            db.create_all()
+            setup_test_data()
+            yield testing_client
+            db.session.remove()
+            db.drop_all()
+
+def setup_test_data():
+    vetter = User(name="Dr. Vetter", email="vetter@test.com", role="vetter")
+    vetter.set_password("vetterpass")
+    school = School(name="School of Science", acronym="SOS")
+    department = Department(name="Computer Science", acronym="CS", school=school)
+    db.session.add_all([vetter, school, department])
+    db.session.commit()
+
+    lecturer = Lecturer(staff_id="LEC001", department_id=department.id)
+    hod = User(name="Dr. HOD", email="hod@test.com", role="hod", department_id=department.id)
+    hod.lecturer = lecturer
+    program = Program(name="B.Sc. CS", department_id=department.id, acronym="CSC")
+    level = Level(name="100")
+    sem1 = Semester(name="First Semester", is_active=True)
+    sem2 = Semester(name="Second Semester")
+    summer = Semester(name="Summer Semester")
+    session = AcademicSession(name="2024/2025", is_active=True)
+    bulletin = Bulletin(name="2024-2028", start_year=2024, end_year=2028, is_active=True)
+    db.session.add_all([lecturer, hod, program, level, sem1, sem2, summer, session, bulletin])
+    db.session.commit()
+
+    for code, semester in [("COSC101", sem1), ("COSC102", sem1), ("COSC103", sem1), ("COSC104", sem2)]:
+        course = Course(code=code, title=f"Title {code}", units=3)
+        db.session.add(course)
+        db.session.flush()
+        db.session.add(ProgramCourse(program_id=program.id, course_id=course.id, level_id=level.id, semester_id=semester.id, bulletin_id=bulletin.id))
+    db.session.commit()
+
+def get_summary(semester_name="First Semester"):
+    semester = Semester.query.filter_by(name=semester_name).first()
+    session = AcademicSession.query.filter_by(is_active=True).first()
+    department = Department.query.first()
+    return db.session.get(DepartmentAllocationSummary, (session.id, semester.id, department.id))
+
+def allocate(test_client, course_code, groups):
+    hod = User.query.filter_by(email="hod@test.com").first()
+    pc = ProgramCourse.query.join(Course).filter(Course.code == course_code).first()
+    headers = {'Authorization': f'Bearer {create_access_token(identity=str(hod.id))}'}
+    return test_client.post('/api/v1/allocation/allocate', headers=headers, json=[{
+        "programId": pc.program_id, "courseId": pc.course_id, "levelId": pc.level_id,
+        "semesterId": pc.semester_id, "allocatedTo": "Dr. HOD", "groupName": group,
+        "isAllocated": True, "classSize": 40
+    } for group in groups])
+
+def test_rebuild_creates_a_row_per_department_and_semester(test_client):
+    """
+    GIVEN a department with courses in the first and second semesters
+    WHEN the summaries are rebuilt
+    THEN every semester has a row and the summer total adds up both semesters.
+    """
+    rows, error = allocation_summary_service.rebuild_summaries()
+
+    assert error is None
+    assert rows == 3
+    assert get_summary("First Semester").total_courses == 3
+    assert get_summary("Second Semester").total_courses == 1
+    assert get_summary("Summer Semester").total_courses == 4
+    assert get_summary().allocated_courses == 0
+
+def test_allocation_writes_update_the_summary(test_client):
+    """
+    GIVEN an HOD allocating, updating and deleting course allocations
+    WHEN each write is committed
+    THEN the summary row reflects it without a rebuild.
+    """
+    assert allocate(test_client, "COSC101", ["Group A", "Group B"]).status_code == 201
+    summary = get_summary()
+    assert (summary.allocated_courses, summary.allocation_groups, summary.pushed_count) == (1, 2, 0)
+    assert summary.last_allocation_at is not None
+
+    assert allocate(test_client, "COSC102", ["Group A"]).status_code == 201
+    assert (get_summary().allocated_courses, get_summary().allocation_groups) == (2, 3)
+
+    pc = ProgramCourse.query.join(Course).filter(Course.code == "COSC101").first()
+    department = Department.query.first()
+    success, error = allocation_service.update_course_allocation([{
+        "programId": pc.program_id, "courseId": pc.course_id, "levelId": pc.level_id,
+        "semesterId": pc.semester_id, "allocatedTo": "Dr. HOD", "groupName": "Group A", "isAllocated": True
+    }], department.id)
+    assert error is None
+    assert (get_summary().allocated_courses, get_summary().allocation_groups) == (2, 2)
+
+    allocation_service.delete_allocation(pc.id)
+    assert (get_summary().allocated_courses, get_summary().allocation_groups) == (1, 1)
+
+    CourseAllocation.query.update({CourseAllocation.is_pushed_to_umis: True})
+    db.session.commit()
+    allocation_summary_service.rebuild_summaries()
+    assert get_summary().pushed_count == 1
+
+def test_submit_records_activity_and_curriculum_changes_mark_rows_stale(test_client):
+    """
+    GIVEN existing summary rows
+    WHEN an allocation is submitted and then a course is added to the curriculum
+    THEN the submission is recorded as activity and the next read recomputes the totals.
+    """
+    allocation_summary_service.rebuild_summaries()
+    department = Department.query.first()
+    hod = User.query.filter_by(email="hod@test.com").first()
+    semester = Semester.query.filter_by(name="First Semester").first()
+
+    assert get_summary().last_activity_at is None
+    allocation_service.submit_allocation(department.id, hod.id, semester.id)
+    assert get_summary().last_activity_at is not None
+
+    pc = ProgramCourse.query.first()
+    course_service.create_course({
+        "code": "COSC105", "title": "New course", "unit": 3, "program_id": pc.program_id,
+        "level_id": pc.level_id, "semester_id": semester.id, "bulletin_id": pc.bulletin_id
+    })
+    assert get_summary().is_stale is True
+
+    output = allocation_service.get_allocation_status_overview()
+    assert output[0]["departments"][0]["total_courses"] == 4
+    assert output[0]["departments"][0]["status"] == "Allocated"
+    assert get_summary().is_stale is False
+
+def test_metrics_read_summary_rows(test_client):
+    """
+    GIVEN allocations in the active semester
+    WHEN the '/metrics' endpoint is called
+    THEN the counts come from one aggregate over the summary and state rows.
+    """
+    allocate(test_client, "COSC101", ["Group A", "Group B"])
+    vetter = User.query.filter_by(email="vetter@test.com").first()
+    headers = {'Authorization': f'Bearer {create_access_token(identity=str(vetter.id))}'}
+
+    data = test_client.get('/api/v1/allocation/metrics', headers=headers).get_json()
+
+    assert data["allocated_courses"] == 1
+    assert data["total_allocated_course_groups"] == 2
+    assert data["allocation_in_progress"] == 1
+
+    (_, error), statements = count_statements(allocation_service.get_active_semester_allocation_stats)
+    assert error is None
+    assert statements == 1
+
+def test_metrics_count_submissions_and_rebuild_stale_summaries(test_client):
+    """
+    GIVEN a submitted department, a non-academic department and stale summary rows
+    WHEN the metrics are computed
+    THEN the stale rows are rebuilt first and only academic departments are counted.
+    """
+    allocate(test_client, "COSC101", ["Group A"])
+    department = Department.query.first()
+    db.session.add(Department(name="Registry", acronym="REG", school_id=department.school_id))
+    db.session.commit()
+    semester = Semester.query.filter_by(name="First Semester").first()
+    assert allocation_service.submit_allocation(department.id, None, semester.id)[1] is None
+
+    allocation_summary_service.invalidate_summaries()
+    db.session.commit()
+
+    metrics, error = allocation_service.get_active_semester_allocation_stats()
+
+    assert error is None
+    assert get_summary().is_stale is False
+    assert metrics["allocated_courses"] == 1
+    assert (metrics["allocation_submitted"], metrics["allocation_in_progress"], metrics["allocation_not_started"]) == (1, 0, 0)
+    assert metrics["compliance_score"] == 100.0
+
+def test_reads_do_not_overwrite_a_concurrent_allocation_write(test_client, monkeypatch):
+    """
+    GIVEN stale summary rows
+    WHEN an allocation write commits its summary refresh while a read is recomputing them
+    THEN the read only updates the rows that are still stale, keeping the write's counts.
+    """
+    allocation_summary_service.rebuild_summaries()
+    course_service.create_course({
+        "code": "COSC105", "title": "New course", "unit": 3, **{
+            key: getattr(ProgramCourse.query.first(), key) for key in ("program_id", "level_id", "semester_id", "bulletin_id")
+        }
+    })
+    assert get_summary().is_stale is True
+
+    compute = allocation_summary_service._compute_summaries
+    def compute_then_allocate(session_id, department_id=None):
+        summaries = compute(session_id, department_id)
+        if department_id is None:
+            # Another request allocates between the read's recompute and its write
+            assert allocate(test_client, "COSC101", ["Group A"]).status_code == 201
+        return summaries
+    monkeypatch.setattr(allocation_summary_service, '_compute_summaries', compute_then_allocate)
+
+    session = AcademicSession.query.filter_by(is_active=True).first()
+    summaries = allocation_summary_service.get_session_summaries(session.id)
+
+    summary = get_summary()
+    assert (summary.allocated_courses, summary.total_courses, summary.is_stale) == (1, 4, False)
+    assert summaries[(summary.department_id, summary.semester_id)].allocated_courses == 1
+    # The other semesters were still stale and were refreshed by the read
+    assert get_summary("Summer Semester").is_stale is False
@@ -1,8 +1,10 @@
 import pytest
 from app import create_app, db
-from app.models.models import School, Department, Program, User, Level, Semester, Bulletin, Course, ProgramCourse
+from app.models.models import School, Department, Program, User, Level, Semester, Bulletin, Course, ProgramCourse, CourseType, Specialization
+from app.services import course_service
 from flask_jwt_extended import create_access_token
 import io
+from tests.conftest import count_statements
 
 @pytest.fixture(scope='function')
 def test_client():
@@ -113,3 +115,110 @@ def test_batch_create_courses(test_client):
     assert response.status_code == 201 # Expect 201 Created
     json_data = response.get_json()
     assert json_data['message'] == "Successfully created 2 courses."
+
+def test_batch_create_courses_bulk_engine(test_client):
+    """
+    GIVEN an upload mixing new courses, existing courses, specializations and invalid rows
+    WHEN batch_create_courses is called
+    THEN valid rows are saved, invalid rows are reported by row number and the
+    number of SQL statements does not grow with the number of rows.
+    """
+    program = Program.query.first()
+    level = Level.query.first()
+    semester = Semester.query.first()
+    bulletin = Bulletin.query.first()
+    course_type = CourseType(name="Core")
+    specialization = Specialization(name="Software Engineering", program_id=program.id)
+    existing = Course(code="CS100", title="Existing", units=2)
+    db.session.add_all([course_type, specialization, existing])
+    db.session.commit()
+
+    base = {"program_id": program.id, "level_id": level.id, "semester_id": semester.id,
+            "bulletin_id": bulletin.id, "course_type_id": course_type.id, "unit": 3}
+
+    def upload(count, prefix):
+        return [{**base, "code": f"{prefix}{n:03d}", "title": f"Course {n}"} for n in range(count)]
+
+    rows = [
+        {**base, "code": "CS100", "title": "Existing"},
+        {**base, "code": "CS300", "title": "Specialized", "specialization_id": specialization.id},
+        {**base, "code": "CS300", "title": "Specialized", "specialization_id": specialization.id},
+        {**base, "code": "CS301", "title": "Unknown specialization", "specialization_id": 999},
+        {**base, "code": "CS302", "title": "Bad unit", "unit": "three"},
+        {**base, "code": "CS303"},
+    ] + upload(5, "SMALL")
+
+    (processed, errors), small_count = count_statements(course_service.batch_create_courses, rows)
+
+    assert processed == 7
+    # Reported in row order, whichever validation pass found them
+    assert errors == [
+        "Row 3: Course 'CS300' is already linked to specialization 'Software Engineering'.",
+        "Row 4: Specialization with ID '999' not found.",
+        "Row 5: Invalid unit value 'three' for course 'CS302'.",
+        "Row 6: Missing required fields.",
+    ]
+    assert Course.query.count() == 7
+    assert ProgramCourse.query.count() == 7
+    assert Course.query.filter_by(code="CS301").first() is None
+    specialized = ProgramCourse.query.join(Course).filter(Course.code == "CS300").one()
+    assert [s.name for s in specialized.specializations] == ["Software Engineering"]
+
+    # Uploading the same rows again creates nothing new
+    course_service.batch_create_courses(upload(5, "SMALL"))
+    assert ProgramCourse.query.count() == 7
+
+    (processed, errors), large_count = count_statements(course_service.batch_create_courses, upload(500, "LARGE"))
+
+    assert (processed, errors) == (500, [])
+    assert ProgramCourse.query.count() == 507
+    assert large_count <= small_count
+
+def test_get_all_courses_pages_and_filters(test_client):
+    """
+    GIVEN courses in two programs, one of them with two specializations
+    WHEN /courses is read in pages and with filters
+    THEN each page follows the previous one, filters narrow the results and a
+    page is loaded with one catalog query whatever the catalog size.
+    """
+    headers = get_auth_headers("admin@test.com")
+    program = Program.query.first()
+    other_program = Program(name="B.Sc. Mathematics", department_id=program.department_id, acronym="MTH")
+    level = Level.query.first()
+    semester = Semester.query.first()
+    bulletin = Bulletin.query.first()
+    specializations = [Specialization(name="Data Science", program=program), Specialization(name="AI", program=program)]
+    db.session.add_all([other_program] + specializations)
+    db.session.flush()
+
+    program_courses = []
+    for n in range(5):
+        course = Course(code=f"CS10{n}", title=f"Course {n}", units=3)
+        program_courses.append(ProgramCourse(course=course, program=other_program if n == 4 else program,
+                                             level=level, semester=semester, bulletin=bulletin))
+    program_courses[0].specializations = specializations
+    db.session.add_all(program_courses)
+    db.session.add(ProgramCourse(course=Course(code="MTH101", title="Algebra", units=2), program=program,
+                                 level=level, semester=semester, bulletin=bulletin))
+    db.session.commit()
+    program_id = program.id
+
+    first_page = test_client.get('/api/v1/courses?limit=4', headers=headers).get_json()
+    assert [c["code"] for c in first_page["courses"]] == ["MTH101", "CS104", "CS103", "CS102"]
+    assert first_page["next_cursor"] == first_page["courses"][-1]["program_course_id"]
+
+    response, statements = count_statements(
+        lambda: test_client.get(f'/api/v1/courses?limit=4&after={first_page["next_cursor"]}', headers=headers)
+    )
+    second_page = response.get_json()
+    assert [c["code"] for c in second_page["courses"]] == ["CS101", "CS100"]
+    assert second_page["next_cursor"] is None
+    assert second_page["courses"][1]["specialization"]["name"] == "Data Science"
+    assert second_page["courses"][1]["program"]["department"]["school"]["name"] == "School of Science"
+    # The user, the table versions and the catalog
+    assert statements == 3
+
+    courses = test_client.get(f'/api/v1/courses?code=CS&program_id={program_id}', headers=headers).get_json()["courses"]
+    assert [c["code"] for c in courses] == ["CS103", "CS102", "CS101", "CS100"]
+    assert "next_cursor" not in test_client.get('/api/v1/courses', headers=headers).get_json()
+    assert test_client.get('/api/v1/courses?limit=0', headers=headers).status_code == 400
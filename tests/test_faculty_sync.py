@@ -0,0 +1,145 @@
+import pytest
+from app import create_app, db
+from app.models.models import User, Department, School, Lecturer
+from app.services import faculty_sync_service, umis_directory_service
+from flask_jwt_extended import create_access_token
+from tests.conftest import count_statements
+
+def instructor(instructor_id, name, department, hod=False, email=None):
+    return {'instructorid': instructor_id, 'instructorname': name, 'email': email,
+            'departmentname': department, 'headofdepartment': 'Yes' if hod else 'No'}
+
+@pytest.fixture(scope='function')
+def test_client():
+    flask_app = create_app(config_name='testing')
+    flask_app.config['JWT_SECRET_KEY'] = 'super-secret-testing-key'
+
+    with flask_app.test_client() as testing_client:
+        with flask_app.app_context():
+            db.create_all()
+            setup_test_data()
+            yield testing_client
+            db.session.remove()
+            db.drop_all()
+
+def setup_test_data():
+    school = School(name="Education And Humanities", acronym="EAH")
+    db.session.add(school)
+    db.session.flush()
+    religious = Department(name="Religious Studies", acronym="RELB", school_id=school.id)
+    computing = Department(name="Computer Science", acronym="CS", school_id=school.id)
+    db.session.add_all([religious, computing])
+    db.session.flush()
+
+    lecturer = Lecturer(staff_id="LECT001", department_id=computing.id)
+    db.session.add(lecturer)
+    db.session.flush()
+
+    superadmin = User(name="Super Admin", email="super@admin.com", role="superadmin")
+    superadmin.set_password("superadminpass")
+    old_hod = User(name="Old HOD", email="oldhod@test.com", role="hod", department_id=religious.id)
+    moved = User(name="Lecturer Old Name", email="taken@test.com", role="lecturer",
+                 department_id=computing.id, lecturer_id=lecturer.id)
+    db.session.add_all([superadmin, old_hod, moved])
+    db.session.commit()
+
+    umis_directory_service.replace_snapshot([
+        instructor('HOD001', 'New HOD', 'Religious Studies', hod=True, email='newhod@test.com'),
+        instructor('LECT001', 'Lecturer New Name', 'Religious Studies'),
+        instructor('NEW002', 'New Lecturer', 'Computer Science', email='taken@test.com'),
+        instructor('UNK003', 'Elsewhere', 'Unknown Department'),
+    ])
+
+def get_auth_headers():
+    user = User.query.filter_by(email="super@admin.com").first()
+    return {'Authorization': f'Bearer {create_access_token(identity=str(user.id))}'}
+
+def test_sync_applies_the_directory_in_a_few_statements(test_client):
+    """
+    GIVEN a UMIS directory with a new HOD, a moved and renamed lecturer, a new lecturer
+    and an instructor of an unknown department
+    WHEN the faculty is synced
+    THEN lecturers, users and HOD roles follow UMIS in a fixed number of statements.
+    """
+    (report, error), statements = count_statements(lambda: faculty_sync_service.sync_faculty(refresh=False))
+
+    assert error is None
+    assert report == {
+        "instructors": 4, "lecturers_created": 2, "lecturers_moved": 1, "users_created": 2, "users_updated": 2,
+        "promoted_to_hod": 1, "demoted_from_hod": 1, "unknown_departments": {"Unknown Department": 1}, "skipped_hod_departments": [],
+        "dry_run": False,
+    }
+    # Four reads, two lecturer writes, the new lecturer ids, two user writes, the directory
+    # version bump (up to four statements) and the commit
+    assert statements <= 14
+
+    religious = Department.query.filter_by(name="Religious Studies").one()
+    new_hod = User.query.filter_by(email='newhod@test.com').one()
+    assert (new_hod.role, new_hod.department_id, new_hod.lecturer.staff_id) == ('hod', religious.id, 'HOD001')
+    assert User.query.filter_by(email='oldhod@test.com').one().role == 'lecturer'
+
+    moved = Lecturer.query.filter_by(staff_id='LECT001').one()
+    assert moved.department_id == religious.id
+    moved_user = User.query.filter_by(lecturer_id=moved.id).one()
+    assert (moved_user.name, moved_user.department_id) == ('Lecturer New Name', religious.id)
+
+    # The UMIS email is already used, so the new account has none
+    new_lecturer = Lecturer.query.filter_by(staff_id='NEW002').one()
+    assert User.query.filter_by(lecturer_id=new_lecturer.id).one().email is None
+    assert Lecturer.query.filter_by(staff_id='UNK003').first() is None
+
+    report, _ = faculty_sync_service.sync_faculty(refresh=False)
+    assert (report["lecturers_created"], report["users_created"], report["users_updated"]) == (0, 0, 0)
+
+def test_sync_keeps_the_hods_of_a_department_whose_umis_hod_it_cannot_promote(test_client):
+    """
+    GIVEN a UMIS HOD whose local account is a vetter
+    WHEN the faculty is synced
+    THEN the vetter keeps their role, the department's HOD is not demoted and the department is reported.
+    """
+    religious = Department.query.filter_by(name="Religious Studies").one()
+    lecturer = Lecturer(staff_id="HOD001", department_id=religious.id)
+    db.session.add(lecturer)
+    db.session.flush()
+    db.session.add(User(name="New HOD", email="newhod@test.com", role="vetter",
+                        department_id=religious.id, lecturer_id=lecturer.id))
+    db.session.commit()
+
+    report, error = faculty_sync_service.sync_faculty(refresh=False)
+
+    assert error is None
+    assert (report["promoted_to_hod"], report["demoted_from_hod"]) == (0, 0)
+    assert report["skipped_hod_departments"] == ["Religious Studies"]
+    assert User.query.filter_by(email='newhod@test.com').one().role == 'vetter'
+    assert User.query.filter_by(email='oldhod@test.com').one().role == 'hod'
+
+def test_sync_statements_do_not_grow_with_the_faculty(test_client):
+    """
+    GIVEN 2,000 instructors in the UMIS directory
+    WHEN the faculty is synced
+    THEN every one of them gets a lecturer and a user in the same number of statements.
+    """
+    umis_directory_service.replace_snapshot([
+        instructor(f'STAFF{i:04d}', f'Staff {i}', 'Computer Science', email=f'staff{i}@test.com') for i in range(2000)
+    ])
+
+    (report, error), statements = count_statements(lambda: faculty_sync_service.sync_faculty(refresh=False))
+
+    assert error is None
+    assert (report["lecturers_created"], report["users_created"]) == (2000, 2000)
+    assert statements <= 14
+    assert User.query.filter(User.lecturer_id.isnot(None)).count() == 2001
+
+def test_sync_endpoint_dry_run_writes_nothing(test_client):
+    """
+    GIVEN the stored directory
+    WHEN '/umis-faculty-sync' is called with dry_run
+    THEN the report lists the changes and no lecturer is created.
+    """
+    response = test_client.post('/api/v1/admin/umis-faculty-sync', headers=get_auth_headers(),
+                                json={"dry_run": True, "refresh": False})
+
+    assert response.status_code == 200
+    assert response.get_json()["lecturers_created"] == 2
+    assert response.get_json()["dry_run"] is True
+    assert Lecturer.query.count() == 1
@@ -0,0 +1,155 @@
+import pytest
+from flask import g
+from app import create_app, db
+from app.models import (
+    School, Department, User, Lecturer, Program, Level, Semester,
+    Course, Bulletin, AcademicSession, ProgramCourse, CourseAllocation
+)
+from app.services import cache_version_service, lecturer_directory_service, user_service
+from flask_jwt_extended import create_access_token
+from tests.conftest import count_statements
+
+@pytest.fixture(scope='function')
+def test_client():
+    flask_app = create_app(config_name='testing')
+    flask_app.config['JWT_SECRET_KEY'] = 'super-secret-testing-key'
+
+    with flask_app.test_client() as testing_client:
+        with flask_app.app_context():
+            db.create_all()
+            setup_test_data()
+            yield testing_client
+            db.session.remove()
+            db.drop_all()
+
+def setup_test_data():
+    school = School(name="School of Science", acronym="SOS")
+    computing = Department(name="Computer Science", acronym="CS", school=school)
+    maths = Department(name="Mathematics", acronym="MTH", school=school)
+    db.session.add_all([school, computing, maths])
+    db.session.commit()
+
+    # Two staff share a name; the one in Mathematics has the lower id
+    for staff_id, name, role, department in [
+        ("MTH001", "Dr. Ade", "lecturer", maths),
+        ("CS001", "Dr. HOD", "hod", computing),
+        ("CS002", "Dr. Ade", "lecturer", computing),
+    ]:
+        lecturer = Lecturer(staff_id=staff_id, department_id=department.id)
+        user = User(name=name, email=f"{staff_id.lower()}@test.com", role=role, department_id=department.id)
+        user.lecturer = lecturer
+        db.session.add_all([lecturer, user])
+    db.session.commit()
+
+    program = Program(name="B.Sc. CS", department_id=computing.id, acronym="CSC")
+    level = Level(name="100")
+    semester = Semester(name="First Semester", is_active=True)
+    session = AcademicSession(name="2024/2025", is_active=True)
+    bulletin = Bulletin(name="2024-2028", start_year=2024, end_year=2028, is_active=True)
+    course = Course(code="COSC101", title="Intro to CS", units=3)
+    db.session.add_all([program, level, semester, session, bulletin, course])
+    db.session.commit()
+
+    db.session.add(ProgramCourse(program_id=program.id, course_id=course.id, level_id=level.id, semester_id=semester.id, bulletin_id=bulletin.id))
+    db.session.commit()
+
+def lecturer_id(staff_id):
+    return Lecturer.query.filter_by(staff_id=staff_id).first().id
+
+def test_resolve_lecturer_by_id_staff_id_and_name(test_client):
+    """
+    GIVEN lecturers in two departments, two of them with the same name
+    WHEN allocation items refer to them by id, staff id or name
+    THEN each resolves to one lecturer, preferring the allocating department for names.
+    """
+    computing = Department.query.filter_by(acronym="CS").first()
+    ade_cs, ade_mth = lecturer_id("CS002"), lecturer_id("MTH001")
+
+    assert lecturer_directory_service.resolve_lecturer({"lecturerId": ade_mth}, computing.id) == ade_mth
+    assert lecturer_directory_service.resolve_lecturer({"staffId": "CS002", "allocatedTo": "Dr. HOD"}, computing.id) == ade_cs
+    assert lecturer_directory_service.resolve_lecturer({"allocatedTo": "dr.  ade"}, computing.id) == ade_cs
+    assert lecturer_directory_service.resolve_lecturer({"allocatedTo": "Dr. Ade"}) == ade_mth
+    assert lecturer_directory_service.resolve_lecturer({"allocatedTo": "Nobody"}, computing.id) is None
+    assert lecturer_directory_service.resolve_lecturer({"lecturerId": "abc"}) is None
+
+    # Cached directories answer without touching the database
+    result, statements = count_statements(lambda: lecturer_directory_service.resolve_lecturer({"allocatedTo": "Dr. Ade"}, computing.id))
+    assert result == ade_cs
+    assert statements == 0
+
+def test_user_changes_invalidate_the_directory(test_client):
+    """
+    GIVEN a cached lecturer directory
+    WHEN a lecturer is created, renamed and deleted through the user service
+    THEN lookups see each change straight away.
+    """
+    computing = Department.query.filter_by(acronym="CS").first()
+    assert lecturer_directory_service.resolve_lecturer({"staffId": "CS003"}, computing.id) is None
+
+    user_data, error = user_service.create_user({
+        "name": "dr. new", "role": "lecturer", "staff_id": "CS003", "gender": "female",
+        "department_id": computing.id, "email": "cs003@test.com"
+    })
+    assert error is None
+    assert lecturer_directory_service.resolve_lecturer({"staffId": "CS003"}, computing.id) == lecturer_id("CS003")
+
+    user_service.update_user(user_data["id"], {"name": "Dr. Renamed"})
+    assert lecturer_directory_service.resolve_lecturer({"allocatedTo": "Dr. Renamed"}, computing.id) == lecturer_id("CS003")
+
+    user_service.delete_user(user_data["id"])
+    assert lecturer_directory_service.resolve_lecturer({"staffId": "CS003"}, computing.id) is None
+
+def test_allocate_accepts_lecturer_and_staff_ids(test_client):
+    """
+    GIVEN an HOD allocating groups to lecturers identified by id and staff id
+    WHEN the '/allocate' endpoint is called
+    THEN the groups go to those lecturers, and an unknown staff id returns 404.
+    """
+    hod = User.query.filter_by(email="cs001@test.com").first()
+    headers = {'Authorization': f'Bearer {create_access_token(identity=str(hod.id))}'}
+    pc = ProgramCourse.query.first()
+    item = {
+        "programId": pc.program_id, "courseId": pc.course_id, "levelId": pc.level_id,
+        "semesterId": pc.semester_id, "isAllocated": True, "classSize": 40
+    }
+
+    response = test_client.post('/api/v1/allocation/allocate', headers=headers, json=[
+        {**item, "groupName": "Group A", "lecturerId": lecturer_id("MTH001")},
+        {**item, "groupName": "Group B", "staffId": "CS002"},
+        {**item, "groupName": "Group C", "allocatedTo": "Dr. Ade"},
+    ])
+    assert response.status_code == 201
+
+    allocations = CourseAllocation.query.order_by(CourseAllocation.group_name).all()
+    assert [a.lecturer_id for a in allocations] == [lecturer_id("MTH001"), lecturer_id("CS002"), lecturer_id("CS002")]
+
+    response = test_client.post('/api/v1/allocation/allocate', headers=headers, json=[
+        {**item, "groupName": "Group D", "staffId": "NOPE"}
+    ])
+    assert response.status_code == 404
+    assert response.get_json()["message"] == "Lecturer 'NOPE' not found."
+
+def test_changes_from_another_worker_are_seen(test_client):
+    """
+    GIVEN a cached lecturer directory
+    WHEN another worker adds a lecturer, first without and then with a version bump,
+    and deletes one
+    THEN the new lecturer is found through the database at once and the deleted
+    one stops resolving once the version has moved.
+    """
+    computing_id = Department.query.filter_by(acronym="CS").first().id
+    assert lecturer_directory_service.resolve_lecturer({"staffId": "CS002"}, computing_id) == lecturer_id("CS002")
+
+    # Written as another worker would, without touching this worker's cache
+    db.session.add(Lecturer(staff_id="CS004", department_id=computing_id))
+    db.session.commit()
+    result, statements = count_statements(lambda: lecturer_directory_service.resolve_lecturer({"staffId": "CS004"}, computing_id))
+    assert result == lecturer_id("CS004")
+    assert statements == 1
+
+    User.query.filter_by(email="cs002@test.com").delete()
+    Lecturer.query.filter_by(staff_id="CS002").delete()
+    cache_version_service.bump_version(lecturer_directory_service.VERSION_NAME)
+    db.session.commit()
+    g.pop('lecturer_directory_checked_at', None)
+    assert lecturer_directory_service.resolve_lecturer({"staffId": "CS002"}, computing_id) is None
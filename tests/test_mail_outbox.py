@@ -0,0 +1,170 @@
+import socket
+from datetime import datetime, timezone
+
+import pytest
+from app import create_app, db
+from app.models.models import User, Department, School, MailOutboxMessage
+from app.services import admin_user_service, mail_outbox_service
+from flask_jwt_extended import create_access_token
+
+aiosmtpd_controller = pytest.importorskip('aiosmtpd.controller')
+
+class RecordingHandler:
+    """Accepts every message except those to refused@test.com, remembering the SMTP session of each."""
+
+    def __init__(self):
+        self.messages = []
+        self.sessions = set()
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if address == 'refused@test.com':
+            return '550 No such user'
+        envelope.rcpt_tos.append(address)
+        return '250 OK'
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append((envelope.rcpt_tos, envelope.content.decode('utf8', errors='replace')))
+        self.sessions.add(id(session))
+        return '250 Message accepted for delivery'
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+@pytest.fixture(scope='function')
+def smtp_server():
+    handler = RecordingHandler()
+    controller = aiosmtpd_controller.Controller(handler, hostname='127.0.0.1', port=free_port())
+    controller.start()
+    yield controller, handler
+    controller.stop()
+
+@pytest.fixture(scope='function')
+def test_client(smtp_server):
+    controller, _ = smtp_server
+    flask_app = create_app(config_name='testing')
+    flask_app.config['JWT_SECRET_KEY'] = 'super-secret-testing-key'
+    flask_app.config['MAIL_OUTBOX_RATE_PER_SECOND'] = 0
+    mail_state = flask_app.extensions['mail']
+    mail_state.server, mail_state.port = controller.hostname, controller.port
+    mail_state.use_tls, mail_state.username, mail_state.suppress = False, None, False
+    mail_state.default_sender = 'noreply@test.com'
+
+    with flask_app.test_client() as testing_client:
+        with flask_app.app_context():
+            db.create_all()
+            setup_test_data()
+            yield testing_client
+            db.session.remove()
+            db.drop_all()
+
+def setup_test_data():
+    school = School(name="Test School", acronym="TS")
+    db.session.add(school)
+    db.session.flush()
+    db.session.add(Department(name="Registry", acronym="REG", school_id=school.id))
+    superadmin = User(name="Super Admin", email="super@admin.com", role="superadmin")
+    superadmin.set_password("superadminpass")
+    db.session.add(superadmin)
+    db.session.commit()
+
+def get_auth_headers():
+    user = User.query.filter_by(email="super@admin.com").first()
+    return {'Authorization': f'Bearer {create_access_token(identity=str(user.id))}'}
+
+def test_batch_import_emails_are_sent_over_one_connection(test_client, smtp_server):
+    """
+    GIVEN a batch import of three admins
+    WHEN the outbox worker runs
+    THEN the queued credentials emails are delivered over a single SMTP session,
+    show as sent in the outbox and no longer hold the password.
+    """
+    _, handler = smtp_server
+    department = Department.query.first()
+    rows = [{"name": f"Admin {i}", "email": f"admin{i}@test.com", "role": "admin", "department_id": department.id}
+            for i in range(3)]
+
+    count, errors = admin_user_service.create_admin_users_batch(rows)
+    assert (count, errors) == (3, [])
+    assert MailOutboxMessage.query.filter_by(status='pending').count() == 3
+    assert handler.messages == []
+
+    assert mail_outbox_service.run_worker(worker_id='test-worker', burst=True) == 3
+
+    assert sorted(recipients[0] for recipients, _ in handler.messages) == ['admin0@test.com', 'admin1@test.com', 'admin2@test.com']
+    assert len(handler.sessions) == 1
+    assert "Your username is: admin0@test.com" in handler.messages[0][1]
+    assert "Your password is:" in handler.messages[0][1]
+    assert all(m.body == mail_outbox_service.REDACTED_BODY for m in MailOutboxMessage.query.all())
+
+    response = test_client.get('/api/v1/admin/mail-outbox', headers=get_auth_headers())
+    assert response.get_json()["counts"] == {"pending": 0, "sending": 0, "sent": 3, "failed": 0}
+
+def test_refused_recipient_fails_without_blocking_the_batch(test_client, smtp_server):
+    """
+    GIVEN a queued email to an address the server refuses, between two good ones
+    WHEN the outbox worker runs
+    THEN the refused one is marked failed at once and the others are sent.
+    """
+    _, handler = smtp_server
+    for recipient in ('one@test.com', 'refused@test.com', 'two@test.com'):
+        mail_outbox_service.enqueue(recipient, 'Hello', 'Body')
+    db.session.commit()
+
+    assert mail_outbox_service.run_worker(worker_id='test-worker', burst=True) == 2
+
+    refused = MailOutboxMessage.query.filter_by(recipient='refused@test.com').one()
+    status, error = mail_outbox_service.get_message_status(refused.id)
+    assert (status["status"], status["attempts"]) == ("failed", 1)
+    assert "SMTPRecipientsRefused" in status["last_error"]
+    assert refused.body == mail_outbox_service.REDACTED_BODY
+    assert len(handler.messages) == 2
+
+def test_unreachable_server_schedules_a_retry(test_client, smtp_server):
+    """
+    GIVEN the SMTP server is down
+    WHEN the outbox worker runs
+    THEN the messages stay pending with a delayed next attempt, and are sent once it is back.
+    """
+    controller, handler = smtp_server
+    for recipient in ('one@test.com', 'two@test.com'):
+        mail_outbox_service.enqueue(recipient, 'Hello', 'Body')
+    db.session.commit()
+
+    mail_state = test_client.application.extensions['mail']
+    mail_state.port = free_port()
+    assert mail_outbox_service.run_worker(worker_id='test-worker', burst=True) == 0
+    mail_state.port = controller.port
+
+    messages = MailOutboxMessage.query.order_by(MailOutboxMessage.id).all()
+    assert [(m.status, m.attempts) for m in messages] == [("pending", 1), ("pending", 1)]
+    assert all(m.next_attempt_at > datetime.now(timezone.utc).replace(tzinfo=None) for m in messages)
+    # Not due yet
+    assert mail_outbox_service.run_worker(worker_id='test-worker', burst=True) == 0
+
+    MailOutboxMessage.query.update({MailOutboxMessage.next_attempt_at: datetime(2000, 1, 1)})
+    db.session.commit()
+    assert mail_outbox_service.run_worker(worker_id='test-worker', burst=True) == 2
+    assert len(handler.messages) == 2
+
+def test_sends_are_rate_limited(test_client):
+    """
+    GIVEN a rate of 2 emails per second
+    WHEN four claimed messages are sent
+    THEN the sender waits half a second between them.
+    """
+    test_client.application.config['MAIL_OUTBOX_RATE_PER_SECOND'] = 2
+    for i in range(4):
+        mail_outbox_service.enqueue(f'user{i}@test.com', 'Hello', 'Body')
+    db.session.commit()
+
+    now = [0.0]
+    waits = []
+    def sleep(seconds):
+        waits.append(seconds)
+        now[0] += seconds
+
+    messages = mail_outbox_service.claim_batch('test-worker', 10)
+    assert mail_outbox_service.send_messages(messages, clock=lambda: now[0], sleep=sleep) == 4
+    assert waits == [0.5, 0.5, 0.5]
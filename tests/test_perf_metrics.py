@@ -0,0 +1,108 @@
+import logging
+import time
+
+import pytest
+from app import create_app, db
+from app.models.models import User, CourseType
+from flask import g
+from flask_jwt_extended import create_access_token
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+@pytest.fixture(scope='function')
+def test_client():
+    flask_app = create_app(config_name='testing')
+    flask_app.config['JWT_SECRET_KEY'] = 'super-secret-testing-key'
+
+    with flask_app.test_client() as testing_client:
+        with flask_app.app_context():
+            db.create_all()
+            setup_test_data()
+            yield testing_client
+            db.session.remove()
+            db.drop_all()
+
+def setup_test_data():
+    superadmin = User(name="Super Admin", email="super@admin.com", role="superadmin")
+    superadmin.set_password("superadminpass")
+    hod = User(name="HOD", email="hod@test.com", role="hod")
+    hod.set_password("hodpass")
+    db.session.add_all([superadmin, hod, CourseType(name="Core"), CourseType(name="Elective")])
+    db.session.commit()
+
+def get_auth_headers(email="super@admin.com"):
+    user = User.query.filter_by(email=email).first()
+    return {'Authorization': f'Bearer {create_access_token(identity=str(user.id))}'}
+
+def test_requests_are_recorded_per_endpoint(test_client):
+    """
+    GIVEN a few catalog requests
+    WHEN the performance report is fetched
+    THEN each endpoint shows its request count, statements and latency histogram.
+    """
+    headers = get_auth_headers()
+    for _ in range(3):
+        assert test_client.get('/api/v1/course-types/list', headers=headers).status_code == 200
+    test_client.get('/api/v1/admin/maintenance-status')
+
+    response = test_client.get('/api/v1/admin/metrics/perf', headers=headers)
+    assert response.status_code == 200
+
+    report = {entry["endpoint"]: entry for entry in response.get_json()["endpoints"]}
+    course_types = report["GET /api/v1/course-types/list"]
+    assert course_types["requests"] == 3
+    # The user, the table versions and the list first; then only the versions, the user being in the session
+    assert course_types["statements"] == {"avg": 1.7, "max": 3}
+    assert sum(course_types["histogram"].values()) == 3
+    assert course_types["latency_ms"]["p50"] <= course_types["latency_ms"]["p99"]
+    assert report["GET /api/v1/admin/maintenance-status"]["requests"] == 1
+
+def test_slow_requests_are_logged(test_client, caplog):
+    """
+    GIVEN a statement threshold lower than the statements of a request
+    WHEN that request is served
+    THEN a slow request line is logged with its figures.
+    """
+    test_client.application.config['SLOW_REQUEST_STATEMENTS'] = 1
+
+    with caplog.at_level(logging.WARNING):
+        test_client.get('/api/v1/course-types/list', headers=get_auth_headers())
+
+    line = next(r.getMessage() for r in caplog.records if r.getMessage().startswith("Slow request"))
+    assert "endpoint='GET /api/v1/course-types/list'" in line
+    assert "status=200" in line
+
+def test_perf_report_is_superadmin_only_and_can_be_reset(test_client):
+    """
+    GIVEN recorded requests
+    WHEN a HOD asks for the report, then a superadmin resets it
+    THEN the HOD is refused and the report only holds requests made after the reset.
+    """
+    assert test_client.get('/api/v1/admin/metrics/perf', headers=get_auth_headers("hod@test.com")).status_code == 403
+
+    headers = get_auth_headers()
+    test_client.get('/api/v1/course-types/list', headers=headers)
+    assert test_client.delete('/api/v1/admin/metrics/perf', headers=headers).status_code == 204
+
+    endpoints = [entry["endpoint"] for entry in test_client.get('/api/v1/admin/metrics/perf', headers=headers).get_json()["endpoints"]]
+    assert endpoints == ["DELETE /api/v1/admin/metrics/perf"]
+
+def test_failing_statement_does_not_skew_later_timings(test_client):
+    """
+    GIVEN a request whose first statement fails
+    WHEN a later statement runs on the same connection
+    THEN only that statement is counted, timed from its own start.
+    """
+    with test_client.application.test_request_context('/'):
+        test_client.application.preprocess_request()
+        with pytest.raises(OperationalError):
+            db.session.execute(text("SELECT * FROM no_such_table"))
+        db.session.rollback()
+
+        time.sleep(0.05)
+        db.session.execute(text("SELECT 1"))
+
+        perf = g.perf
+        assert perf['statements'] == 1
+        assert perf['db'] < 0.05
+        assert not db.session.connection().info.get('perf_started')
@@ -0,0 +1,94 @@
+import pytest
+from flask import g
+from app import create_app, db
+from app.models import User, Semester, Level, AcademicSession, Bulletin, CacheVersion
+from app.services import reference_data_service
+from flask_jwt_extended import create_access_token
+from tests.conftest import count_statements
+
+@pytest.fixture(scope='function')
+def test_client():
+    flask_app = create_app(config_name='testing')
+    flask_app.config['JWT_SECRET_KEY'] = 'super-secret-testing-key'
+
+    with flask_app.test_client() as testing_client:
+        with flask_app.app_context():
+            db.create_all()
+            setup_test_data()
+            yield testing_client
+            db.session.remove()
+            db.drop_all()
+
+def setup_test_data():
+    superadmin = User(name="Super Admin", email="super@admin.com", role="superadmin")
+    superadmin.set_password("superadminpass")
+    db.session.add_all([
+        superadmin,
+        Semester(name="First Semester", is_active=True),
+        Semester(name="Second Semester"),
+        Semester(name="Summer Semester"),
+        Level(name="100"),
+        AcademicSession(name="2024/2025", is_active=True),
+        Bulletin(name="2024-2028", start_year=2024, end_year=2028, is_active=True),
+    ])
+    db.session.commit()
+
+def get_auth_headers():
+    superadmin = User.query.filter_by(email="super@admin.com").first()
+    return {'Authorization': f'Bearer {create_access_token(identity=str(superadmin.id))}'}
+
+def test_reference_data_is_loaded_once(test_client):
+    """
+    GIVEN sessions, semesters, levels and bulletins in the database
+    WHEN they are read through the reference-data service more than once
+    THEN the first read loads them and later reads run no SQL.
+    """
+    assert reference_data_service.active_session().name == "2024/2025"
+    assert reference_data_service.active_bulletin().name == "2024-2028"
+    assert reference_data_service.semester_by_name("Second Semester").is_active is False
+    assert reference_data_service.level("1").name == "100"
+
+    _, statements = count_statements(lambda: [
+        reference_data_service.active_semester(), reference_data_service.semesters(),
+        reference_data_service.level(1), reference_data_service.active_session()
+    ])
+    assert statements == 0
+
+def test_writers_bump_the_reference_data(test_client):
+    """
+    GIVEN cached reference data
+    WHEN a level is created and the second semester is activated through the API
+    THEN the next reads return the new rows and the version is bumped.
+    """
+    headers = get_auth_headers()
+    assert [l.name for l in reference_data_service.levels()] == ["100"]
+
+    assert test_client.post('/api/v1/levels/create', headers=headers, json={"name": "200"}).status_code == 201
+    assert [l.name for l in reference_data_service.levels()] == ["100", "200"]
+
+    assert test_client.post('/api/v1/admin/second-semester-status', headers=headers, json={"enable": True}).status_code == 200
+    assert [s.name for s in reference_data_service.active_semesters()] == ["First Semester", "Second Semester"]
+    assert test_client.get('/api/v1/admin/second-semester-status').get_json() == {"isSecondSemesterActive": True}
+
+    assert db.session.get(CacheVersion, reference_data_service.VERSION_NAME).version == 2
+
+def test_other_workers_changes_are_seen_after_the_version_check(test_client):
+    """
+    GIVEN reference data cached by this worker
+    WHEN another worker activates a new session and bumps the version
+    THEN this worker reloads on its next version check.
+    """
+    assert reference_data_service.active_session().name == "2024/2025"
+
+    # Another worker's write: the tables change and the version row is bumped, but this
+    # process's memory is untouched
+    AcademicSession.query.update({AcademicSession.is_active: False})
+    db.session.add(AcademicSession(name="2025/2026", is_active=True))
+    db.session.add(CacheVersion(name=reference_data_service.VERSION_NAME, version=1))
+    db.session.commit()
+
+    assert reference_data_service.active_session().name == "2024/2025"
+
+    # The next request (or check interval) reads the version row again
+    g.pop('reference_data_checked_at')
+    assert reference_data_service.active_session().name == "2025/2026"
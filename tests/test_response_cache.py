@@ -0,0 +1,129 @@
+import pytest
+from app import create_app, db
+from app.models.models import School, Department, Program, User, Level, Semester, Bulletin, Course, ProgramCourse, CourseType, CacheVersion
+from app.services import response_cache_service
+from flask_jwt_extended import create_access_token
+from tests.conftest import count_statements
+
+@pytest.fixture(scope='function')
+def test_client():
+    flask_app = create_app(config_name='testing')
+    flask_app.config['JWT_SECRET_KEY'] = 'super-secret-testing-key'
+
+    with flask_app.test_client() as testing_client:
+        with flask_app.app_context():
+            db.create_all()
+            setup_test_data()
+            yield testing_client
+            db.session.remove()
+            db.drop_all()
+
+def setup_test_data():
+    school = School(name="School of Science", acronym="SOS")
+    department = Department(name="Computer Science", acronym="CS", school=school)
+    program = Program(name="B.Sc. Computer Science", acronym="CSC", department=department)
+    course_type = CourseType(name="Core")
+    course = Course(code="CS101", title="Intro to Programming", units=3, course_type=course_type)
+    level = Level(name="100")
+    semester = Semester(name="First Semester", is_active=True)
+    bulletin = Bulletin(name="2023-2027", start_year=2023, end_year=2027, is_active=True)
+    program_course = ProgramCourse(program=program, course=course, level=level, semester=semester, bulletin=bulletin)
+
+    admin_user = User(name="Admin User", email="admin@test.com", role="superadmin")
+    admin_user.set_password("password")
+
+    db.session.add_all([program_course, admin_user])
+    db.session.commit()
+
+def get_auth_headers():
+    user = User.query.filter_by(email="admin@test.com").first()
+    return {'Authorization': f'Bearer {create_access_token(identity=str(user.id))}'}
+
+CATALOG_URLS = [
+    '/api/v1/courses', '/api/v1/courses/main', '/api/v1/courses/main/list',
+    '/api/v1/bulletins/list', '/api/v1/departments/list', '/api/v1/schools/list',
+    '/api/v1/levels/list', '/api/v1/semesters/list', '/api/v1/course-types/list',
+]
+
+@pytest.mark.parametrize('url', CATALOG_URLS)
+def test_catalog_endpoints_answer_if_none_match_with_304(test_client, url):
+    """
+    GIVEN a catalog list fetched once
+    WHEN it is requested again with its ETag
+    THEN the answer is an empty 304.
+    """
+    headers = get_auth_headers()
+    response = test_client.get(url, headers=headers)
+    etag = response.headers['ETag']
+
+    assert response.status_code == 200
+    assert response.headers['Cache-Control'] == 'private, no-cache'
+
+    response = test_client.get(url, headers={**headers, 'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.data == b""
+
+def test_cached_course_catalog_is_served_without_loading_the_tables(test_client):
+    """
+    GIVEN the course catalog serialized by a previous request
+    WHEN it is requested again
+    THEN the same body is returned after reading only the user and the table versions.
+    """
+    headers = get_auth_headers()
+    first = test_client.get('/api/v1/courses', headers=headers)
+    assert first.get_json()["courses"][0]["program"]["department"]["school"]["name"] == "School of Science"
+
+    second, statements = count_statements(lambda: test_client.get('/api/v1/courses', headers=headers))
+    assert second.data == first.data
+    assert statements == 2
+
+def test_writes_change_the_etag_of_dependent_endpoints_only(test_client):
+    """
+    GIVEN cached course and school lists
+    WHEN a department is renamed
+    THEN the course catalog is rebuilt under a new ETag while the school list keeps its own.
+    """
+    headers = get_auth_headers()
+    courses_etag = test_client.get('/api/v1/courses', headers=headers).headers['ETag']
+    schools_etag = test_client.get('/api/v1/schools/list', headers=headers).headers['ETag']
+
+    department = Department.query.first()
+    response = test_client.put(f'/api/v1/departments/update/{department.id}', headers=headers,
+                               json={"name": "Computing", "school_id": department.school_id, "acronym": "CMP"})
+    assert response.status_code == 200
+
+    response = test_client.get('/api/v1/courses', headers={**headers, 'If-None-Match': courses_etag})
+    assert response.status_code == 200
+    assert response.get_json()["courses"][0]["program"]["department"]["name"] == "Computing"
+
+    response = test_client.get('/api/v1/schools/list', headers={**headers, 'If-None-Match': schools_etag})
+    assert response.status_code == 304
+
+def test_other_workers_bumps_invalidate_cached_responses(test_client):
+    """
+    GIVEN a cached course type list
+    WHEN another worker adds a course type and bumps its table version
+    THEN the next request rebuilds the list.
+    """
+    headers = get_auth_headers()
+    assert [t["name"] for t in test_client.get('/api/v1/course-types/list', headers=headers).get_json()] == ["Core"]
+
+    db.session.add(CourseType(name="Elective"))
+    db.session.add(CacheVersion(name=response_cache_service.VERSION_PREFIX + 'course_type', version=1))
+    db.session.commit()
+
+    assert [t["name"] for t in test_client.get('/api/v1/course-types/list', headers=headers).get_json()] == ["Core", "Elective"]
+
+def test_response_cache_is_bounded(test_client):
+    """
+    GIVEN a response cache of two entries
+    WHEN three different lists are requested
+    THEN only the two most recent are kept.
+    """
+    test_client.application.config['RESPONSE_CACHE_SIZE'] = 2
+    headers = get_auth_headers()
+    for url in ['/api/v1/schools/list', '/api/v1/levels/list', '/api/v1/course-types/list']:
+        test_client.get(url, headers=headers)
+
+    cached_paths = [key[0] for key in test_client.application.extensions['response_cache']]
+    assert cached_paths == ['/api/v1/levels/list?', '/api/v1/course-types/list?']
@@ -0,0 +1,93 @@
+import pytest
+from app import create_app, db
+from app.models.models import User, Semester, AppSetting, CacheVersion
+from app.services import settings_service
+from flask_jwt_extended import create_access_token
+from tests.conftest import count_statements
+
+@pytest.fixture(scope='function')
+def test_client():
+    flask_app = create_app(config_name='testing')
+    flask_app.config['JWT_SECRET_KEY'] = 'super-secret-testing-key'
+
+    with flask_app.test_client() as testing_client:
+        with flask_app.app_context():
+            db.create_all()
+            setup_test_data()
+            yield testing_client
+            db.session.remove()
+            db.drop_all()
+
+def setup_test_data():
+    superadmin = User(name="Super Admin", email="super@admin.com", role="superadmin")
+    superadmin.set_password("superadminpass")
+    db.session.add_all([superadmin, Semester(name="First Semester", is_active=True), Semester(name="Second Semester")])
+    db.session.commit()
+
+def get_auth_headers():
+    superadmin = User.query.filter_by(email="super@admin.com").first()
+    return {'Authorization': f'Bearer {create_access_token(identity=str(superadmin.id))}'}
+
+def test_settings_returns_every_flag_with_an_etag(test_client):
+    """
+    GIVEN default settings
+    WHEN '/settings' is polled with the ETag of the previous response
+    THEN it answers 304 until a flag changes, then 200 with the new flags.
+    """
+    response = test_client.get('/api/v1/admin/settings')
+    etag = response.headers['ETag']
+
+    assert response.status_code == 200
+    assert response.get_json() == {
+        "isMaintenanceMode": False, "isAllocationClosed": False,
+        "isFirstSemesterActive": True, "isSecondSemesterActive": False, "isSummerSemesterActive": False
+    }
+
+    response = test_client.get('/api/v1/admin/settings', headers={'If-None-Match': etag})
+    assert response.status_code == 304
+
+    assert test_client.post('/api/v1/admin/maintenance-mode', headers=get_auth_headers(), json={"enable": True}).status_code == 200
+
+    response = test_client.get('/api/v1/admin/settings', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.get_json()["isMaintenanceMode"] is True
+    assert response.headers['ETag'] != etag
+    assert test_client.get('/api/v1/admin/maintenance-status').get_json() == {"isMaintenanceMode": True}
+
+    test_client.post('/api/v1/admin/summer-semester-status', headers=get_auth_headers(), json={"enable": True})
+    assert test_client.get('/api/v1/admin/summer-semester-status').get_json() == {"isSummerSemesterActive": True}
+
+def test_status_endpoints_are_served_from_memory(test_client):
+    """
+    GIVEN flags loaded by a previous request
+    WHEN the public status endpoints are polled again
+    THEN no SQL is executed.
+    """
+    test_client.application.config['SETTINGS_CHECK_INTERVAL'] = 60
+    test_client.get('/api/v1/admin/settings')
+
+    _, statements = count_statements(lambda: [
+        test_client.get('/api/v1/admin/maintenance-status'),
+        test_client.get('/api/v1/admin/close-allocation'),
+        test_client.get('/api/v1/admin/first-semester-status'),
+        test_client.get('/api/v1/admin/settings'),
+    ])
+    assert statements == 0
+
+def test_other_workers_changes_are_seen_after_the_check_interval(test_client):
+    """
+    GIVEN flags cached by this worker
+    WHEN another worker closes allocation and bumps the settings version
+    THEN this worker picks the change up once the check interval has passed.
+    """
+    test_client.application.config['SETTINGS_CHECK_INTERVAL'] = 60
+    assert settings_service.get_flag("isAllocationClosed") is False
+
+    db.session.add(AppSetting(setting_name='close_allocation', is_enabled=True))
+    db.session.add(CacheVersion(name=settings_service.VERSION_NAME, version=1))
+    db.session.commit()
+    assert settings_service.get_flag("isAllocationClosed") is False
+
+    test_client.application.config['SETTINGS_CHECK_INTERVAL'] = 0
+    assert settings_service.get_flag("isAllocationClosed") is True
+    assert test_client.get('/api/v1/admin/close-allocation').get_json() == {"isAllocationClosed": True}
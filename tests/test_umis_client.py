@@ -0,0 +1,90 @@
+import pytest
+import requests
+from unittest.mock import MagicMock, patch
+from app import create_app, db
+from app.services import umis_auth_service
+from app.services.umis_client import UmisClient, UmisUnavailableError
+
+@pytest.fixture(scope='function')
+def app_context():
+    flask_app = create_app(config_name='testing')
+    flask_app.config['UMIS_BREAKER_FAILURE_THRESHOLD'] = 2
+    flask_app.config['UMIS_BREAKER_RESET_TIMEOUT'] = 30
+
+    with flask_app.test_request_context():
+        yield flask_app
+
+def _client_with(http, now):
+    client = UmisClient()
+    client._session = http
+    client.breaker._clock = lambda: now[0]
+    return client
+
+def test_requests_carry_connect_and_read_timeouts(app_context):
+    """
+    GIVEN the UMIS client
+    WHEN a request is sent without a timeout
+    THEN the configured (connect, read) timeouts are applied.
+    """
+    http = MagicMock()
+    http.request.return_value = MagicMock(status_code=200)
+    client = _client_with(http, [0])
+
+    client.get('https://umis.example/instructors')
+
+    assert http.request.call_args.kwargs["timeout"] == (3.0, 10.0)
+
+def test_breaker_fails_fast_while_umis_is_down(app_context):
+    """
+    GIVEN UMIS timing out
+    WHEN the failure threshold is reached
+    THEN further calls fail without contacting UMIS until the reset timeout,
+    after which one trial call closes the breaker again.
+    """
+    now = [0]
+    http = MagicMock()
+    http.request.side_effect = requests.exceptions.ReadTimeout("read timed out")
+    client = _client_with(http, now)
+
+    for _ in range(2):
+        with pytest.raises(requests.exceptions.ReadTimeout):
+            client.post('https://umis.example/auth')
+    with pytest.raises(UmisUnavailableError):
+        client.post('https://umis.example/auth')
+    assert http.request.call_count == 2
+    assert client.breaker.state == "open"
+
+    now[0] = 31
+    http.request.side_effect = None
+    http.request.return_value = MagicMock(status_code=200)
+    client.post('https://umis.example/auth')
+
+    assert http.request.call_count == 3
+    assert client.breaker.state == "closed"
+
+def test_auth_user_reports_open_breaker(app_context):
+    """
+    GIVEN an open circuit breaker
+    WHEN a HOD logs in
+    THEN auth_user returns an error instead of waiting on UMIS.
+    """
+    with patch.object(umis_auth_service.umis_client, 'post', side_effect=UmisUnavailableError("UMIS is unavailable, please try again shortly")):
+        instructor, error = umis_auth_service.auth_user({'umisid': 'someid', 'password': 'somepassword'})
+
+    assert instructor is None
+    assert error == "UMIS is unavailable, please try again shortly"
+
+@patch('app.auth.umis_login.auth_user')
+def test_login_calls_umis_once(mock_auth_user, app_context):
+    """
+    GIVEN UMIS rejecting the credentials
+    WHEN '/login' is called
+    THEN auth_user runs exactly once.
+    """
+    mock_auth_user.return_value = (None, "UMIS auth failed (401)")
+
+    with app_context.test_client() as client:
+        response = client.post('/api/v1/auth/umis/login', json={'umisid': 'someid', 'password': 'somepassword'})
+
+    assert response.status_code == 400
+    mock_auth_user.assert_called_once()
@@ -0,0 +1,115 @@
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock, patch
+
+import pytest
+from app import create_app, db
+from app.models.models import User, UmisInstructor
+from app.services import umis_directory_service
+from flask_jwt_extended import create_access_token
+from tests.conftest import count_statements
+
+INSTRUCTORS = [
+    {'instructorid': 'HOD001', 'instructorname': 'Zainab Hod', 'email': 'hod@babcock.edu.ng', 'departmentid': '12',
+     'departmentname': 'Religious Studies', 'schoolid': '3', 'schoolname': 'Education And Humanities', 'headofdepartment': 'Yes'},
+    {'instructorid': 'LECT001', 'instructorname': 'Ade Lecturer', 'email': None, 'departmentid': '12',
+     'departmentname': 'Religious Studies', 'schoolid': '3', 'schoolname': 'Education And Humanities', 'headofdepartment': 'No'},
+]
+
+@pytest.fixture(scope='function')
+def test_client():
+    flask_app = create_app(config_name='testing')
+    flask_app.config['JWT_SECRET_KEY'] = 'super-secret-testing-key'
+
+    with flask_app.test_client() as testing_client:
+        with flask_app.app_context():
+            db.create_all()
+            superadmin = User(name="Super Admin", email="super@admin.com", role="superadmin")
+            superadmin.set_password("superadminpass")
+            db.session.add(superadmin)
+            db.session.commit()
+            yield testing_client
+            db.session.remove()
+            db.drop_all()
+
+def get_auth_headers():
+    user = User.query.filter_by(email="super@admin.com").first()
+    return {'Authorization': f'Bearer {create_access_token(identity=str(user.id))}'}
+
+def umis_list(instructors):
+    return MagicMock(status_code=200, json=MagicMock(return_value={"data": instructors}))
+
+def test_login_lookups_read_the_stored_directory(test_client, monkeypatch):
+    """
+    GIVEN an empty directory
+    WHEN two instructors are looked up
+    THEN UMIS is asked for the list once, with the dev account, and the second
+    lookup is a single primary key read.
+    """
+    monkeypatch.setenv('API_DEV_ID', 'dev-id')
+    monkeypatch.setenv('UMIS_INSTRUCTOR_URL', 'http://umis.test/instructors/')
+    with patch.object(umis_directory_service, 'auth_dev_user', return_value=('dev-token', None)), \
+            patch.object(umis_directory_service.umis_client, 'get', return_value=umis_list(INSTRUCTORS)) as get:
+        instructor, error = umis_directory_service.find_instructor('HOD001')
+        assert error is None
+        assert instructor['instructorname'] == 'Zainab Hod'
+        assert instructor['headofdepartment'] == 'Yes'
+
+        (instructor, error), statements = count_statements(lambda: umis_directory_service.find_instructor('LECT001'))
+
+    assert instructor['headofdepartment'] == 'No'
+    assert statements == 1
+    assert get.call_count == 1
+    assert get.call_args.args[0] == 'http://umis.test/instructors/dev-id'
+    assert get.call_args.kwargs['headers']['authorization'] == 'dev-token'
+
+def test_stale_directory_is_refreshed_and_kept_when_umis_fails(test_client):
+    """
+    GIVEN a directory older than UMIS_DIRECTORY_TTL
+    WHEN UMIS fails during the refresh, then recovers
+    THEN the stale entry is served, and the next lookup stores the new list.
+    """
+    umis_directory_service.replace_snapshot(INSTRUCTORS)
+    UmisInstructor.query.update({UmisInstructor.refreshed_at: datetime.now(timezone.utc) - timedelta(hours=2)})
+    db.session.commit()
+
+    with patch.object(umis_directory_service, 'auth_dev_user', return_value=('dev-token', None)), \
+            patch.object(umis_directory_service.umis_client, 'get', return_value=MagicMock(status_code=503)):
+        instructor, error = umis_directory_service.find_instructor('HOD001')
+    assert (instructor['instructorname'], error) == ('Zainab Hod', None)
+
+    renamed = [dict(INSTRUCTORS[0], instructorname='Zainab Renamed')]
+    with patch.object(umis_directory_service, 'auth_dev_user', return_value=('dev-token', None)), \
+            patch.object(umis_directory_service.umis_client, 'get', return_value=umis_list(renamed)):
+        instructor, error = umis_directory_service.find_instructor('HOD001')
+    assert instructor['instructorname'] == 'Zainab Renamed'
+    assert UmisInstructor.query.count() == 1
+
+def test_unknown_instructor_does_not_refetch_a_recent_directory(test_client):
+    """
+    GIVEN a directory refreshed moments ago
+    WHEN an id that is not in it logs in
+    THEN the lookup fails without downloading the list again.
+    """
+    umis_directory_service.replace_snapshot(INSTRUCTORS)
+
+    with patch.object(umis_directory_service.umis_client, 'get') as get:
+        instructor, error = umis_directory_service.find_instructor('NOPE')
+
+    assert instructor is None
+    assert error == "Instructor not found in UMIS data"
+    get.assert_not_called()
+
+def test_faculty_list_is_served_from_the_directory(test_client):
+    """
+    GIVEN a fresh directory
+    WHEN '/umis-faculty-list' is called by a superadmin
+    THEN the faculties come from the table, ordered by name, without calling UMIS.
+    """
+    umis_directory_service.replace_snapshot(INSTRUCTORS)
+
+    with patch.object(umis_directory_service.umis_client, 'get') as get:
+        response = test_client.get('/api/v1/admin/umis-faculty-list', headers=get_auth_headers())
+
+    assert response.status_code == 200
+    assert [f['id'] for f in response.get_json()['faculties']] == ['LECT001', 'HOD001']
+    get.assert_not_called()
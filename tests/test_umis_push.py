@@ -0,0 +1,365 @@
+import json
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from unittest.mock import MagicMock, patch
+from app import create_app, db
+from app.models import (
+    School, Department, User, Lecturer, Program, Level, Semester,
+    Course, Bulletin, AcademicSession, ProgramCourse, CourseAllocation,
+    DepartmentAllocationSummary
+)
+from app.services import umis_push_service, umis_job_service, umis_token_service
+from flask_jwt_extended import create_access_token
+from tests.conftest import count_statements
+
+
+class StubUMIS:
+    """
+    A local stand-in for the UMIS allocation endpoint. Every request sleeps for
+    `latency` seconds; courses whose code starts with FAIL are rejected by UMIS,
+    courses whose code starts with ERR get an HTTP 500 and requests with a token
+    in `rejected_tokens` get an HTTP 401.
+    """
+
+    def __init__(self, latency=0.05):
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.requests = []
+        self.rejected_tokens = set()
+        self.tokens = []
+
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def do_POST(self):
+                payload = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+                with stub.lock:
+                    stub.in_flight += 1
+                    stub.max_in_flight = max(stub.max_in_flight, stub.in_flight)
+                    stub.requests.append(payload)
+                    stub.tokens.append(self.headers['authorization'])
+                time.sleep(stub.latency)
+                with stub.lock:
+                    stub.in_flight -= 1
+
+                if self.headers['authorization'] in stub.rejected_tokens:
+                    status, body = 401, {"error": "Unauthorized"}
+                elif payload['courseid'].startswith('ERR'):
+                    status, body = 500, {"error": "Internal error"}
+                elif payload['courseid'].startswith('FAIL'):
+                    status, body = 200, {"ResultCode": 1, "ResultDesc": "Rejected by UMIS"}
+                else:
+                    status, body = 200, {"ResultCode": 0, "data": {"keyfield": len(stub.requests)}}
+
+                raw = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(raw)))
+                self.end_headers()
+                self.wfile.write(raw)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/allocation"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture(scope='function')
+def stub_umis(monkeypatch):
+    with StubUMIS() as stub:
+        monkeypatch.setenv('UMIS_ALLOCATION_URL', stub.url)
+        yield stub
+
+@pytest.fixture(scope='function')
+def test_client():
+    flask_app = create_app(config_name='testing')
+    flask_app.config['JWT_SECRET_KEY'] = 'super-secret-testing-key'
+    flask_app.config['UMIS_PUSH_MAX_WORKERS'] = 4
+
+    with flask_app.test_client() as testing_client:
+        with flask_app.app_context():
+            db.create_all()
+            setup_test_data()
+            yield testing_client
+            db.session.remove()
+            db.drop_all()
+
+def setup_test_data():
+    vetter = User(name="Dr. Vetter", email="vetter@test.com", role="vetter")
+    vetter.set_password("vetterpass")
+    school = School(name="School of Science", acronym="SOS")
+    department = Department(name="Computer Science", acronym="CS", school=school)
+    db.session.add_all([vetter, school, department])
+    db.session.commit()
+
+    lecturer = Lecturer(staff_id="LEC001", department_id=department.id)
+    program = Program(name="B.Sc. CS", department_id=department.id, acronym="CSC")
+    level = Level(name="100")
+    semester = Semester(name="First Semester", is_active=True)
+    session = AcademicSession(name="2024/2025", is_active=True)
+    bulletin = Bulletin(name="2024-2028", start_year=2024, end_year=2028, is_active=True)
+    db.session.add_all([lecturer, program, level, semester, session, bulletin])
+    db.session.commit()
+
+    codes = [f"COSC{i:03d}" for i in range(10)] + ["FAIL101", "ERR101"]
+    for code in codes:
+        course = Course(code=code, title=f"Title {code}", units=3)
+        db.session.add(course)
+        db.session.flush()
+        pc = ProgramCourse(program_id=program.id, course_id=course.id, level_id=level.id, semester_id=semester.id, bulletin_id=bulletin.id)
+        db.session.add(pc)
+        db.session.flush()
+        db.session.add(CourseAllocation(
+            program_course_id=pc.id, session_id=session.id, semester_id=semester.id,
+            lecturer_id=lecturer.id, source_bulletin_id=bulletin.id,
+            group_name="Group A", class_option="Morning", class_size=50, is_allocated=True
+        ))
+    db.session.commit()
+
+def test_push_allocations_to_umis_concurrently(test_client, stub_umis):
+    """
+    GIVEN a stub UMIS server with latency and failures
+    WHEN the push engine pushes a department's allocations
+    THEN pushes run concurrently within the worker bound, failures are reported
+    and only successful allocations are marked as pushed.
+    """
+    vetter = User.query.filter_by(email="vetter@test.com").first()
+    allocations = CourseAllocation.query.order_by(CourseAllocation.id).all()
+
+    started = time.monotonic()
+    result = umis_push_service.push_allocations_to_umis(allocations, "token", vetter.id, "2024/2025", max_workers=4, timeout=5)
+    elapsed = time.monotonic() - started
+    db.session.commit()
+
+    assert len(stub_umis.requests) == 12
+    assert 1 < stub_umis.max_in_flight <= 4
+    # 12 requests of 50ms each would take at least 0.6s serially
+    assert elapsed < 0.5
+
+    assert result["successful_pushes"] == 10
+    assert len(result["success_keyfields"]) == 10
+    assert result["failed_pushes"][0] == "Course FAIL101 (Morning): Rejected by UMIS"
+    assert result["failed_pushes"][1].startswith("Course ERR101 (Morning): Network error connecting to UMIS")
+
+    db.session.expire_all()
+    pushed = CourseAllocation.query.filter_by(is_pushed_to_umis=True).all()
+    assert len(pushed) == 10
+    assert all(a.pushed_to_umis_by_id == vetter.id and a.pushed_to_umis_at for a in pushed)
+    assert stub_umis.requests[0]["quarterid"] == "2024/2025.1"
+
+def test_push_allocations_to_umis_skips_pushed_and_times_out(test_client, stub_umis):
+    """
+    GIVEN allocations already pushed and a UMIS server slower than the timeout
+    WHEN the push engine runs
+    THEN pushed allocations are skipped and slow calls fail with a timeout error.
+    """
+    vetter = User.query.filter_by(email="vetter@test.com").first()
+    allocations = CourseAllocation.query.order_by(CourseAllocation.id).all()
+    for allocation in allocations[:10]:
+        allocation.is_pushed_to_umis = True
+    db.session.commit()
+
+    stub_umis.latency = 0.5
+    result = umis_push_service.push_allocations_to_umis(allocations, "token", vetter.id, "2024/2025", max_workers=2, timeout=0.1)
+
+    assert result["successful_pushes"] == 0
+    assert len(result["failed_pushes"]) == 2
+    assert all("Network error connecting to UMIS" in f for f in result["failed_pushes"])
+
+def test_push_allocations_to_umis_refreshes_a_rejected_token_once(test_client, stub_umis, monkeypatch):
+    """
+    GIVEN UMIS rejecting the cached dev token with a 401
+    WHEN the push engine pushes a department's allocations through its worker pool
+    THEN the token is refreshed once on the calling thread and every rejected push is sent again.
+    """
+    monkeypatch.setenv('API_DEV_ID', 'dev')
+    monkeypatch.setenv('API_DEV_PASSWORD', 'secret')
+    stub_umis.rejected_tokens.add("stale-token")
+    vetter = User.query.filter_by(email="vetter@test.com").first()
+    allocations = CourseAllocation.query.order_by(CourseAllocation.id).all()
+    token_response = MagicMock(status_code=200, json=MagicMock(return_value={"access_token": "fresh-token"}))
+
+    try:
+        with patch.object(umis_token_service.umis_client, 'post', return_value=token_response) as auth_post:
+            result = umis_push_service.push_allocations_to_umis(allocations, "stale-token", vetter.id, "2024/2025", max_workers=4, timeout=5)
+    finally:
+        umis_token_service.dev_token_manager.invalidate()
+
+    assert auth_post.call_count == 1
+    assert stub_umis.tokens.count("stale-token") == 12
+    assert stub_umis.tokens.count("fresh-token") == 12
+    assert result["successful_pushes"] == 10
+    assert result["failed_pushes"][0] == "Course FAIL101 (Morning): Rejected by UMIS"
+
+@patch('app.services.umis_job_service.auth_dev_user')
+def test_push_bulk_allocation_route_queues_job(mock_auth_dev_user, test_client, stub_umis):
+    """
+    GIVEN a vetter and a stub UMIS server
+    WHEN the '/push_bulk_allocation_to_umis' endpoint is called and a worker drains the queue
+    THEN a job id is returned right away and the status endpoint reports the final counts.
+    """
+    mock_auth_dev_user.return_value = ("token", None)
+    vetter = User.query.filter_by(email="vetter@test.com").first()
+    department = Department.query.first()
+    semester = Semester.query.first()
+    headers = {'Authorization': f'Bearer {create_access_token(identity=str(vetter.id))}'}
+
+    response = test_client.post(
+        '/api/v1/allocation/push_bulk_allocation_to_umis',
+        headers=headers,
+        json={"department_id": department.id, "semester_id": semester.id}
+    )
+    data = response.get_json()
+
+    assert response.status_code == 202
+    assert stub_umis.requests == []
+    job_id = data["job_id"]
+
+    status = test_client.get(f'/api/v1/allocation/push-jobs/{job_id}', headers=headers).get_json()
+    assert status["status"] == "pending"
+    assert (status["total"], status["pushed"], status["failed"], status["pending"]) == (12, 0, 0, 12)
+
+    assert umis_job_service.run_worker(worker_id="test-worker", burst=True) == 1
+
+    status = test_client.get(f'/api/v1/allocation/push-jobs/{job_id}', headers=headers).get_json()
+    assert status["status"] == "completed"
+    assert (status["total"], status["pushed"], status["failed"], status["pending"]) == (12, 10, 2, 0)
+    assert any("FAIL101" in e for e in status["errors"])
+    assert stub_umis.max_in_flight <= 4
+
+    session = AcademicSession.query.first()
+    summary = db.session.get(DepartmentAllocationSummary, (session.id, semester.id, department.id))
+    assert (summary.allocation_groups, summary.pushed_count) == (12, 10)
+
+@patch('app.services.umis_job_service.auth_dev_user')
+def test_push_course_job_and_claims(mock_auth_dev_user, test_client, stub_umis):
+    """
+    GIVEN several queued jobs
+    WHEN workers claim them
+    THEN each job is claimed exactly once and single-course jobs push that course only.
+    """
+    mock_auth_dev_user.return_value = ("token", None)
+    vetter = User.query.filter_by(email="vetter@test.com").first()
+    allocation = CourseAllocation.query.order_by(CourseAllocation.id).first()
+
+    first = umis_job_service.enqueue_course_push(allocation.program_course_id, vetter.id)
+    second = umis_job_service.enqueue_course_push(allocation.program_course_id, vetter.id)
+
+    claimed_a = umis_job_service.claim_next_job("worker-a")
+    claimed_b = umis_job_service.claim_next_job("worker-b")
+    assert {claimed_a.id, claimed_b.id} == {first.id, second.id}
+    assert umis_job_service.claim_next_job("worker-c") is None
+
+    umis_job_service.run_job(claimed_a)
+    status, _ = umis_job_service.get_job_status(claimed_a.id)
+    assert (status["status"], status["pushed"], status["failed"]) == ("completed", 1, 0)
+    assert len(stub_umis.requests) == 1
+
+    # The second job finds nothing left to push
+    umis_job_service.run_job(claimed_b)
+    status, _ = umis_job_service.get_job_status(claimed_b.id)
+    assert (status["status"], status["total"], status["pending"]) == ("completed", 0, 0)
+
+@patch('app.services.umis_job_service.auth_dev_user')
+def test_push_job_fails_when_umis_auth_fails(mock_auth_dev_user, test_client):
+    """
+    GIVEN UMIS authentication failing
+    WHEN a queued job runs
+    THEN the job is marked as failed with the authentication error.
+    """
+    mock_auth_dev_user.return_value = (None, "UMIS auth failed (401)")
+    vetter = User.query.filter_by(email="vetter@test.com").first()
+    department = Department.query.first()
+    semester = Semester.query.first()
+    session = AcademicSession.query.first()
+
+    job = umis_job_service.enqueue_bulk_push(department.id, semester.id, session.id, vetter.id)
+    umis_job_service.run_worker(worker_id="test-worker", burst=True)
+
+    status, _ = umis_job_service.get_job_status(job.id)
+    assert status["status"] == "failed"
+    assert status["pending"] == 12
+    assert "UMIS auth failed (401)" in status["errors"][-1]
+
+@patch('app.services.umis_job_service.auth_dev_user')
+def test_requeued_job_reports_consistent_counts(mock_auth_dev_user, test_client, stub_umis):
+    """
+    GIVEN a job whose worker died after pushing part of it, and a long job still sending heartbeats
+    WHEN a new worker starts
+    THEN only the silent job is requeued, and its rerun reports counts that add up to its total.
+    """
+    mock_auth_dev_user.return_value = ("token", None)
+    vetter = User.query.filter_by(email="vetter@test.com").first()
+    department = Department.query.first()
+    semester = Semester.query.first()
+    session = AcademicSession.query.first()
+    long_ago = datetime.now(timezone.utc) - timedelta(hours=2)
+
+    dead = umis_job_service.enqueue_bulk_push(department.id, semester.id, session.id, vetter.id)
+    alive = umis_job_service.enqueue_bulk_push(department.id, semester.id, session.id, vetter.id)
+    umis_job_service.claim_next_job("dead-worker")
+    umis_job_service.claim_next_job("busy-worker")
+
+    # The dead worker had pushed five allocations and recorded one failure
+    allocations = CourseAllocation.query.order_by(CourseAllocation.id).limit(5).all()
+    for allocation in allocations:
+        allocation.is_pushed_to_umis = True
+    dead.pushed_count, dead.failed_count, dead.errors = 5, 1, '["Course FAIL101 (Morning): Rejected by UMIS"]'
+    dead.started_at = dead.heartbeat_at = long_ago
+    alive.started_at = long_ago
+    db.session.commit()
+
+    assert umis_job_service.requeue_stale_jobs(3600) == 1
+    assert umis_job_service.run_worker(worker_id="new-worker", burst=True) == 1
+
+    status, _ = umis_job_service.get_job_status(dead.id)
+    assert status["status"] == "completed"
+    assert (status["total"], status["pushed"], status["failed"], status["pending"]) == (7, 5, 2, 0)
+    assert len(status["errors"]) == 2
+    assert umis_job_service.get_job_status(alive.id)[0]["status"] == "running"
+
+@patch('app.services.umis_job_service.auth_dev_user')
+def test_push_job_loads_programs_with_each_chunk(mock_auth_dev_user, test_client, stub_umis):
+    """
+    GIVEN allocations spread over one program per course
+    WHEN a bulk job pushes them in a single chunk
+    THEN the programs come with the chunk instead of one lazy load per program.
+    """
+    mock_auth_dev_user.return_value = ("token", None)
+    vetter = User.query.filter_by(email="vetter@test.com").first()
+    department = Department.query.first()
+    semester = Semester.query.first()
+    session = AcademicSession.query.first()
+    for i, program_course in enumerate(ProgramCourse.query.order_by(ProgramCourse.id).all()):
+        program = Program(name=f"Program {i}", department_id=department.id, acronym=f"P{i}")
+        db.session.add(program)
+        db.session.flush()
+        program_course.program_id = program.id
+    db.session.commit()
+
+    job_id = umis_job_service.enqueue_bulk_push(department.id, semester.id, session.id, vetter.id).id
+    _, statements = count_statements(lambda: umis_job_service.run_job(umis_job_service.claim_next_job("test-worker")))
+
+    status, _ = umis_job_service.get_job_status(job_id)
+    assert (status["pushed"], status["failed"]) == (10, 2)
+    # Claim, totals, one chunk with its summaries and the final update; a lazy load per program would add ten more
+    assert statements <= 21
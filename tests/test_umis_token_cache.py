@@ -0,0 +1,141 @@
+import threading
+import time
+
+import pytest
+from unittest.mock import patch, MagicMock
+from app import create_app
+from app.services import allocation_service, umis_token_service
+from app.services.umis_token_service import UmisTokenManager
+
+@pytest.fixture(scope='function')
+def app_context():
+    flask_app = create_app(config_name='testing')
+    flask_app.config['UMIS_TOKEN_TTL'] = 3600
+    flask_app.config['UMIS_TOKEN_REFRESH_MARGIN'] = 60
+    with flask_app.app_context():
+        yield flask_app
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+def make_manager(clock, expires_in=None, delay=0):
+    calls = []
+
+    def fetch_token():
+        time.sleep(delay)
+        calls.append(1)
+        return f"token-{len(calls)}", expires_in, None
+
+    return UmisTokenManager(fetch_token, clock=clock), calls
+
+def test_token_is_reused_until_refresh_margin(app_context):
+    """
+    GIVEN a cached token with a 1 hour lifetime
+    WHEN it is requested repeatedly
+    THEN UMIS is only called again once the token is inside the refresh margin.
+    """
+    clock = FakeClock()
+    manager, calls = make_manager(clock)
+
+    assert manager.get_token() == ("token-1", None)
+    assert manager.get_token() == ("token-1", None)
+
+    clock.now += 3600 - 61
+    assert manager.get_token() == ("token-1", None)
+
+    clock.now += 2
+    assert manager.get_token() == ("token-2", None)
+
+    assert len(calls) == 2
+    assert manager.stats() == {"hits": 2, "misses": 2}
+
+def test_expires_in_from_umis_is_honoured(app_context):
+    clock = FakeClock()
+    manager, calls = make_manager(clock, expires_in=120)
+
+    manager.get_token()
+    clock.now += 61
+    assert manager.get_token() == ("token-2", None)
+    assert len(calls) == 2
+
+def test_concurrent_callers_fetch_once(app_context):
+    """
+    GIVEN many threads asking for a token at the same time
+    WHEN the cache is empty
+    THEN only one UMIS authorization request is made.
+    """
+    manager, calls = make_manager(time.monotonic, delay=0.05)
+    results = []
+
+    def worker():
+        with app_context.app_context():
+            results.append(manager.get_token())
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert set(results) == {("token-1", None)}
+    assert manager.stats() == {"hits": 7, "misses": 1}
+
+def test_refresh_after_rejection_only_once(app_context):
+    """
+    GIVEN two callers whose token was rejected at the same time
+    WHEN both ask for a refresh with the stale token
+    THEN the second caller reuses the token fetched by the first.
+    """
+    manager, calls = make_manager(FakeClock())
+    stale, _ = manager.get_token()
+
+    assert manager.refresh(stale_token=stale) == ("token-2", None)
+    assert manager.refresh(stale_token=stale) == ("token-2", None)
+    assert len(calls) == 2
+
+def test_auth_errors_are_not_cached(app_context):
+    responses = iter([(None, None, "UMIS auth failed (500)"), ("token-ok", None, None)])
+    manager = UmisTokenManager(lambda: next(responses), clock=FakeClock())
+
+    assert manager.get_token() == (None, "UMIS auth failed (500)")
+    assert manager.get_token() == ("token-ok", None)
+
+def test_push_retries_once_on_401(app_context):
+    """
+    GIVEN UMIS rejecting the cached dev token with a 401
+    WHEN an allocation is pushed
+    THEN the token is refreshed and the push is retried exactly once.
+    """
+    unauthorized = MagicMock(status_code=401)
+    accepted = MagicMock(status_code=200)
+    accepted.json.return_value = {"ResultCode": 0, "data": {"keyfield": 7}}
+    http = MagicMock()
+    http.post.side_effect = [unauthorized, accepted]
+
+    with patch.object(umis_token_service.dev_token_manager, 'refresh', return_value=("fresh-token", None)) as refresh:
+        is_success, response_data = allocation_service.push_allocation_to_umis({"courseid": "COSC101"}, "stale-token", http=http)
+
+    assert is_success is True
+    assert response_data["data"]["keyfield"] == 7
+    refresh.assert_called_once_with(stale_token="stale-token")
+    assert http.post.call_count == 2
+    assert http.post.call_args.kwargs["headers"]["authorization"] == "fresh-token"
+
+@patch('app.services.umis_token_service.umis_client.post')
+def test_auth_dev_user_uses_process_cache(mock_post, app_context, monkeypatch):
+    monkeypatch.setenv('API_DEV_ID', 'dev')
+    monkeypatch.setenv('API_DEV_PASSWORD', 'secret')
+    mock_post.return_value = MagicMock(status_code=200, json=MagicMock(return_value={"access_token": "dev-token"}))
+    umis_token_service.dev_token_manager.invalidate()
+
+    try:
+        assert umis_token_service.auth_dev_user() == ("dev-token", None)
+        assert umis_token_service.auth_dev_user() == ("dev-token", None)
+        assert mock_post.call_count == 1
+    finally:
+        umis_token_service.dev_token_manager.invalidate()
@@ -1,7 +1,9 @@
 import pytest
 from app import create_app, db
-from app.models.models import User, Department, School
+from app.models.models import User, Department, School, Lecturer
+from app.services import user_service
 from flask_jwt_extended import create_access_token
+from tests.conftest import count_statements
 
 @pytest.fixture(scope='function')
 def test_client():
@@ -156,4 +158,54 @@ def test_update_user_not_found(test_client):
 def test_delete_user_not_found(test_client):
     headers = get_auth_headers("super@admin.com")
     response = test_client.delete('/api/v1/users/9999', headers=headers)
-    assert response.status_code == 404
\ No newline at end of file
+    assert response.status_code == 404
+def test_batch_create_users_validates_in_memory_and_inserts_in_bulk(test_client):
+    """
+    GIVEN an upload of 300 lecturers with an email already taken, a duplicate staff id
+    and an unknown department
+    WHEN create_users_batch is called
+    THEN the bad rows are reported and the rest are saved in a fixed number of statements.
+    """
+    department = Department.query.first()
+    rows = [
+        {"name": f"bulk user {i}", "email": f"bulk{i}@test.com", "role": "lecturer",
+         "staff_id": f"BULK{i:03d}", "department_id": department.id, "gender": "male"}
+        for i in range(300)
+    ]
+    rows[10]["email"] = "vetter@user.com"
+    rows[20]["staff_id"] = "BULK000"
+    rows[30]["department_id"] = 9999
+
+    (count, errors), statements = count_statements(user_service.create_users_batch, rows)
+
+    assert count == 297
+    assert errors == [
+        "Row 11: Email 'vetter@user.com' already exists.",
+        "Row 21: Staff ID 'BULK000' already exists.",
+        "Row 31: Department with ID '9999' not found.",
+    ]
+    # Three IN queries, then the lecturers, their ids, the users and the directory version bump (up to four statements) with one commit
+    assert statements <= 12
+
+    lecturer = Lecturer.query.filter_by(staff_id="BULK005").one()
+    user = User.query.filter_by(lecturer_id=lecturer.id).one()
+    assert (user.name, user.role, lecturer.gender) == ("Bulk User 5", "lecturer", "Male")
+
+def test_batch_create_users_without_department(test_client):
+    """
+    GIVEN an upload with an admin and a vetter without a department, and a lecturer without one
+    WHEN create_users_batch is called
+    THEN the admin and vetter are created and only the lecturer row is rejected.
+    """
+    rows = [
+        {"name": "no dept admin", "email": "nodept.admin@test.com", "role": "admin"},
+        {"name": "no dept vetter", "email": "nodept.vetter@test.com", "role": "vetter", "department_id": ""},
+        {"name": "no dept lecturer", "email": "nodept.lecturer@test.com", "role": "lecturer", "gender": "male"},
+    ]
+
+    count, errors = user_service.create_users_batch(rows)
+
+    assert count == 2
+    assert errors == ["Row 3: Missing or invalid name, role or department."]
+    admin = User.query.filter_by(email="nodept.admin@test.com").one()
+    assert (admin.role, admin.department_id, admin.lecturer_id) == ("admin", None, None)
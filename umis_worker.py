@@ -0,0 +1,30 @@
+import argparse
+import multiprocessing
+import os
+from app import create_app
+from app.services.umis_job_service import run_worker
+
+def start_worker(config_name, poll_interval, burst):
+    """Runs one queue worker with its own app and database connections."""
+    app = create_app(config_name)
+    with app.app_context():
+        processed = run_worker(poll_interval=poll_interval, burst=burst)
+        app.logger.info(f"UMIS push worker {os.getpid()} processed {processed} job(s)")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Run worker processes that drain the UMIS push job queue.')
+    parser.add_argument('--processes', type=int, default=2, help='Number of worker processes to start.')
+    parser.add_argument('--poll-interval', type=float, default=2.0, help='Seconds to wait between polls when the queue is empty.')
+    parser.add_argument('--burst', action='store_true', help='Exit once the queue is empty instead of polling forever.')
+    parser.add_argument('--config', type=str, default=os.getenv('FLASK_CONFIG') or 'default', help='Configuration name to load.')
+
+    args = parser.parse_args()
+
+    workers = [
+        multiprocessing.Process(target=start_worker, args=(args.config, args.poll_interval, args.burst))
+        for _ in range(args.processes)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()